@@ -1,5 +1,7 @@
 from .config import Config
 from .controller import Controller
 from .curry_quest import CurryQuest
-from .states_files_handler import StateFilesHandler
+from .states_files_handler import StatesHandler, StateFilesHandler
 from .hall_of_fame import HallsOfFameHandler
+from .write_behind_states_handler import WriteBehindStatesHandler
+from .persistence_writer import PersistenceWriter, ThreadPoolPersistenceWriter
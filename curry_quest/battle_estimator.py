@@ -0,0 +1,298 @@
+import argparse
+import numpy as np
+from curry_quest.config import Config
+from curry_quest.damage_calculator import DamageCalculator
+from curry_quest.levels_config import Levels
+from curry_quest.physical_attack_executor import PhysicalAttackExecutor
+from curry_quest.spells_descriptor import DamageSpellHandler
+from curry_quest.state_machine_context import StateMachineContext
+from curry_quest.statuses import Statuses
+from curry_quest.talents import Talents
+from curry_quest.unit import Unit
+from curry_quest.unit_creator import UnitCreator
+from curry_quest.unit_traits import UnitTraits
+
+DAMAGE_ROLLS_VALUES = np.array([damage_roll.value for damage_roll in PhysicalAttackExecutor.DAMAGE_ROLLS])
+DAMAGE_ROLLS_PROBABILITIES = \
+    np.array(PhysicalAttackExecutor.DAMAGE_ROLLS_WEIGHTS) / sum(PhysicalAttackExecutor.DAMAGE_ROLLS_WEIGHTS)
+
+
+def physical_damages(
+        attack,
+        defense,
+        damage_rolls,
+        relative_heights,
+        elemental_advantages,
+        has_protection,
+        is_critical,
+        weapon_damage=0) -> np.ndarray:
+    base_damages = 2 * np.asarray(attack, dtype=np.int64) + damage_rolls + 2 * np.asarray(weapon_damage)
+    combat_advantages = np.where(has_protection, relative_heights, relative_heights + elemental_advantages)
+    base_damages = np.where(has_protection, base_damages // 4, base_damages)
+    damages = base_damages + base_damages * combat_advantages // 8 - defense
+    multipliers = np.where(is_critical, DamageCalculator.CRITICAL_HIT_MULTIPLIER, 1.0)
+    return np.maximum(np.trunc(damages / 2 * multipliers).astype(np.int64), 1)
+
+
+def spell_damages(spell_levels, raw_spell_damage, defense, combat_advantages, has_protection) -> np.ndarray:
+    base_damages = (raw_spell_damage + np.asarray(spell_levels, dtype=np.int64)) * 2
+    base_damages = np.where(has_protection, base_damages // 4, base_damages)
+    combat_damages = base_damages * combat_advantages
+    combat_damages = np.where(np.asarray(combat_advantages) < 0, (combat_damages + 3) // 4, combat_damages)
+    combat_damages = np.where(has_protection, 0, combat_damages)
+    return np.maximum((base_damages + combat_damages - defense) // 2, 1)
+
+
+def hit_chances(luck, is_blind, is_invisible) -> np.ndarray:
+    luck = np.asarray(luck, dtype=np.float64)
+    chances = np.divide(luck - 1, luck, out=np.zeros_like(luck), where=luck > 0)
+    chances = np.where(is_blind, chances / 2, chances)
+    return np.where(is_invisible, chances / 2, chances)
+
+
+def critical_chances(luck, is_atrocious) -> np.ndarray:
+    dividers = np.where(
+        is_atrocious,
+        PhysicalAttackExecutor.ATROCIOUS_CRITICAL_DIVIDER,
+        PhysicalAttackExecutor.NORMAL_CRITICAL_DIVIDER)
+    return (np.asarray(luck, dtype=np.int64) // dividers + 1) / PhysicalAttackExecutor.CRITICAL_CHANCE_DENOMINATOR
+
+
+class PhysicalAttackModel:
+    def __init__(self, attacker: Unit, defender: Unit):
+        damage_calculator = DamageCalculator(attacker, defender)
+        self.mp_cost = attacker.action_mp_cost(attacker.physical_attack_mp_cost)
+        self._attack = attacker.attack
+        self._defense = defender.defense
+        self._relative_height = PhysicalAttackExecutor.relative_height(attacker, defender).value
+        self._elemental_advantage = damage_calculator.physical_elemental_combat_advantage()
+        self._has_protection = damage_calculator.does_defender_have_elemental_protection_against_attacker()
+        self._hit_chance = float(hit_chances(
+            attacker.luck,
+            attacker.has_status(Statuses.Blind),
+            defender.has_status(Statuses.Invisible)))
+        self._critical_chance = float(critical_chances(attacker.luck, attacker.talents.has(Talents.Atrocious)))
+        self._is_defender_invincible = defender.has_status(Statuses.Invincible)
+        self.has_shock = defender.talents.has(Talents.ElectricShock) and not attacker.has_status(Statuses.Invincible)
+
+    def damages(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if self._is_defender_invincible:
+            return np.zeros(size, dtype=np.int64)
+        is_hit = rng.random(size) < self._hit_chance
+        is_critical = rng.random(size) < self._critical_chance
+        damage_rolls = rng.choice(DAMAGE_ROLLS_VALUES, size=size, p=DAMAGE_ROLLS_PROBABILITIES)
+        damages = physical_damages(
+            self._attack,
+            self._defense,
+            damage_rolls,
+            self._relative_height,
+            self._elemental_advantage,
+            self._has_protection,
+            is_critical)
+        return np.where(is_hit, damages, 0)
+
+
+class BattleEstimate:
+    def __init__(self, unmodelled_actions: list[str]=None):
+        self.unmodelled_actions = unmodelled_actions or []
+        self.trials = 0
+        self.wins = 0
+        self.unresolved = 0
+        self.turns_sum = 0
+        self.hp_lost_sum = 0
+
+    @property
+    def win_probability(self) -> float:
+        return self.wins / self.trials if self.trials > 0 else 0.0
+
+    @property
+    def unresolved_probability(self) -> float:
+        return self.unresolved / self.trials if self.trials > 0 else 0.0
+
+    @property
+    def expected_turns(self) -> float:
+        return self.turns_sum / self.trials if self.trials > 0 else 0.0
+
+    @property
+    def expected_hp_lost(self) -> float:
+        return self.hp_lost_sum / self.trials if self.trials > 0 else 0.0
+
+    def to_string(self) -> str:
+        string = f'win: {self.win_probability:.2%}, turns: {self.expected_turns:.2f}, ' \
+            f'HP lost: {self.expected_hp_lost:.2f}, unresolved: {self.unresolved_probability:.2%}'
+        if len(self.unmodelled_actions) > 0:
+            string += f', not modelled: {", ".join(self.unmodelled_actions)}'
+        return string
+
+
+class BattleEstimator:
+    BATCH_SIZE = 1 << 20
+    MAX_TURNS = 200
+
+    def __init__(self, familiar: Unit, enemy: Unit):
+        self._familiar = familiar
+        self._enemy = enemy
+        self._turn_order = self._select_turn_order()
+        self._familiar_attack = PhysicalAttackModel(familiar, enemy)
+        self._enemy_attack = PhysicalAttackModel(enemy, familiar)
+        self._enemy_actions = self._enemy_actions_descriptors()
+
+    @classmethod
+    def for_monster(cls, familiar: Unit, monster_traits: UnitTraits, monster_level: int, levels: Levels):
+        monster_traits = monster_traits.copy()
+        monster_traits.talents &= ~StateMachineContext.ENEMY_FORBIDDEN_TALENTS
+        return cls(familiar, UnitCreator(monster_traits).create(min(monster_level, levels.max_level), levels=levels))
+
+    @property
+    def enemy(self) -> Unit:
+        return self._enemy
+
+    @property
+    def unmodelled_enemy_actions(self) -> list[str]:
+        return [name for _, _, perform_action, name in self._enemy_actions if perform_action is None]
+
+    def _select_turn_order(self) -> tuple[bool, ...]:
+        is_familiar_quick = self._familiar.talents.has(Talents.Quick)
+        is_enemy_quick = self._enemy.talents.has(Talents.Quick)
+        if is_familiar_quick and not is_enemy_quick:
+            return True, True, False
+        if is_enemy_quick and not is_familiar_quick:
+            return True, False, False
+        return True, False
+
+    def _enemy_actions_descriptors(self) -> list[tuple[int, int, object, str]]:
+        enemy = self._enemy
+        action_weights = enemy.traits.action_weights
+        actions = [(
+            action_weights.physical_attack,
+            self._enemy_attack.mp_cost,
+            self._enemy_physical_attack,
+            'physical attack')]
+        if enemy.has_spell() and not enemy.has_status(Statuses.Seal):
+            actions.append((
+                action_weights.spell,
+                enemy.action_mp_cost(enemy.spell_mp_cost),
+                self._enemy_spell_cast if isinstance(enemy.spell_traits.handler, DamageSpellHandler) else None,
+                enemy.spell_traits.name))
+        if enemy.has_ability():
+            actions.append((
+                action_weights.ability,
+                enemy.action_mp_cost(enemy.ability.mp_cost),
+                None,
+                enemy.ability.name))
+        return [action for action in actions if action[0] > 0]
+
+    def _enemy_physical_attack(self, acting, familiar_hp, enemy_hp, rng: np.random.Generator):
+        self._perform_physical_attack(self._enemy_attack, acting, enemy_hp, familiar_hp, rng)
+
+    def _enemy_spell_cast(self, acting, familiar_hp, enemy_hp, rng: np.random.Generator):
+        if self._familiar.has_status(Statuses.Invincible):
+            return
+        damage_calculator = DamageCalculator(self._enemy, self._familiar)
+        familiar_hp[acting] -= spell_damages(
+            self._enemy.spell_level,
+            self._enemy.spell_traits.handler.raw_spell_damage,
+            self._familiar.defense,
+            damage_calculator.spell_combat_advantage(),
+            damage_calculator.does_defender_have_elemental_protection_against_attacker())
+
+    def _perform_physical_attack(
+            self,
+            attack_model: PhysicalAttackModel,
+            acting,
+            attacker_hp,
+            defender_hp,
+            rng: np.random.Generator):
+        damages = attack_model.damages(rng, len(acting))
+        defender_hp[acting] -= damages
+        if attack_model.has_shock:
+            attacker_hp[acting] -= np.where(damages > 0, np.maximum(damages // 4, 1), 0)
+
+    def estimate(self, trials: int, rng: np.random.Generator=None, max_turns: int=MAX_TURNS) -> BattleEstimate:
+        rng = rng or np.random.default_rng()
+        estimate = BattleEstimate(self.unmodelled_enemy_actions)
+        while estimate.trials < trials:
+            self._simulate_batch(min(self.BATCH_SIZE, trials - estimate.trials), rng, max_turns, estimate)
+        return estimate
+
+    def _simulate_batch(self, size: int, rng: np.random.Generator, max_turns: int, estimate: BattleEstimate):
+        familiar_hp = np.full(size, self._familiar.hp, dtype=np.int64)
+        familiar_mp = np.full(size, self._familiar.mp, dtype=np.int64)
+        enemy_hp = np.full(size, self._enemy.hp, dtype=np.int64)
+        enemy_mp = np.full(size, self._enemy.mp, dtype=np.int64)
+        turns = np.full(size, max_turns, dtype=np.int64)
+        active = np.arange(size)
+        for turn in range(max_turns):
+            if len(active) == 0:
+                break
+            if self._turn_order[turn % len(self._turn_order)]:
+                self._familiar_turn(active, familiar_hp, familiar_mp, enemy_hp, rng)
+            else:
+                self._enemy_turn(active, familiar_hp, enemy_hp, enemy_mp, rng)
+            is_finished = (familiar_hp[active] <= 0) | (enemy_hp[active] <= 0)
+            turns[active[is_finished]] = turn + 1
+            active = active[~is_finished]
+        is_won = (enemy_hp <= 0) & (familiar_hp > 0)
+        estimate.trials += size
+        estimate.wins += int(np.count_nonzero(is_won))
+        estimate.unresolved += len(active)
+        estimate.turns_sum += int(turns.sum())
+        estimate.hp_lost_sum += int((self._familiar.hp - np.maximum(familiar_hp, 0)).sum())
+
+    def _familiar_turn(self, active, familiar_hp, familiar_mp, enemy_hp, rng: np.random.Generator):
+        acting = active[familiar_mp[active] >= self._familiar_attack.mp_cost]
+        familiar_mp[acting] -= self._familiar_attack.mp_cost
+        self._perform_physical_attack(self._familiar_attack, acting, familiar_hp, enemy_hp, rng)
+
+    def _enemy_turn(self, active, familiar_hp, enemy_hp, enemy_mp, rng: np.random.Generator):
+        if len(self._enemy_actions) == 0:
+            return
+        weights = np.array([
+            np.where(enemy_mp[active] >= mp_cost, weight, 0)
+            for weight, mp_cost, _, _
+            in self._enemy_actions])
+        cumulative_weights = np.cumsum(weights, axis=0)
+        selections = rng.random(len(active)) * cumulative_weights[-1]
+        selected_actions = (selections[np.newaxis, :] >= cumulative_weights).sum(axis=0)
+        can_act = cumulative_weights[-1] > 0
+        for action_index, (_, mp_cost, perform_action, _) in enumerate(self._enemy_actions):
+            acting = active[(selected_actions == action_index) & can_act]
+            enemy_mp[acting] -= mp_cost
+            if perform_action is not None:
+                perform_action(acting, familiar_hp, enemy_hp, rng)
+
+
+def sweep_floors(game_config: Config, familiar: Unit, trials: int, rng: np.random.Generator=None):
+    rng = rng or np.random.default_rng()
+    for floor, floor_descriptor in enumerate(game_config.floors):
+        for monster in floor_descriptor.monsters:
+            estimator = BattleEstimator.for_monster(
+                familiar,
+                game_config.monsters_traits[monster.name],
+                monster.level,
+                game_config.levels)
+            yield floor, monster, estimator.estimate(trials, rng)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Estimates battles in which the familiar only uses physical attacks. Enemy abilities and '
+        'spells other than damage spells are modelled as turns without effect.')
+    parser.add_argument('curry_quest_config', type=argparse.FileType('r'))
+    parser.add_argument('familiar')
+    parser.add_argument('level', type=int)
+    parser.add_argument('-n', '--trials', type=int, default=100000)
+    parser.add_argument('-s', '--seed', type=int)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    game_config = Config.Parser(args.curry_quest_config).parse()
+    familiar = UnitCreator(game_config.monsters_traits[args.familiar]).create(args.level, levels=game_config.levels)
+    for floor, monster, estimate in sweep_floors(game_config, familiar, args.trials, np.random.default_rng(args.seed)):
+        print(f'{floor + 1}F LVL {monster.level} {monster.name}: {estimate.to_string()}')
+
+
+if __name__ == '__main__':
+    main()
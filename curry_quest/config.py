@@ -1,16 +1,18 @@
 from json_config_parser import JsonConfigParser
 from collections.abc import Mapping, Sequence
+from types import MappingProxyType
 from curry_quest.abilities import Abilities
 from curry_quest.floor_descriptor import FloorDescriptor, Monster
 from curry_quest.genus import Genus
-from curry_quest.items import all_items
+from curry_quest.items import Items
 from curry_quest.jsonable import JsonReaderHelper
 from curry_quest.levels_config import Levels
 from curry_quest.spells import Spells
 from curry_quest.talents import Talents
+from curry_quest.unit_prototypes import UnitPrototypes
 from curry_quest.unit_traits import UnitTraits
 from curry_quest.weight import StaticWeight, LevelProratedWeight, FloorProgressionProratedWeight, \
-    MaxWeightPenaltyHandler, StaticWeightPenaltyHandler
+    MaxWeightPenaltyHandler, StaticWeightPenaltyHandler, WeightTable
 
 
 class Config:
@@ -39,6 +41,41 @@ class Config:
         def __init__(self):
             self.ghosh = UnitTraits()
 
+    class WeightTables:
+        EVENT_KEY_SUFFIX = '_event'
+
+        def __init__(self, config):
+            self.events = WeightTable(
+                dict((key + self.EVENT_KEY_SUFFIX, descriptor) for key, descriptor in config.events_weights.items()))
+            found_items = [item for item in Items.all() if item.name in config.found_items_weights]
+            self.found_items = WeightTable(
+                dict((item.name, config.found_items_weights[item.name]) for item in found_items),
+                offset=self.events.end,
+                elements=found_items)
+            self.characters = WeightTable(config.character_events_weights, offset=self.found_items.end)
+            self.traps = WeightTable(config.traps_weights, offset=self.characters.end)
+
+        @property
+        def size(self) -> int:
+            return self.traps.end
+
+    class Indexes:
+        def __init__(self, config):
+            monsters_traits = config.monsters_traits
+            self.lowercase_monsters_traits = MappingProxyType(dict(
+                (monster_name.lower(), monster_traits)
+                for monster_name, monster_traits
+                in monsters_traits.items()))
+            self.non_evolved_monsters_traits = MappingProxyType(dict(
+                (monster_traits.name, monster_traits)
+                for monster_traits
+                in monsters_traits.values()
+                if not monster_traits.is_evolved))
+            all_units_traits = dict(monsters_traits)
+            ghosh_traits = config.special_units_traits.ghosh
+            all_units_traits[ghosh_traits.name] = ghosh_traits
+            self.all_units_traits = MappingProxyType(all_units_traits)
+
     class WeightRange:
         def __init__(self, start, end):
             self.start = start
@@ -64,6 +101,9 @@ class Config:
         self._monsters_traits = {}
         self._special_units_traits = self.SpecialUnitsTraits()
         self._floors = []
+        self._unit_prototypes = UnitPrototypes(self._levels)
+        self._weight_tables = None
+        self._indexes = None
 
     @property
     def timers(self):
@@ -91,12 +131,10 @@ class Config:
 
     @property
     def non_evolved_monster_traits(self) -> Mapping[str, UnitTraits]:
-        monsters_traits = self.monsters_traits
-        return dict(
-            (monster_traits.name, monster_traits)
-            for monster_traits
-            in monsters_traits.values()
-            if not monster_traits.is_evolved)
+        return self._get_indexes().non_evolved_monsters_traits
+
+    def find_monster_traits(self, monster_name: str) -> UnitTraits:
+        return self._get_indexes().lowercase_monsters_traits.get(monster_name.lower())
 
     @property
     def special_units_traits(self):
@@ -104,16 +142,31 @@ class Config:
 
     @property
     def all_units_traits(self) -> Mapping[str, UnitTraits]:
-        all_units_traits = {}
-        all_units_traits.update(self.monsters_traits)
-        ghosh_traits = self.special_units_traits.ghosh
-        all_units_traits[ghosh_traits.name] = ghosh_traits
-        return all_units_traits
+        return self._get_indexes().all_units_traits
+
+    def _get_indexes(self) -> Indexes:
+        if self._indexes is None:
+            self._indexes = self.Indexes(self)
+        return self._indexes
+
+    def build_indexes(self):
+        self._indexes = self.Indexes(self)
+        self._weight_tables = self.WeightTables(self)
 
     @property
     def floors(self) -> Sequence[FloorDescriptor]:
         return self._floors
 
+    @property
+    def unit_prototypes(self) -> UnitPrototypes:
+        return self._unit_prototypes
+
+    @property
+    def weight_tables(self) -> WeightTables:
+        if self._weight_tables is None:
+            self._weight_tables = self.WeightTables(self)
+        return self._weight_tables
+
     @property
     def highest_floor(self) -> int:
         return len(self._floors) - 1
@@ -138,6 +191,7 @@ class Config:
             self._read_monsters_traits()
             self._read_special_units_traits()
             self._read_floors()
+            self._config.build_indexes()
 
         def _read_timers(self):
             timers = self._config._timers
@@ -343,6 +397,7 @@ class Config:
                         monster_json['weight'])
             except KeyError as exc:
                 raise self.InvalidConfig(f"{floor_json}: missing key {exc}")
+            floor.compile_spawn_table(self._config.monsters_traits)
             return floor
 
         def _validate_config(self):
@@ -382,7 +437,7 @@ class Config:
             self._validate_weights_dictionary(
                 'found_items_weights',
                 self._config.found_items_weights,
-                [item.name for item in all_items()])
+                [item.name for item in Items.all()])
 
         def _validate_characters_events_weights(self):
             self._validate_weights_dictionary(
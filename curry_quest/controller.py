@@ -1,9 +1,11 @@
-import asyncio
 from curry_quest import commands
 from curry_quest.config import Config
+from curry_quest.event_targets import EventTargets
 from curry_quest.hall_of_fame import HallsOfFameHandler, SmallestTurnsNumberRecord
+from curry_quest.player_state_machines import PlayerStateMachines
 from curry_quest.records import Records
 from curry_quest.records_events_handler import RecordsEventsHandler
+from curry_quest.scheduler import ScheduledTimer
 from curry_quest.services import Services
 from curry_quest.state_machine import StateMachine, StateMachineContext
 from curry_quest.state_machine_action import StateMachineAction
@@ -50,18 +52,31 @@ class Controller:
             game_config: Config,
             halls_of_fame_handler: HallsOfFameHandler,
             states_files_handler: StateFilesHandler,
-            services: Services=None):
+            services: Services=None,
+            max_resident_players: int=None):
         self._game_config = game_config
         self._halls_of_fame_handler = halls_of_fame_handler
         self._states_files_handler = states_files_handler
         self._services = services or Services()
         self._rng = self._services.rng()
-        self._event_timer: asyncio.Task = None
+        self._event_timer: ScheduledTimer = None
         self.set_response_event_handler(lambda _: None)
-        self._player_state_machines: dict[int, StateMachine] = self._states_files_handler.load(self._game_config)
-        for player_state_machine in self._player_state_machines.values():
-            player_state_machine.set_autonomous_action_result_handler(self._handle_action_result)
-            self._set_records_events_handler(player_state_machine)
+        self._player_state_machines = PlayerStateMachines(
+            self._states_files_handler,
+            self._game_config,
+            self._setup_player_state_machine,
+            max_resident_players)
+        self._event_targets = EventTargets(
+            self._game_config.player_selection_weights.without_penalty,
+            self._game_config.player_selection_weights.with_penalty)
+        for player_id in self._player_state_machines.player_ids():
+            self._event_targets.update(player_id, self._player_state_machines.is_waiting_for_event(player_id))
+
+    def _setup_player_state_machine(self, player_id: int, player_state_machine: StateMachine):
+        player_state_machine.set_services(self._services)
+        player_state_machine.set_autonomous_action_result_handler(self._handle_action_result)
+        self._set_records_events_handler(player_state_machine)
+        self._update_event_target(player_id, player_state_machine)
 
     def _set_records_events_handler(self, player_state_machine: StateMachine):
         player_state_machine.set_records_events_handler(
@@ -100,7 +115,7 @@ class Controller:
         return StateMachineAction(command, args)
 
     def handle_admin_action(self, player_id: int, command: str, args: str):
-        if not self._does_player_exist(player_id):
+        if self._player_state_machines.get(player_id) is None:
             return False
         self._handle_action(player_id, self._admin_action(command, args))
         return True
@@ -111,18 +126,32 @@ class Controller:
     def _handle_action(self, player_id: int, action: StateMachineAction, player_name: str=None):
         if self._handle_generic_command(player_id, action):
             return
-        if not self._does_player_exist(player_id):
+        player_state_machine = self._player_state_machines.get(player_id)
+        if player_state_machine is None:
+            self._event_targets.discard(player_id)
             return
-        player_state_machine = self._player_state_machine(player_id)
-        if player_name is not None:
+        is_player_name_changed = player_name is not None and player_name != player_state_machine.player_name
+        if is_player_name_changed:
             player_state_machine.player_name = player_name
+        is_mutating_action = player_state_machine.is_mutating_action(action)
         responses = player_state_machine.on_action(action)
-        self._handle_action_result(player_id, responses)
+        self._handle_action_result(player_id, responses, save_state=is_mutating_action or is_player_name_changed)
 
-    def _handle_action_result(self, player_id: int, responses: list[str]):
+    def _handle_action_result(self, player_id: int, responses: list[str], save_state: bool=True):
+        self._update_event_target(player_id, self._player_state_machines.get(player_id))
         if len(responses) > 0:
             self._send_response(player_id, responses)
-        self._save_player_state(player_id)
+        if save_state:
+            self._save_player_state(player_id)
+
+    def _update_event_target(self, player_id: int, state_machine: StateMachine):
+        if state_machine is None:
+            self._event_targets.discard(player_id)
+            return
+        self._event_targets.update(
+            player_id,
+            state_machine.is_waiting_for_event(),
+            state_machine.event_selection_penalty_end_dt if state_machine.has_event_selection_penalty() else None)
 
     def _handle_generic_command(self, player_id: int, action: StateMachineAction):
         command = action.command
@@ -156,9 +185,10 @@ class Controller:
         self._states_files_handler.save(self._player_state_machine(player_id))
 
     def _player_state_machine(self, player_id: int) -> StateMachine:
-        if not self._does_player_exist(player_id):
+        player_state_machine = self._player_state_machines.get(player_id)
+        if player_state_machine is None:
             raise self.PlayerDoesNotExist(player_id)
-        return self._player_state_machines[player_id]
+        return player_state_machine
 
     def _does_player_exist(self, player_id: int) -> bool:
         return player_id in self._player_state_machines
@@ -167,9 +197,9 @@ class Controller:
         if self._does_player_exist(player_id):
             self._send_response(player_id, ["You already joined the Curry Quest."])
             return
-        state_machine = StateMachine(self._game_config, player_id, player_name)
-        self._set_records_events_handler(state_machine)
-        self._player_state_machines[player_id] = state_machine
+        self._player_state_machines.add(
+            player_id,
+            StateMachine(self._game_config, player_id, player_name, self._services))
         self._handle_action(player_id, self._admin_action(commands.STARTED))
 
     def _is_game_started(self, player_id: int) -> bool:
@@ -179,29 +209,35 @@ class Controller:
         if not self._does_player_exist(player_id):
             self._send_response(player_id, ["You are not part of Curry Quest."])
             return
-        del self._player_state_machines[player_id]
+        self._player_state_machines.remove(player_id)
+        self._event_targets.discard(player_id)
         self._states_files_handler.delete(player_id)
         self._send_response(player_id, ["You were removed from Curry Quest."])
 
     def start_timers(self):
         self._start_event_timer()
-        for player_state_machine in self._player_state_machines.values():
-            player_state_machine.handle_delayed_action()
+        for player_id in self._player_state_machines.players_with_delayed_actions():
+            self._player_state_machine(player_id).handle_delayed_action()
 
     def _stop_timers(self):
         self._cancel_timer(self._event_timer)
 
+    def shutdown(self):
+        self._stop_timers()
+        self._states_files_handler.flush()
+
     def _start_event_timer(self):
         self._cancel_timer(self._event_timer)
         self._event_timer = self._services.timer('Event', self._event_interval, self._handle_event_timer_expiry)
 
-    def _cancel_timer(self, timer: asyncio.Task):
+    def _cancel_timer(self, timer: ScheduledTimer):
         if timer is not None and not timer.done():
             timer.cancel()
 
     def _handle_event_timer_expiry(self):
         self._event_timer = None
         logger.info(f"Event timer expired")
+        self._log_scheduler_metrics()
         self._start_event_timer()
         try:
             player_id = self._select_player_for_event()
@@ -211,34 +247,20 @@ class Controller:
         event_command = commands.GENERATE_EVENT if self._is_game_started(player_id) else commands.STARTED
         self._handle_action(player_id, self._admin_action(event_command))
 
+    def _log_scheduler_metrics(self):
+        scheduler = self._services.scheduler
+        logger.debug(
+            f"Scheduler queue depth: {scheduler.queue_depth}, "
+            f"last lag: {scheduler.last_lag:.3f}s, max lag: {scheduler.max_lag:.3f}s.")
+
     def _select_player_for_event(self) -> int:
-        eligible_players = self._event_eligible_players()
-        if len(eligible_players) == 0:
+        self._expire_event_selection_penalties()
+        player_id = self._event_targets.select(self._rng)
+        if player_id is None:
             raise self.NoPlayerForEvent()
-        players_weights = [self._player_event_weight(player_name) for player_name in eligible_players]
-        return self._rng.choices(eligible_players, players_weights)[0]
-
-    def _event_eligible_players(self) -> list[str]:
-        def is_event_eligible_player(player_id: int) -> bool:
-            return self._is_player_waiting_for_event(player_id)
-
-        return list(filter(is_event_eligible_player, self._player_state_machines.keys()))
-
-    def _is_player_waiting_for_event(self, player_id) -> bool:
-        return self._player_state_machine(player_id).is_waiting_for_event()
-
-    def _player_event_weight(self, player_id: int) -> int:
-        self._update_event_selection_penalty(player_id)
-        state_machine = self._player_state_machine(player_id)
-        player_selection_weights = self._game_config.player_selection_weights
-        if state_machine.has_event_selection_penalty():
-            return player_selection_weights.with_penalty
-        else:
-            return player_selection_weights.without_penalty
-
-    def _update_event_selection_penalty(self, player_id):
-        state_machine = self._player_state_machine(player_id)
-        if not state_machine.has_event_selection_penalty():
-            return
-        if self._services.now() > state_machine.event_selection_penalty_end_dt:
-            state_machine.clear_event_selection_penalty()
+        return player_id
+
+    def _expire_event_selection_penalties(self):
+        for player_id in self._event_targets.expire_penalties(self._services.now()):
+            if self._player_state_machines.is_loaded(player_id):
+                self._player_state_machine(player_id).clear_event_selection_penalty()
@@ -19,6 +19,9 @@ class CurryQuest:
         self._controller.set_response_event_handler(send_message_function)
         self._controller.start_timers()
 
+    def stop(self):
+        self._controller.shutdown()
+
     def is_curry_quest_message(self, message: Message):
         message_channel_id = self._message_channel_id(message)
         return message_channel_id == self._bot_config.channel_id or \
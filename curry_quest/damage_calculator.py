@@ -28,6 +28,7 @@ class DamageCalculator:
         Genus.Water: Statuses.WindProtection,
         Genus.Wind: Statuses.FireProtection
     }
+    CRITICAL_HIT_MULTIPLIER = 1.5
 
     def __init__(self, attacker: Unit, defender: Unit):
         self._attacker = attacker
@@ -42,17 +43,17 @@ class DamageCalculator:
         base_damage = 2 * self._attacker.attack + damage_roll.value
         base_damage += 2 * weapon_damage
         combat_advantage = relative_height.value
-        if self._does_defender_has_elemental_protection_against_attacker():
+        if self.does_defender_have_elemental_protection_against_attacker():
             base_damage //= 4
         else:
-            combat_advantage += self._physical_elemental_combat_advantage()
+            combat_advantage += self.physical_elemental_combat_advantage()
         damage_dealt = base_damage + (base_damage * combat_advantage // 8) - self._base_defense()
         damage_dealt = int(damage_dealt / 2 * self._critical_hit_multiplier(is_critical))
         return max(damage_dealt, 1)
 
     def spell_damage(self, raw_spell_damage) -> int:
         base_damage = (raw_spell_damage + self._attacker.spell_level) * 2
-        if self._does_defender_has_elemental_protection_against_attacker():
+        if self.does_defender_have_elemental_protection_against_attacker():
             base_damage //= 4
             combat_damage = 0
         else:
@@ -60,7 +61,7 @@ class DamageCalculator:
         damage_dealt = int((base_damage + combat_damage - self._base_defense()) // 2)
         return max(damage_dealt, 1)
 
-    def _does_defender_has_elemental_protection_against_attacker(self):
+    def does_defender_have_elemental_protection_against_attacker(self) -> bool:
         necessary_protection_status = self.GENUS_PROTECTION_STATUS_MAPPING.get(self._attacker.genus)
         if necessary_protection_status is not None:
             return self._defender.has_status(necessary_protection_status)
@@ -70,7 +71,7 @@ class DamageCalculator:
     def _base_defense(self):
         return self._defender.defense
 
-    def _physical_elemental_combat_advantage(self):
+    def physical_elemental_combat_advantage(self) -> int:
         if self._attacker.genus.is_strong_against(self._defender.genus):
             return 1
         elif self._attacker.genus.is_weak_against(self._defender.genus):
@@ -79,13 +80,13 @@ class DamageCalculator:
             return 0
 
     def _spell_combat_damage(self, base_damage):
-        combat_advantage = self._spell_combat_advantage()
+        combat_advantage = self.spell_combat_advantage()
         combat_damage = base_damage * combat_advantage
         if combat_advantage < 0:
             combat_damage = (combat_damage + 3) // 4
         return combat_damage
 
-    def _spell_combat_advantage(self):
+    def spell_combat_advantage(self) -> int:
         if self._attacker.genus.is_strong_against(self._defender.genus):
             return 1
         elif self._attacker.genus.is_weak_against(self._defender.genus):
@@ -94,4 +95,4 @@ class DamageCalculator:
             return 0
 
     def _critical_hit_multiplier(self, is_critical: bool) -> float:
-        return 1.5 if is_critical else 1.0
+        return self.CRITICAL_HIT_MULTIPLIER if is_critical else 1.0
@@ -0,0 +1,146 @@
+import datetime
+import heapq
+import math
+import random
+
+
+class FenwickTree:
+    def __init__(self, size: int=0):
+        self._weights = [0] * size
+        self._tree = [0] * (size + 1)
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    @property
+    def total(self) -> int:
+        return self.prefix_sum(len(self._weights))
+
+    def weight(self, index: int) -> int:
+        return self._weights[index]
+
+    def set(self, index: int, weight: int):
+        delta = weight - self._weights[index]
+        if delta == 0:
+            return
+        self._weights[index] = weight
+        tree_index = index + 1
+        while tree_index < len(self._tree):
+            self._tree[tree_index] += delta
+            tree_index += tree_index & -tree_index
+
+    def prefix_sum(self, count: int) -> int:
+        prefix_sum = 0
+        while count > 0:
+            prefix_sum += self._tree[count]
+            count -= count & -count
+        return prefix_sum
+
+    def find(self, value) -> int:
+        value = min(value, math.nextafter(self.total, 0))
+        index = 0
+        bit = 1 << (len(self._tree) - 1).bit_length()
+        while bit > 0:
+            next_index = index + bit
+            if next_index < len(self._tree) and self._tree[next_index] <= value:
+                index = next_index
+                value -= self._tree[next_index]
+            bit >>= 1
+        return min(index, len(self._weights) - 1)
+
+    def resize(self, size: int):
+        weights = self._weights + [0] * (size - len(self._weights))
+        self._weights = [0] * size
+        self._tree = [0] * (size + 1)
+        for index, weight in enumerate(weights):
+            self.set(index, weight)
+
+
+class EventTargets:
+    INITIAL_CAPACITY = 16
+
+    def __init__(self, weight_without_penalty: int, weight_with_penalty: int):
+        self._weight_without_penalty = weight_without_penalty
+        self._weight_with_penalty = weight_with_penalty
+        self._weights = FenwickTree(self.INITIAL_CAPACITY)
+        self._slots: dict[int, int] = {}
+        self._slots_players: list[int] = [None] * self.INITIAL_CAPACITY
+        self._free_slots = list(reversed(range(self.INITIAL_CAPACITY)))
+        self._penalties_end_dts: dict[int, datetime.datetime] = {}
+        self._penalties_expirations: list[tuple[datetime.datetime, int]] = []
+
+    def __contains__(self, player_id: int) -> bool:
+        return player_id in self._slots
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def player_ids(self) -> list[int]:
+        return list(self._slots.keys())
+
+    def weight(self, player_id: int) -> int:
+        slot = self._slots.get(player_id)
+        return 0 if slot is None else self._weights.weight(slot)
+
+    @property
+    def total_weight(self) -> int:
+        return self._weights.total
+
+    def has_penalty(self, player_id: int) -> bool:
+        return player_id in self._penalties_end_dts
+
+    def update(self, player_id: int, is_waiting_for_event: bool, penalty_end_dt: datetime.datetime=None):
+        if not is_waiting_for_event:
+            self.discard(player_id)
+            return
+        if penalty_end_dt is None:
+            self._penalties_end_dts.pop(player_id, None)
+            weight = self._weight_without_penalty
+        else:
+            if self._penalties_end_dts.get(player_id) != penalty_end_dt:
+                self._penalties_end_dts[player_id] = penalty_end_dt
+                heapq.heappush(self._penalties_expirations, (penalty_end_dt, player_id))
+            weight = self._weight_with_penalty
+        self._weights.set(self._slot(player_id), weight)
+
+    def discard(self, player_id: int):
+        slot = self._slots.pop(player_id, None)
+        self._penalties_end_dts.pop(player_id, None)
+        if slot is None:
+            return
+        self._weights.set(slot, 0)
+        self._slots_players[slot] = None
+        self._free_slots.append(slot)
+
+    def _slot(self, player_id: int) -> int:
+        slot = self._slots.get(player_id)
+        if slot is not None:
+            return slot
+        if len(self._free_slots) == 0:
+            self._grow()
+        slot = self._free_slots.pop()
+        self._slots[player_id] = slot
+        self._slots_players[slot] = player_id
+        return slot
+
+    def _grow(self):
+        capacity = len(self._weights)
+        self._weights.resize(capacity * 2)
+        self._slots_players.extend([None] * capacity)
+        self._free_slots.extend(reversed(range(capacity, capacity * 2)))
+
+    def expire_penalties(self, now: datetime.datetime) -> list[int]:
+        expired_player_ids = []
+        while len(self._penalties_expirations) > 0 and now > self._penalties_expirations[0][0]:
+            penalty_end_dt, player_id = heapq.heappop(self._penalties_expirations)
+            if self._penalties_end_dts.get(player_id) != penalty_end_dt:
+                continue
+            self.update(player_id, is_waiting_for_event=True)
+            expired_player_ids.append(player_id)
+        return expired_player_ids
+
+    def select(self, rng: random.Random) -> int:
+        total_weight = self._weights.total
+        if total_weight <= 0:
+            return None
+        return self._slots_players[self._weights.find(rng.random() * total_weight)]
@@ -1,3 +1,8 @@
+from collections.abc import Mapping
+from curry_quest.unit_traits import UnitTraits
+from curry_quest.weight import WeightedSampler
+
+
 class Monster:
     def __init__(self, name: str, level: int):
         self._name = name
@@ -12,10 +17,41 @@ class Monster:
         return self._level
 
 
+class SpawnTable:
+    class Entry:
+        def __init__(self, monster: Monster, traits: UnitTraits):
+            self._monster = monster
+            self._traits = traits
+
+        @property
+        def monster(self) -> Monster:
+            return self._monster
+
+        @property
+        def level(self) -> int:
+            return self._monster.level
+
+        @property
+        def traits(self) -> UnitTraits:
+            return self._traits
+
+    def __init__(self, monsters: list[Monster], weights: list[int], monsters_traits: Mapping[str, UnitTraits]):
+        self._entries = tuple(self.Entry(monster, monsters_traits.get(monster.name)) for monster in monsters)
+        self._sampler = WeightedSampler(self._entries, weights)
+
+    @property
+    def entries(self) -> tuple[Entry, ...]:
+        return self._entries
+
+    def select(self, rng) -> Entry:
+        return self._sampler.select(rng)
+
+
 class FloorDescriptor:
     def __init__(self):
         self._monsters = []
         self._weights = []
+        self._spawn_table: SpawnTable = None
 
     @property
     def monsters(self):
@@ -25,6 +61,14 @@ class FloorDescriptor:
     def weights(self):
         return self._weights
 
+    @property
+    def spawn_table(self) -> SpawnTable:
+        return self._spawn_table
+
     def add_monster(self, monster: Monster, weight: int):
         self._monsters.append(monster)
         self._weights.append(weight)
+        self._spawn_table = None
+
+    def compile_spawn_table(self, monsters_traits: Mapping[str, UnitTraits]):
+        self._spawn_table = SpawnTable(self._monsters, self._weights, monsters_traits)
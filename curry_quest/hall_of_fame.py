@@ -1,7 +1,9 @@
 from abc import abstractmethod, ABC
 from curry_quest.jsonable import Jsonable, JsonReaderHelper, InvalidJson
+from curry_quest.persistence_writer import PersistenceWriter
 import json
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -122,6 +124,7 @@ class HallOfFame:
 class HallsOfFameHandler(Jsonable):
     ANY_PERCENT = 'any%'
     EQ_PERCENT = 'eq%'
+    WRITER_KEY = 0
     ALL_HALLS_OF_FAME = {
         SmallestTurnsNumberRecord: [ANY_PERCENT, EQ_PERCENT]
     }
@@ -172,16 +175,24 @@ class HallsOfFameHandler(Jsonable):
         raise ValueError(error_message)
 
     @classmethod
-    def from_file(cls, halls_of_fame_file_path):
-        def _save_halls_of_fame(halls_of_fame_handler):
-            logger.info(f"Saving Halls of Fame to '{halls_of_fame_file_path}' file.")
+    def from_file(cls, halls_of_fame_file_path, writer: PersistenceWriter=None):
+        writer = writer or PersistenceWriter()
+
+        def _write_halls_of_fame(halls_of_fame_string):
+            temporary_halls_of_fame_file_path = halls_of_fame_file_path + '.tmp'
             try:
-                with open(halls_of_fame_file_path, 'w') as f:
-                    f.write(json.dumps(halls_of_fame_handler.to_json_object(), indent=2))
+                with open(temporary_halls_of_fame_file_path, 'w') as f:
+                    f.write(halls_of_fame_string)
+                os.replace(temporary_halls_of_fame_file_path, halls_of_fame_file_path)
                 logger.info(f"Halls of Fame saved to '{halls_of_fame_file_path}' file.")
             except IOError as exc:
                 logger.warning(f"Could not save Halls of Fame. {exc}.")
 
+        def _save_halls_of_fame(halls_of_fame_handler):
+            logger.info(f"Saving Halls of Fame to '{halls_of_fame_file_path}' file.")
+            halls_of_fame_string = json.dumps(halls_of_fame_handler.to_json_object(), indent=2)
+            writer.submit(cls.WRITER_KEY, lambda: _write_halls_of_fame(halls_of_fame_string))
+
         halls_of_fame_handler = HallsOfFameHandler(_save_halls_of_fame)
         logger.info(f"Loading Halls of Fame from '{halls_of_fame_file_path}' file.")
         try:
@@ -1,15 +1,21 @@
+from array import array
 from curry_quest.errors import InvalidOperation
-from curry_quest.items import normalize_item_name, Item, ItemJsonLoader
+from curry_quest.items import normalize_item_name, Item, ItemJsonLoader, Items
 from curry_quest.jsonable import Jsonable
 
 
 class Inventory(Jsonable):
     def __init__(self, capacity=5):
         self._capacity = capacity
-        self._items: list[Item] = []
+        self._items_ids = array('B')
+
+    def clone(self) -> '__class__':
+        inventory = self.__class__(self._capacity)
+        inventory._items_ids = array('B', self._items_ids)
+        return inventory
 
     def to_json_object(self):
-        return [item.to_json_object() for item in self._items]
+        return [Items.item(item_id).to_json_object() for item_id in self._items_ids]
 
     def from_json_object(self, json_objects_list):
         self.clear()
@@ -22,11 +28,11 @@ class Inventory(Jsonable):
 
     @property
     def size(self) -> int:
-        return len(self._items)
+        return len(self._items_ids)
 
     @property
     def items(self) -> list[str]:
-        return [item.name for item in self._items]
+        return [Items.item(item_id).name for item_id in self._items_ids]
 
     def is_empty(self) -> bool:
         return self.size == 0
@@ -35,18 +41,22 @@ class Inventory(Jsonable):
         return self.size >= self._capacity
 
     def clear(self):
-        self._items.clear()
+        del self._items_ids[:]
 
     def add_item(self, item: Item):
+        item_id = Items.item_id(item)
+        if item_id is None:
+            raise ValueError(f"{item.name} is not a registered item.")
         if self.is_full():
             raise InvalidOperation(f"Inventory is full. Cannot add {item.name}.")
-        self._items.append(item)
+        self._items_ids.append(item_id)
 
     def find_item(self, name) -> (int, Item):
         searched_item_name = normalize_item_name(name)
         if len(searched_item_name) == 0:
             raise ValueError()
-        for index, item in enumerate(self._items):
+        for index, item_id in enumerate(self._items_ids):
+            item = Items.item(item_id)
             if item.matches_normalized_name(searched_item_name):
                 return index, item
         raise ValueError()
@@ -55,9 +65,9 @@ class Inventory(Jsonable):
         if index >= self.size:
             raise InvalidOperation(
                 f"No item at index {index}. Inventory size: {self.size}.")
-        return self._items[index]
+        return Items.item(self._items_ids[index])
 
     def take_item(self, index) -> Item:
         item = self.peek_item(index)
-        self._items.pop(index)
+        self._items_ids.pop(index)
         return item
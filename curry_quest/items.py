@@ -1,4 +1,5 @@
 from abc import abstractmethod
+from types import MappingProxyType
 from curry_quest.genus import Genus
 from curry_quest.jsonable import InvalidJson, Jsonable, JsonReaderHelper
 from curry_quest.statuses import Statuses
@@ -258,14 +259,67 @@ class ItemJsonLoader:
     def from_json_object(cls, json_object):
         json_reader_helper = JsonReaderHelper(json_object)
         item_name = json_reader_helper.read_string('name')
-        for item in all_items():
-            if item.name == item_name:
-                return item
-        raise InvalidJson(f'Unknown item JSON object. JSON object: {json_object}.')
+        item = Items.find_item(item_name)
+        if item is None:
+            raise InvalidJson(f'Unknown item JSON object. JSON object: {json_object}.')
+        return item
+
+
+class Items:
+    class _PrefixNode:
+        def __init__(self, item_id: int):
+            self.item_id = item_id
+            self.children: dict[str, '__class__'] = {}
+
+    @classmethod
+    def all(cls) -> tuple[Item, ...]:
+        return cls._ITEMS
+
+    @classmethod
+    def count(cls) -> int:
+        return len(cls._ITEMS)
+
+    @classmethod
+    def item(cls, item_id: int) -> Item:
+        return cls._ITEMS[item_id]
+
+    @classmethod
+    def item_id(cls, item: Item) -> int | None:
+        return cls._ITEMS_IDS_DICT.get(type(item))
+
+    @classmethod
+    def find_item(cls, item_name: str) -> Item | None:
+        return cls._ITEMS_DICT.get(item_name)
+
+    @classmethod
+    def find_item_by_prefix(cls, *item_name_parts: str) -> Item | None:
+        node = cls._PREFIX_TRIE
+        for character in normalize_item_name(*item_name_parts):
+            node = node.children.get(character)
+            if node is None:
+                return None
+        return cls._ITEMS[node.item_id]
+
+    @classmethod
+    def _create_prefix_trie(cls, items) -> _PrefixNode:
+        root = cls._PrefixNode(0)
+        for item_id, item in enumerate(items):
+            node = root
+            for character in normalize_item_name(item.name):
+                if character not in node.children:
+                    node.children[character] = cls._PrefixNode(item_id)
+                node = node.children[character]
+        return root
 
 
 def all_items():
-    return [
-        Pita(), Oleem(), HolyScroll(), MedicinalHerb(), CureAllHerb(), FireBall(), WaterCrystal(), LightSeed(),
-        SeaSeed(), WindSeed()
-    ]
+    return Items.all()
+
+
+Items._ITEMS = (
+    Pita(), Oleem(), HolyScroll(), MedicinalHerb(), CureAllHerb(), FireBall(), WaterCrystal(), LightSeed(), SeaSeed(),
+    WindSeed()
+)
+Items._ITEMS_DICT = MappingProxyType({item.name: item for item in Items._ITEMS})
+Items._ITEMS_IDS_DICT = MappingProxyType({type(item): item_id for item_id, item in enumerate(Items._ITEMS)})
+Items._PREFIX_TRIE = Items._create_prefix_trie(Items._ITEMS)
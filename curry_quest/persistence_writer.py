@@ -0,0 +1,84 @@
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PersistenceWriter:
+    def lane(self, key: int) -> int:
+        return 0
+
+    def submit(self, key: int, task: Callable[[], None]) -> Future:
+        return self.submit_to_lane(self.lane(key), task)
+
+    def submit_to_lane(self, lane: int, task: Callable[[], None]) -> Future:
+        future = Future()
+        try:
+            future.set_result(task())
+        except Exception as exc:
+            logger.error(f"Persistence task failed. {exc.__class__.__name__}: {exc}.")
+            future.set_exception(exc)
+        return future
+
+    def barrier(self, key: int):
+        self.submit(key, lambda: None).result()
+
+    def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ThreadPoolPersistenceWriter(PersistenceWriter):
+    DEFAULT_LANES_COUNT = 2
+    DEFAULT_MAX_PENDING = 1000
+
+    def __init__(self, lanes_count: int=DEFAULT_LANES_COUNT, max_pending: int=DEFAULT_MAX_PENDING):
+        self._lanes = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'persistence-{lane}')
+            for lane
+            in range(lanes_count)
+        ]
+        self._pending_slots = threading.BoundedSemaphore(max_pending)
+        self._pending_futures_lock = threading.Lock()
+        self._pending_futures: set[Future] = set()
+
+    def lane(self, key: int) -> int:
+        return key % len(self._lanes)
+
+    def submit_to_lane(self, lane: int, task: Callable[[], None]) -> Future:
+        self._pending_slots.acquire()
+        try:
+            future = self._lanes[lane].submit(task)
+        except RuntimeError:
+            self._pending_slots.release()
+            raise
+        with self._pending_futures_lock:
+            self._pending_futures.add(future)
+        future.add_done_callback(self._handle_task_done)
+        return future
+
+    def _handle_task_done(self, future: Future):
+        with self._pending_futures_lock:
+            self._pending_futures.discard(future)
+        self._pending_slots.release()
+        exc = future.exception()
+        if exc is not None:
+            logger.error(f"Persistence task failed. {exc.__class__.__name__}: {exc}.")
+
+    @property
+    def pending_count(self) -> int:
+        with self._pending_futures_lock:
+            return len(self._pending_futures)
+
+    def drain(self):
+        with self._pending_futures_lock:
+            pending_futures = list(self._pending_futures)
+        wait(pending_futures)
+
+    def close(self):
+        for lane_executor in self._lanes:
+            lane_executor.shutdown(wait=True)
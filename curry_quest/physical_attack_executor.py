@@ -10,6 +10,12 @@ RelativeHeight = DamageCalculator.RelativeHeight
 
 
 class PhysicalAttackExecutor:
+    DAMAGE_ROLLS = [DamageRoll.Low, DamageRoll.Normal, DamageRoll.High]
+    DAMAGE_ROLLS_WEIGHTS = [1, 2, 1]
+    NORMAL_CRITICAL_DIVIDER = 64
+    ATROCIOUS_CRITICAL_DIVIDER = 2
+    CRITICAL_CHANCE_DENOMINATOR = 128
+
     def __init__(self, unit_action_context: UnitActionContext):
         from curry_quest.state_machine_context import StateMachineContext
 
@@ -88,9 +94,13 @@ class PhysicalAttackExecutor:
         return f'{attacker_words.name.capitalize()} {attacker_words.ies_verb("try")} attacking, but it has no effect.'
 
     def _select_damage_roll(self) -> DamageRoll:
-        return self._context.rng.choices([DamageRoll.Low, DamageRoll.Normal, DamageRoll.High], weights=[1, 2, 1])[0]
+        return self._context.rng.choices(self.DAMAGE_ROLLS, weights=self.DAMAGE_ROLLS_WEIGHTS)[0]
 
     def _select_relative_height(self) -> RelativeHeight:
+        return self.relative_height(self.attacker, self.defender)
+
+    @classmethod
+    def relative_height(cls, attacker: Unit, defender: Unit) -> RelativeHeight:
         def unit_height(unit: Unit):
             unit_height = 0
             if unit.has_status(Statuses.Crack):
@@ -99,9 +109,7 @@ class PhysicalAttackExecutor:
                 unit_height += 1
             return unit_height
 
-        attacker_height = unit_height(self.attacker)
-        defender_height = unit_height(self.defender)
-        relative_height = attacker_height - defender_height
+        relative_height = unit_height(attacker) - unit_height(defender)
         if relative_height > 0:
             return RelativeHeight.Higher
         elif relative_height < 0:
@@ -112,8 +120,11 @@ class PhysicalAttackExecutor:
     def _select_whether_attack_is_critical(self) -> bool:
         if self._guaranteed_critical:
             return True
-        divider = 2 if self.attacker.talents.has(Talents.Atrocious) else 64
-        crit_chance = (self.attacker.luck // divider + 1) / 128
+        if self.attacker.talents.has(Talents.Atrocious):
+            divider = self.ATROCIOUS_CRITICAL_DIVIDER
+        else:
+            divider = self.NORMAL_CRITICAL_DIVIDER
+        crit_chance = (self.attacker.luck // divider + 1) / self.CRITICAL_CHANCE_DENOMINATOR
         return self._context.does_action_succeed(success_chance=crit_chance)
 
     def _perform_attack(self, relative_height: RelativeHeight):
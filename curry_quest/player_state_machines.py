@@ -0,0 +1,110 @@
+from collections import OrderedDict
+from curry_quest.config import Config
+from curry_quest.state_machine import StateMachine
+from curry_quest.states_files_handler import StatesHandler
+from curry_quest.states_storage import StateSummary
+import logging
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PlayerStateMachines:
+    def __init__(
+            self,
+            states_handler,
+            game_config: Config,
+            state_machine_loaded_handler: Callable[[int, StateMachine], None],
+            max_resident: int=None):
+        self._states_handler = states_handler
+        self._game_config = game_config
+        self._state_machine_loaded_handler = state_machine_loaded_handler
+        self._max_resident = max_resident
+        self._states_index: dict[int, StateSummary] = states_handler.load_index(game_config)
+        self._state_machines: OrderedDict[int, StateMachine] = OrderedDict()
+        logger.info(f"Indexed {len(self._states_index)} player(s).")
+
+    def __contains__(self, player_id: int) -> bool:
+        return player_id in self._states_index
+
+    def __len__(self) -> int:
+        return len(self._states_index)
+
+    def player_ids(self) -> list[int]:
+        return list(self._states_index.keys())
+
+    def is_loaded(self, player_id: int) -> bool:
+        return player_id in self._state_machines
+
+    @property
+    def loaded_count(self) -> int:
+        return len(self._state_machines)
+
+    def get(self, player_id: int) -> StateMachine:
+        if player_id not in self._states_index:
+            return None
+        state_machine = self._state_machines.get(player_id)
+        if state_machine is None:
+            state_machine = self._load(player_id)
+        else:
+            self._state_machines.move_to_end(player_id)
+        return state_machine
+
+    def _load(self, player_id: int) -> StateMachine:
+        state_machine = self._states_handler.load_player(player_id, self._game_config)
+        if state_machine is None:
+            del self._states_index[player_id]
+            return None
+        self._make_resident(player_id, state_machine)
+        return state_machine
+
+    def add(self, player_id: int, state_machine: StateMachine):
+        self._states_index[player_id] = StateSummary.Empty
+        self._make_resident(player_id, state_machine)
+
+    def _make_resident(self, player_id: int, state_machine: StateMachine):
+        self._state_machine_loaded_handler(player_id, state_machine)
+        self._state_machines[player_id] = state_machine
+        self._evict_least_recently_used()
+
+    def _evict_least_recently_used(self):
+        if self._max_resident is None or len(self._state_machines) <= self._max_resident:
+            return
+        evicted_player_ids = []
+        excess_count = len(self._state_machines) - self._max_resident
+        most_recently_used_player_id = next(reversed(self._state_machines))
+        for player_id, state_machine in self._state_machines.items():
+            if len(evicted_player_ids) >= excess_count or player_id == most_recently_used_player_id:
+                break
+            if self._is_evictable(state_machine):
+                evicted_player_ids.append(player_id)
+        for player_id in evicted_player_ids:
+            self._evict(player_id)
+
+    def _is_evictable(self, state_machine: StateMachine) -> bool:
+        return not state_machine.has_delayed_action() and not state_machine.has_event_selection_penalty()
+
+    def _evict(self, player_id: int):
+        state_machine = self._state_machines.pop(player_id)
+        self._states_index[player_id] = StatesHandler.state_summary(state_machine)
+        self._states_handler.flush_player(player_id)
+        logger.debug(f"Evicted '{player_id}'s' state.")
+
+    def remove(self, player_id: int):
+        del self._states_index[player_id]
+        self._state_machines.pop(player_id, None)
+
+    def is_waiting_for_event(self, player_id: int) -> bool:
+        state_machine = self._state_machines.get(player_id)
+        if state_machine is not None:
+            return state_machine.is_waiting_for_event()
+        return StateSummary.WaitingForEvent in self._states_index[player_id]
+
+    def players_with_delayed_actions(self) -> list[int]:
+        def has_delayed_action(player_id: int) -> bool:
+            state_machine = self._state_machines.get(player_id)
+            if state_machine is not None:
+                return state_machine.has_delayed_action()
+            return StateSummary.DelayedAction in self._states_index[player_id]
+
+        return list(filter(has_delayed_action, self._states_index.keys()))
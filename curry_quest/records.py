@@ -6,6 +6,12 @@ class Records(Jsonable):
         self.turns_counter = 0
         self.used_elevators_counter = 0
 
+    def clone(self) -> '__class__':
+        records = self.__class__()
+        records.turns_counter = self.turns_counter
+        records.used_elevators_counter = self.used_elevators_counter
+        return records
+
     def to_json_object(self):
         return {
             'turns_counter': self.turns_counter,
@@ -0,0 +1,214 @@
+import argparse
+import json
+import logging
+from curry_quest.config import Config
+from curry_quest.jsonable import InvalidJson, JsonReaderHelper
+from curry_quest.services import Services
+from curry_quest.state_machine import StateMachine
+from curry_quest.state_machine_action import StateMachineAction
+from curry_quest.states_storage import StatesStorage, JsonFilesStatesStorage, SqliteStatesStorage
+
+logger = logging.getLogger(__name__)
+
+
+class JournalGap(Exception):
+    pass
+
+
+class HeadlessServices(Services):
+    def timer(self, name, interval, callback):
+        return None
+
+
+def replay_journal_entry(state_machine: StateMachine, journal_entry: dict) -> list:
+    json_reader_helper = JsonReaderHelper(journal_entry)
+    sequence_number = json_reader_helper.read_int_with_min('seq', min_value=1)
+    if sequence_number <= state_machine.actions_counter:
+        return None
+    if sequence_number != state_machine.actions_counter + 1:
+        raise JournalGap(
+            f'Expected action {state_machine.actions_counter + 1}, got {sequence_number}.')
+    action = StateMachineAction(
+        json_reader_helper.read_non_empty_string('command'),
+        tuple(json_reader_helper.read_list('args')),
+        is_given_by_admin=json_reader_helper.read_bool('is_given_by_admin'))
+    state_machine.player_name = json_reader_helper.read_value_of_type_with_default(
+        'player_name',
+        str,
+        default=state_machine.player_name)
+    return state_machine.replay_action(action, is_delayed=json_reader_helper.read_bool('is_delayed'))
+
+
+def diff_json_objects(expected, actual, path='') -> list[str]:
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        differences = []
+        for key in expected.keys() | actual.keys():
+            key_path = f'{path}.{key}' if path else str(key)
+            if key not in actual:
+                differences.append(f'{key_path}: missing')
+            elif key not in expected:
+                differences.append(f'{key_path}: unexpected')
+            else:
+                differences.extend(diff_json_objects(expected[key], actual[key], key_path))
+        return sorted(differences)
+    if isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        differences = []
+        for index, (expected_item, actual_item) in enumerate(zip(expected, actual)):
+            differences.extend(diff_json_objects(expected_item, actual_item, f'{path}[{index}]'))
+        return differences
+    if expected != actual:
+        return [f'{path}: expected {expected!r}, got {actual!r}']
+    return []
+
+
+class Replay:
+    class ReplayError(Exception):
+        pass
+
+    def __init__(self, game_config: Config, initial_state: dict, journal: list[dict]):
+        self._game_config = game_config
+        self._initial_state = initial_state
+        self._journal = sorted(journal, key=lambda journal_entry: journal_entry.get('seq', 0))
+        self._services = HeadlessServices()
+        self.reset()
+
+    @classmethod
+    def from_storage(cls, states_storage: StatesStorage, player_id: int, game_config: Config):
+        try:
+            initial_state = states_storage.read(player_id)
+            journal = states_storage.read_journal(player_id)
+            previous_state = states_storage.read_previous(player_id)
+        except StatesStorage.StorageError as exc:
+            raise cls.ReplayError(f"Could not read '{player_id}'s' recording. Reason - {exc}.")
+        if previous_state is not None and cls._journal_connects(previous_state, initial_state, journal):
+            initial_state = previous_state
+        return cls(game_config, initial_state, journal)
+
+    @classmethod
+    def _journal_connects(cls, earlier_state: dict, later_state: dict, journal: list[dict]) -> bool:
+        sequence_numbers = set(journal_entry.get('seq') for journal_entry in journal)
+        return all(
+            sequence_number in sequence_numbers
+            for sequence_number
+            in range(cls._state_turn(earlier_state) + 1, cls._state_turn(later_state) + 1))
+
+    @classmethod
+    def _state_turn(cls, state: dict) -> int:
+        return JsonReaderHelper(state).read_value_of_type_with_default('actions_counter', int, default=0)
+
+    @classmethod
+    def from_json_object(cls, json_object, game_config: Config):
+        try:
+            json_reader_helper = JsonReaderHelper(json_object)
+            return cls(game_config, json_reader_helper.read_dict('state'), json_reader_helper.read_list('journal'))
+        except InvalidJson as exc:
+            raise cls.ReplayError(f'Invalid recording. Reason - {exc}.')
+
+    def to_json_object(self):
+        return {'state': self._initial_state, 'journal': self._journal}
+
+    @property
+    def state_machine(self) -> StateMachine:
+        return self._state_machine
+
+    @property
+    def turn(self) -> int:
+        return self._state_machine.actions_counter
+
+    @property
+    def first_turn(self) -> int:
+        return self._initial_turn
+
+    @property
+    def last_turn(self) -> int:
+        if len(self._journal) == 0:
+            return self._initial_turn
+        return max(self._initial_turn, self._journal[-1].get('seq', 0))
+
+    def is_finished(self) -> bool:
+        return self._journal_index >= len(self._journal)
+
+    def reset(self):
+        try:
+            player_id = StateMachine.player_id_from_json_object(self._initial_state)
+            self._state_machine = StateMachine(self._game_config, player_id, player_name='', services=self._services)
+            self._state_machine.from_json_object(self._initial_state)
+        except InvalidJson as exc:
+            raise self.ReplayError(f'Invalid initial state. Reason - {exc}.')
+        self._initial_turn = self._state_machine.actions_counter
+        self._journal_index = 0
+
+    def step(self) -> list:
+        while not self.is_finished():
+            journal_entry = self._journal[self._journal_index]
+            self._journal_index += 1
+            try:
+                responses = replay_journal_entry(self._state_machine, journal_entry)
+            except (JournalGap, InvalidJson) as exc:
+                self._journal_index = len(self._journal)
+                raise self.ReplayError(f'Cannot replay turn {self.turn + 1}. Reason - {exc}.')
+            if responses is not None:
+                return responses
+        return None
+
+    def fast_forward(self, turn: int=None) -> int:
+        if turn is not None and turn < self.turn:
+            self.reset()
+        while (turn is None or self.turn < turn) and not self.is_finished():
+            self.step()
+        return self.turn
+
+    def diff(self, snapshot: dict) -> list[str]:
+        return diff_json_objects(snapshot, self._state_machine.to_json_object())
+
+    def diff_with_snapshot(self, snapshot: dict) -> list[str]:
+        snapshot_turn = self._state_turn(snapshot)
+        if self.fast_forward(snapshot_turn) != snapshot_turn:
+            raise self.ReplayError(f'Recording ends at turn {self.turn}, before snapshot turn {snapshot_turn}.')
+        return self.diff(snapshot)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('curry_quest_config', type=argparse.FileType('r'))
+    parser.add_argument('player_id', type=int)
+    parser.add_argument('-d', '--state_files_directory', default='.')
+    parser.add_argument('--state_database', type=str)
+    parser.add_argument('--recording', type=argparse.FileType('r'))
+    parser.add_argument('--turn', type=int)
+    parser.add_argument('--snapshot', type=argparse.FileType('r'))
+    parser.add_argument('--save_recording', type=argparse.FileType('w'))
+    return parser.parse_args()
+
+
+def create_replay(args, game_config: Config) -> Replay:
+    if args.recording is not None:
+        return Replay.from_json_object(json.load(args.recording), game_config)
+    if args.state_database is not None:
+        states_storage = SqliteStatesStorage(args.state_database)
+    else:
+        states_storage = JsonFilesStatesStorage(args.state_files_directory)
+    try:
+        return Replay.from_storage(states_storage, args.player_id, game_config)
+    finally:
+        states_storage.close()
+
+
+def main():
+    args = parse_args()
+    game_config = Config.Parser(args.curry_quest_config).parse()
+    replay = create_replay(args, game_config)
+    if args.save_recording is not None:
+        json.dump(replay.to_json_object(), args.save_recording)
+    print(f'Replaying turns {replay.first_turn + 1}-{replay.last_turn}.')
+    while not replay.is_finished() and (args.turn is None or replay.turn < args.turn):
+        responses = replay.step()
+        if responses is not None:
+            print(f'[{replay.turn}] {" ".join(responses)}')
+    if args.snapshot is not None:
+        for difference in replay.diff_with_snapshot(json.load(args.snapshot)):
+            print(difference)
+
+
+if __name__ == '__main__':
+    main()
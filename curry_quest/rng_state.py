@@ -0,0 +1,30 @@
+import base64
+import binascii
+from curry_quest.jsonable import InvalidJson
+import struct
+
+MERSENNE_TWISTER_STATE_VERSION = 3
+MERSENNE_TWISTER_STATE_SIZE = 625
+PACKED_STATE_FORMAT = f'<{MERSENNE_TWISTER_STATE_SIZE}I?d'
+
+
+def encode_rng_state(rng_state: tuple) -> str:
+    version, internal_state, gauss_next = rng_state
+    if version != MERSENNE_TWISTER_STATE_VERSION or len(internal_state) != MERSENNE_TWISTER_STATE_SIZE:
+        raise ValueError(f'Unsupported RNG state version {version}.')
+    packed_state = struct.pack(
+        PACKED_STATE_FORMAT,
+        *internal_state,
+        gauss_next is not None,
+        gauss_next or 0.0)
+    return base64.b64encode(packed_state).decode('ascii')
+
+
+def decode_rng_state(encoded_rng_state: str) -> tuple:
+    try:
+        unpacked_state = struct.unpack(PACKED_STATE_FORMAT, base64.b64decode(encoded_rng_state, validate=True))
+    except (binascii.Error, struct.error) as exc:
+        raise InvalidJson(f'Invalid RNG state - {exc}.')
+    internal_state = unpacked_state[:MERSENNE_TWISTER_STATE_SIZE]
+    has_gauss_next, gauss_next = unpacked_state[MERSENNE_TWISTER_STATE_SIZE:]
+    return MERSENNE_TWISTER_STATE_VERSION, internal_state, gauss_next if has_gauss_next else None
@@ -0,0 +1,154 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledTimer:
+    def __init__(self, scheduler, name: str, deadline: float, callback: Callable[[], None]):
+        self._scheduler = scheduler
+        self._name = name
+        self._deadline = deadline
+        self._callback = callback
+        self._is_done = False
+        self._is_cancelled = False
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def deadline(self) -> float:
+        return self._deadline
+
+    def done(self) -> bool:
+        return self._is_done
+
+    def cancelled(self) -> bool:
+        return self._is_cancelled
+
+    def cancel(self) -> bool:
+        if self._is_done:
+            return False
+        self._is_done = True
+        self._is_cancelled = True
+        self._scheduler._handle_timer_cancelled(self)
+        logger.debug(f"'{self._name}' timer cancelled.")
+        return True
+
+    def _fire(self):
+        self._is_done = True
+        logger.debug(f"'{self._name}' timer expired.")
+        self._callback()
+
+
+class Scheduler:
+    _default = None
+
+    def __init__(self, loop: asyncio.AbstractEventLoop=None):
+        self._loop = loop
+        self._timers: list[tuple[float, int, ScheduledTimer]] = []
+        self._sequence_numbers = itertools.count()
+        self._pending_count = 0
+        self._wakeup_handle: asyncio.TimerHandle = None
+        self._wakeup_deadline: float = None
+        self._fired_count = 0
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+
+    @classmethod
+    def default(cls):
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    @property
+    def queue_depth(self) -> int:
+        return self._pending_count
+
+    @property
+    def fired_count(self) -> int:
+        return self._fired_count
+
+    @property
+    def last_lag(self) -> float:
+        return self._last_lag
+
+    @property
+    def max_lag(self) -> float:
+        return self._max_lag
+
+    def schedule(self, name: str, interval: float, callback: Callable[[], None]) -> ScheduledTimer:
+        loop = self._bind_loop()
+        timer = ScheduledTimer(self, name, loop.time() + interval, callback)
+        heapq.heappush(self._timers, (timer.deadline, next(self._sequence_numbers), timer))
+        self._pending_count += 1
+        logger.debug(f"'{name}' timer started ({interval}s).")
+        self._arm()
+        return timer
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.get_running_loop()
+            self._wakeup_handle = None
+            self._wakeup_deadline = None
+        return self._loop
+
+    def _handle_timer_cancelled(self, timer: ScheduledTimer):
+        self._pending_count -= 1
+        if self._pending_count == 0:
+            self._timers.clear()
+            self._disarm()
+
+    def _arm(self):
+        self._discard_cancelled_timers()
+        if len(self._timers) == 0:
+            self._disarm()
+            return
+        deadline = self._timers[0][0]
+        if self._wakeup_handle is not None and self._wakeup_deadline <= deadline:
+            return
+        self._disarm()
+        self._wakeup_deadline = deadline
+        self._wakeup_handle = self._loop.call_at(deadline, self._handle_wakeup)
+
+    def _disarm(self):
+        if self._wakeup_handle is not None:
+            self._wakeup_handle.cancel()
+        self._wakeup_handle = None
+        self._wakeup_deadline = None
+
+    def _discard_cancelled_timers(self):
+        while len(self._timers) > 0 and self._timers[0][2].cancelled():
+            heapq.heappop(self._timers)
+
+    def _handle_wakeup(self):
+        self._wakeup_handle = None
+        self._wakeup_deadline = None
+        self.run_due_timers()
+
+    def run_due_timers(self):
+        now = self._loop.time()
+        due_timers = []
+        while len(self._timers) > 0 and self._timers[0][0] <= now:
+            _, _, timer = heapq.heappop(self._timers)
+            if not timer.done():
+                due_timers.append(timer)
+        for timer in due_timers:
+            if timer.done():
+                continue
+            self._pending_count -= 1
+            self._record_lag(now - timer.deadline)
+            try:
+                timer._fire()
+            except Exception as exc:
+                logger.error(f"'{timer.name}' timer callback failed. {exc.__class__.__name__}: {exc}.")
+        self._arm()
+
+    def _record_lag(self, lag: float):
+        self._fired_count += 1
+        self._last_lag = lag
+        self._max_lag = max(self._max_lag, lag)
@@ -0,0 +1,255 @@
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from curry_quest import commands
+from curry_quest.config import Config
+from curry_quest.records import Records
+from curry_quest.records_events_handler import RecordsEventsHandler
+from curry_quest.state_base import StateBase
+from curry_quest.state_battle import StateBattleEvent, StateBattlePreparePhase, StateBattlePlayerTurn
+from curry_quest.state_character import StateCharacterEvent, StateItemTrade, StateFamiliarTrade
+from curry_quest.state_elevator import StateElevatorEvent
+from curry_quest.state_familiar import StateFamiliarEvent
+from curry_quest.state_initialize import StateInitialize
+from curry_quest.state_item import StateItemEvent, StateItemPickUpFullInventory
+from curry_quest.state_machine import StateMachine, StateGameOver
+from curry_quest.state_machine_action import StateMachineAction
+from curry_quest.state_trap import StateTrapEvent
+from curry_quest.virtual_services import VirtualServices
+import logging
+import statistics
+
+logger = logging.getLogger(__name__)
+
+EVENT_STATES = {
+    StateBattleEvent: 'battle',
+    StateCharacterEvent: 'character',
+    StateElevatorEvent: 'elevator',
+    StateItemEvent: 'item',
+    StateTrapEvent: 'trap',
+    StateFamiliarEvent: 'familiar'
+}
+
+
+class ClimbPolicy:
+    HEALING_ITEM_NAME = 'Medicinal Herb'
+    LOW_HP_FRACTION = 1 / 3
+    COMMANDS = {
+        StateInitialize: commands.ENTER_TOWER,
+        StateBattlePreparePhase: commands.APPROACH,
+        StateItemEvent: commands.ACCEPTED,
+        StateItemPickUpFullInventory: commands.IGNORE,
+        StateElevatorEvent: commands.ACCEPTED,
+        StateItemTrade: commands.REJECTED,
+        StateFamiliarTrade: commands.REJECTED,
+        StateFamiliarEvent: commands.FUSE
+    }
+
+    def choose_action(self, state_machine: StateMachine) -> StateMachineAction:
+        state_type = type(state_machine.state)
+        if state_type is StateBattlePlayerTurn:
+            return self._choose_battle_action(state_machine)
+        command = self.COMMANDS.get(state_type)
+        if command is not None:
+            return StateMachineAction.by_user(command)
+        available_commands = state_machine.available_commands()
+        if len(available_commands) == 0:
+            return None
+        return StateMachineAction.by_user(available_commands[0])
+
+    def _choose_battle_action(self, state_machine: StateMachine) -> StateMachineAction:
+        context = state_machine.context
+        familiar = context.familiar
+        if familiar.hp <= familiar.max_hp * self.LOW_HP_FRACTION and \
+                self.HEALING_ITEM_NAME in context.inventory.items:
+            return StateMachineAction.by_user(commands.USE_ITEM, *self.HEALING_ITEM_NAME.split())
+        return StateMachineAction.by_user(commands.ATTACK)
+
+
+class ClimbResult:
+    def __init__(self, seed: int):
+        self.seed = seed
+        self.is_cleared = False
+        self.is_timed_out = False
+        self.turns = 0
+        self.actions = 0
+        self.floor = 0
+        self.events: Counter[str] = Counter()
+
+    @property
+    def is_dead(self) -> bool:
+        return not self.is_cleared and not self.is_timed_out
+
+
+class ClimbStateChangedHandler:
+    def __init__(self, result: ClimbResult):
+        self._result = result
+
+    def __call__(self, state: StateBase):
+        event_name = EVENT_STATES.get(type(state))
+        if event_name is not None:
+            self._result.events[event_name] += 1
+
+
+class ClimbRecordsEventsHandler(RecordsEventsHandler):
+    def __init__(self, result: ClimbResult):
+        self._result = result
+
+    def handle_tower_clear(self, records: Records):
+        self._result.is_cleared = True
+
+
+def simulate_climb(game_config: Config, seed: int, policy: ClimbPolicy=None, max_actions: int=10000) -> ClimbResult:
+    policy = policy or ClimbPolicy()
+    result = ClimbResult(seed)
+    services = VirtualServices(seed=seed)
+    state_machine = StateMachine(game_config, player_id=seed, player_name='SIMULATION', services=services)
+    state_machine.set_state_changed_handler(ClimbStateChangedHandler(result))
+    state_machine.set_records_events_handler(ClimbRecordsEventsHandler(result))
+    state_machine.on_action(StateMachineAction.by_admin(commands.STARTED))
+    while type(state_machine.state) is not StateGameOver:
+        if state_machine.actions_counter >= max_actions:
+            result.is_timed_out = True
+            break
+        if services.run_until_idle() > 0:
+            continue
+        if state_machine.is_waiting_for_event():
+            action = StateMachineAction.by_admin(commands.GENERATE_EVENT)
+        else:
+            action = policy.choose_action(state_machine)
+            if action is None:
+                logger.warning(f"No policy action for {state_machine.state} (seed {seed}).")
+                result.is_timed_out = True
+                break
+        state_machine.on_action(action)
+    result.turns = state_machine.context.records.turns_counter
+    result.actions = state_machine.actions_counter
+    result.floor = state_machine.context.floor
+    return result
+
+
+class SimulationReport:
+    def __init__(self, results: list[ClimbResult]):
+        self._results = results
+
+    @property
+    def climbs_count(self) -> int:
+        return len(self._results)
+
+    @property
+    def clear_rate(self) -> float:
+        if self.climbs_count == 0:
+            return 0.0
+        return sum(1 for result in self._results if result.is_cleared) / self.climbs_count
+
+    @property
+    def timed_out_count(self) -> int:
+        return sum(1 for result in self._results if result.is_timed_out)
+
+    def cleared_turns(self) -> list[int]:
+        return sorted(result.turns for result in self._results if result.is_cleared)
+
+    def turns_distribution(self) -> dict[str, float]:
+        turns = self.cleared_turns()
+        if len(turns) == 0:
+            return {}
+        distribution = {'min': turns[0], 'mean': statistics.mean(turns), 'max': turns[-1]}
+        if len(turns) > 1:
+            quartiles = statistics.quantiles(turns, n=4, method='inclusive')
+            distribution.update({'p25': quartiles[0], 'median': quartiles[1], 'p75': quartiles[2]})
+        return distribution
+
+    def deaths_per_floor(self) -> dict[int, int]:
+        return dict(sorted(Counter(result.floor + 1 for result in self._results if result.is_dead).items()))
+
+    def events_frequencies(self) -> dict[str, float]:
+        events = Counter()
+        for result in self._results:
+            events.update(result.events)
+        events_count = sum(events.values())
+        if events_count == 0:
+            return {}
+        return dict((event, count / events_count) for event, count in events.most_common())
+
+    def to_string(self) -> str:
+        lines = [
+            f'Climbs: {self.climbs_count}',
+            f'Clear rate: {self.clear_rate:.2%}',
+            f'Timed out: {self.timed_out_count}',
+            'Turns to clear: ' + ', '.join(f'{key}={value:.1f}' for key, value in self.turns_distribution().items()),
+            'Deaths per floor: ' + ', '.join(f'{floor}F={count}' for floor, count in self.deaths_per_floor().items()),
+            'Events: ' + ', '.join(f'{event}={frequency:.2%}' for event, frequency in self.events_frequencies().items())
+        ]
+        return '\n'.join(lines)
+
+
+_worker_game_config: Config = None
+
+
+def _initialize_worker(game_config: Config):
+    global _worker_game_config
+    _worker_game_config = game_config
+
+
+def _simulate_climbs(seeds: range, max_actions: int) -> list[ClimbResult]:
+    return [simulate_climb(_worker_game_config, seed, max_actions=max_actions) for seed in seeds]
+
+
+def _seeds_chunks(first_seed: int, climbs_count: int, chunk_size: int) -> list[range]:
+    return [
+        range(chunk_first_seed, min(chunk_first_seed + chunk_size, first_seed + climbs_count))
+        for chunk_first_seed
+        in range(first_seed, first_seed + climbs_count, chunk_size)
+    ]
+
+
+def run_simulation(
+        game_config: Config,
+        climbs_count: int,
+        first_seed: int=0,
+        workers: int=None,
+        chunk_size: int=50,
+        max_actions: int=10000) -> SimulationReport:
+    seeds_chunks = _seeds_chunks(first_seed, climbs_count, chunk_size)
+    if workers == 1:
+        _initialize_worker(game_config)
+        chunks_results = [_simulate_climbs(seeds, max_actions) for seeds in seeds_chunks]
+    else:
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_initialize_worker,
+                initargs=(game_config,)) as executor:
+            chunks_results = list(executor.map(
+                _simulate_climbs,
+                seeds_chunks,
+                [max_actions] * len(seeds_chunks)))
+    return SimulationReport([result for chunk_results in chunks_results for result in chunk_results])
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('curry_quest_config', type=argparse.FileType('r'))
+    parser.add_argument('-n', '--climbs', type=int, default=1000)
+    parser.add_argument('-s', '--first_seed', type=int, default=0)
+    parser.add_argument('-w', '--workers', type=int)
+    parser.add_argument('--chunk_size', type=int, default=50)
+    parser.add_argument('--max_actions', type=int, default=10000)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    game_config = Config.Parser(args.curry_quest_config).parse()
+    report = run_simulation(
+        game_config,
+        args.climbs,
+        first_seed=args.first_seed,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        max_actions=args.max_actions)
+    print(report.to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -13,6 +13,10 @@ class DamageSpellHandler(SpellHandler):
     def __init__(self, raw_spell_damage):
         self._raw_spell_damage = raw_spell_damage
 
+    @property
+    def raw_spell_damage(self) -> int:
+        return self._raw_spell_damage
+
     def select_target(self, caster, other_unit):
         return other_unit
 
@@ -11,7 +11,6 @@ from curry_quest.talents import Talents
 from curry_quest.unit_traits import UnitTraits
 from curry_quest.unit import Unit
 from curry_quest.unit_action import UnitActionContext, UnitActionHandler
-from curry_quest.unit_creator import UnitCreator
 from curry_quest.words import Words, FamiliarWords, UnitWords
 
 
@@ -46,7 +45,7 @@ class StateBattleEvent(StateBase):
             return self._context.generate_floor_monster(floor=self._context.floor)
         else:
             monster_level = self._monster_level if self._monster_level > 0 else self._context.familiar.level
-            return UnitCreator(self._monster_traits).create(monster_level, levels=self.game_config.levels)
+            return self.game_config.unit_prototypes.create(self._monster_traits, monster_level)
 
     @classmethod
     def _parse_args(cls, context, args):
@@ -63,10 +62,10 @@ class StateBattleEvent(StateBase):
 
     @classmethod
     def _find_monster_traits(cls, monster_name, context: StateMachineContext):
-        for known_monster_name, monster_traits in context.game_config.monsters_traits.items():
-            if known_monster_name.lower() == monster_name.lower():
-                return monster_traits
-        raise cls.ArgsParseError('Unknown monster')
+        monster_traits = context.game_config.find_monster_traits(monster_name)
+        if monster_traits is None:
+            raise cls.ArgsParseError('Unknown monster')
+        return monster_traits
 
 
 class StateBattleBase(StateBase):
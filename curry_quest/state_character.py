@@ -1,4 +1,4 @@
-from curry_quest import commands, items
+from curry_quest import commands
 from curry_quest.state_base import StateBase
 from curry_quest.unit_creator import UnitCreator
 from curry_quest.state_with_inventory_item import StateWithInventoryItem
@@ -29,22 +29,17 @@ class StateCharacterEvent(StateBase):
         self._context.generate_action(next_command, *args)
 
     def _select_character(self):
-        return self._character or self._context.random_selection_with_weights(self._character_events_weights())
-
-    def _character_events_weights(self):
-        character_events_weights = self._context.characters_weights
-
-        def remove_weight(character):
-            if character in character_events_weights:
-                del character_events_weights[character]
+        return self._character or self._context.select_character(self._excluded_characters())
 
+    def _excluded_characters(self):
+        excluded_characters = []
         if not self._context.familiar.does_evolve():
-            remove_weight('Mia')
+            excluded_characters.append('Mia')
         if self._context.familiar.is_hp_at_max():
-            remove_weight('Cherrl')
+            excluded_characters.append('Cherrl')
         if self._context.familiar.has_status(Statuses.StatsBoost):
-            remove_weight('Patty')
-        return character_events_weights
+            excluded_characters.append('Patty')
+        return excluded_characters
 
     def _handle_cherrl_encounter(self):
         familiar = self._context.familiar
@@ -67,14 +62,10 @@ class StateCharacterEvent(StateBase):
                 'She wanted to offer you an item exchange, but you don\'t have any items... ' \
                 'She scoffs at your lack of preparation and walks off.'
         else:
-            item = self._context.random_selection_with_weights(self._found_items_weights())
+            item = self._context.select_found_item()
             self._context.buffer_item(item)
             return (commands.START_ITEM_TRADE, ()), 'She offers you an item exchange.'
 
-    def _found_items_weights(self):
-        items_weights = self._context.items_weights
-        return {item: items_weights[item.name] for item in items.all_items()}
-
     def _handle_selfi_encounter(self):
         familiar_for_trade_traits = self._context.rng.choice(self._create_selfi_familiars_list())
         familiar_for_trade = \
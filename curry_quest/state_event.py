@@ -41,11 +41,7 @@ class StateGenerateEvent(StateBase):
         self._context.generate_action(commands.EVENT_GENERATED, event)
 
     def _select_event(self):
-        events_weights = self._context.events_weights
-        if len(events_weights) > 0:
-            return self._context.random_selection_with_weights(events_weights)
-        else:
-            commands.BATTLE_EVENT
+        return self._context.select_event() or commands.BATTLE_EVENT
 
 
 class StateEventFinished(StateBase):
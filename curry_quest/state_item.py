@@ -1,6 +1,6 @@
 from curry_quest import commands
 from curry_quest.item_use_unit_action import ItemUseActionHandler
-from curry_quest.items import Item, normalize_item_name, all_items
+from curry_quest.items import Item, Items, normalize_item_name
 from curry_quest.jsonable import JsonReaderHelper
 from curry_quest.state_base import StateBase
 from curry_quest.state_with_inventory_item import StateWithInventoryItem
@@ -27,11 +27,7 @@ class StateItemEvent(StateBase):
         self._context.add_response(f"You come across a {item.name}. Do you want to pick it up?")
 
     def _select_item(self):
-        return self._item or self._context.random_selection_with_weights(self._found_items_weights())
-
-    def _found_items_weights(self):
-        items_weights = self._context.items_weights
-        return {item: items_weights[item.name] for item in all_items()}
+        return self._item or self._context.select_found_item()
 
     def is_waiting_for_user_action(self) -> bool:
         return True
@@ -40,11 +36,10 @@ class StateItemEvent(StateBase):
     def _parse_args(cls, context, args):
         if len(args) == 0:
             return ()
-        item_name = normalize_item_name(*args)
-        for item in all_items():
-            if normalize_item_name(item.name).startswith(item_name):
-                return item,
-        raise cls.ArgsParseError('Unknown item')
+        item = Items.find_item_by_prefix(*args)
+        if item is None:
+            raise cls.ArgsParseError('Unknown item')
+        return item,
 
 
 class StateItemPickUp(StateBase):
@@ -2,7 +2,7 @@ import datetime
 from curry_quest import commands
 from curry_quest.config import Config
 from curry_quest.errors import InvalidOperation
-from curry_quest.items import normalize_item_name, all_items
+from curry_quest.items import Items
 from curry_quest.jsonable import Jsonable, JsonReaderHelper, InvalidJson
 from curry_quest.services import Services
 from curry_quest.spells import Spells
@@ -69,7 +69,8 @@ class StateGameOver(StateBase):
 
 
 class StateMachine(Jsonable):
-    VERSION = 3
+    VERSION = 4
+    UNVERSIONED = 1
     TRANSITIONS = {
         StateStart: {commands.STARTED: Transition.by_admin(StateInitialize)},
         StateRestartByUser: {commands.STARTED: Transition.by_admin(StateInitialize)},
@@ -205,33 +206,40 @@ class StateMachine(Jsonable):
         StateGameOver: {commands.RESTART: Transition.by_user(StateRestartByUser)}
     }
 
-    def __init__(self, game_config: Config, player_id: int, player_name: str):
-        self._services = Services()
+    def __init__(self, game_config: Config, player_id: int, player_name: str, services: Services=None):
+        self._services = services or Services()
         self._context = StateMachineContext(game_config, self._services)
         self._player_id = player_id
         self._player_name = player_name
-        self._autonomous_action_result_handler = lambda responses: None
+        self._autonomous_action_result_handler = lambda player_id, responses: None
+        self._state_changed_handler = lambda state: None
         self._last_responses = []
         self._state = StateStart(self._context)
+        self._scheduled_delayed_action: tuple[int, StateMachineAction] = None
+        self._actions_counter = 0
+        self._snapshot_actions_counter = None
+        self._journal_entries = []
+        self._is_journaling = False
+        self._is_replaying = False
         self._event_selection_penalty_end_dt = None
         self._generic_actions_handlers = {
-            commands.HELP: (False, self._show_available_commands),
-            commands.RESTART: (True, self._restart_state_machine),
-            commands.SHOW_FAMILIAR_STATS: (False, self._handle_familiar_stats_query),
-            commands.SHOW_INVENTORY: (False, self._handle_inventory_query),
-            commands.SHOW_FLOOR: (False, self._handle_floor_query),
-            commands.SHOW_STATE: (False, self._handle_state_query),
-            commands.RECORDS: (False, self._handle_records_query),
-            commands.HALL_OF_FAME: (False, lambda *args, **kwargs: None),
-            commands.GIVE_ITEM: (True, self._give_item),
-            commands.RESTORE_HP: (True, self._restore_hp),
-            commands.RESTORE_MP: (True, self._restore_mp),
-            commands.GIVE_FAMILIAR_SPELL: (True, self._give_familiar_spell),
-            commands.GIVE_FAMILIAR_STATUS: (True, self._give_familiar_status),
-            commands.GIVE_ENEMY_SPELL: (True, self._give_enemy_spell),
-            commands.GIVE_ENEMY_STATUS: (True, self._give_enemy_status),
-            commands.TURN_COUNTERS: (True, self._handle_turn_counters_query),
-            commands.SET_FLOOR: (True, self._set_floor)
+            commands.HELP: (False, False, self._show_available_commands),
+            commands.RESTART: (True, True, self._restart_state_machine),
+            commands.SHOW_FAMILIAR_STATS: (False, False, self._handle_familiar_stats_query),
+            commands.SHOW_INVENTORY: (False, False, self._handle_inventory_query),
+            commands.SHOW_FLOOR: (False, False, self._handle_floor_query),
+            commands.SHOW_STATE: (False, False, self._handle_state_query),
+            commands.RECORDS: (False, False, self._handle_records_query),
+            commands.HALL_OF_FAME: (False, False, lambda *args, **kwargs: None),
+            commands.GIVE_ITEM: (True, True, self._give_item),
+            commands.RESTORE_HP: (True, True, self._restore_hp),
+            commands.RESTORE_MP: (True, True, self._restore_mp),
+            commands.GIVE_FAMILIAR_SPELL: (True, True, self._give_familiar_spell),
+            commands.GIVE_FAMILIAR_STATUS: (True, True, self._give_familiar_status),
+            commands.GIVE_ENEMY_SPELL: (True, True, self._give_enemy_spell),
+            commands.GIVE_ENEMY_STATUS: (True, True, self._give_enemy_status),
+            commands.TURN_COUNTERS: (True, False, self._handle_turn_counters_query),
+            commands.SET_FLOOR: (True, True, self._set_floor)
         }
 
     @property
@@ -246,9 +254,27 @@ class StateMachine(Jsonable):
     def player_name(self, new_name) -> str:
         self._player_name = new_name
 
+    @property
+    def state(self) -> StateBase:
+        return self._state
+
+    @property
+    def context(self) -> StateMachineContext:
+        return self._context
+
+    def available_commands(self, is_admin: bool=False) -> list[str]:
+        return self._available_specific_commands(is_admin)
+
     def set_autonomous_action_result_handler(self, new_handler: Callable[[int, str], None]):
         self._autonomous_action_result_handler = new_handler
 
+    def set_state_changed_handler(self, new_handler: Callable[[StateBase], None]):
+        self._state_changed_handler = new_handler
+
+    def set_services(self, new_services: Services):
+        self._services = new_services
+        self._context.services = new_services
+
     def set_records_events_handler(self, new_records_events_handler):
         self._context.records_events_handler = new_records_events_handler
 
@@ -259,28 +285,54 @@ class StateMachine(Jsonable):
         self._event_selection_penalty_end_dt = None
 
     def set_event_selection_penalty(self, duration_in_seconds):
-        self._event_selection_penalty_end_dt = datetime.datetime.now() + datetime.timedelta(seconds=duration_in_seconds)
+        self._event_selection_penalty_end_dt = self._services.now() + datetime.timedelta(seconds=duration_in_seconds)
 
     @property
     def event_selection_penalty_end_dt(self) -> datetime.datetime:
         return self._event_selection_penalty_end_dt
 
     def to_json_object(self):
-        return {
+        json_object = {
                 'version': self.VERSION,
                 'player_id': self.player_id,
                 'player_name': self.player_name,
                 'responses': self._last_responses,
                 'context': self._context.to_json_object(),
-                'state': self._state.to_json_object()
+                'state': self._state.to_json_object(),
+                'actions_counter': self._actions_counter
             }
+        if self._scheduled_delayed_action is not None:
+            json_object['delayed_action'] = self._scheduled_delayed_action_to_json_object()
+        return json_object
+
+    def _scheduled_delayed_action_to_json_object(self):
+        delay, action = self._scheduled_delayed_action
+        return {
+            'delay': delay,
+            'command': action.command,
+            'args': list(action.args)
+        }
 
     def from_json_object(self, json_object):
         json_reader_helper = JsonReaderHelper(json_object)
         self._player_name = json_reader_helper.read_non_empty_string('player_name')
         self._last_responses = json_reader_helper.read_value_of_type_with_default('responses', list, default=[])
-        self._context.from_json_object(json_reader_helper.read_value_of_type_with_default('context', dict, default={}))
+        self._context.from_json_object(
+            json_reader_helper.read_value_of_type_with_default('context', dict, default={}),
+            version=json_reader_helper.read_value_of_type_with_default('version', int, default=self.UNVERSIONED))
         self._create_state_from_json_object(json_reader_helper.read_dict('state'))
+        self._actions_counter = json_reader_helper.read_value_of_type_with_default('actions_counter', int, default=0)
+        self._snapshot_actions_counter = self._actions_counter
+        delayed_action_json_object = json_reader_helper.read_optional_value_of_type('delayed_action', dict)
+        if delayed_action_json_object is not None and not self._context.has_action():
+            self._read_delayed_action_from_json_object(delayed_action_json_object)
+
+    def _read_delayed_action_from_json_object(self, json_object):
+        json_reader_helper = JsonReaderHelper(json_object)
+        delay = json_reader_helper.read_int_with_min('delay', min_value=0)
+        command = json_reader_helper.read_non_empty_string('command')
+        args = json_reader_helper.read_list('args')
+        self._context.generate_delayed_action(delay, command, *args)
 
     @classmethod
     def player_id_from_json_object(cls, json_object):
@@ -296,10 +348,7 @@ class StateMachine(Jsonable):
         self._state = state_class.create_from_json_object(json_reader_helper, self._context)
 
     def _find_state_class(self, state_name):
-        for state_class in self.TRANSITIONS.keys():
-            if state_class.state_name() == state_name:
-                return state_class
-        return None
+        return self._STATE_CLASSES_DICT.get(state_name)
 
     def is_started(self) -> bool:
         return type(self._state) is not StateStart
@@ -313,11 +362,63 @@ class StateMachine(Jsonable):
     def is_waiting_for_event(self) -> bool:
         return self._state.is_waiting_for_event()
 
+    def has_delayed_action(self) -> bool:
+        return self._context.has_action() or self._scheduled_delayed_action is not None
+
     def handle_delayed_action(self):
         if self._context.has_action():
             self._handle_context_action()
 
+    @property
+    def actions_counter(self) -> int:
+        return self._actions_counter
+
+    @property
+    def snapshot_actions_counter(self) -> int:
+        return self._snapshot_actions_counter
+
+    def mark_snapshot(self) -> int:
+        previous_snapshot_actions_counter = self._snapshot_actions_counter
+        self._snapshot_actions_counter = self._actions_counter
+        return previous_snapshot_actions_counter
+
+    def enable_journaling(self):
+        self._is_journaling = True
+
+    def take_journal_entries(self) -> list[dict]:
+        journal_entries = self._journal_entries
+        self._journal_entries = []
+        return journal_entries
+
+    def replay_action(self, action: StateMachineAction, is_delayed: bool=False):
+        self._is_replaying = True
+        try:
+            if is_delayed:
+                self._discard_delayed_action()
+            responses = self._on_action(action, is_delayed)
+        finally:
+            self._is_replaying = False
+        self._unschedule_delayed_action()
+        return responses
+
+    def _discard_delayed_action(self):
+        self._scheduled_delayed_action = None
+        if self._context.has_action():
+            self._context.take_action()
+
+    def _unschedule_delayed_action(self):
+        if self._scheduled_delayed_action is None:
+            return
+        delay, action = self._scheduled_delayed_action
+        self._scheduled_delayed_action = None
+        self._context.generate_delayed_action(delay, action.command, *action.args)
+
     def on_action(self, action):
+        return self._on_action(action, is_delayed=False)
+
+    def _on_action(self, action: StateMachineAction, is_delayed: bool):
+        if self.is_mutating_action(action):
+            self._record_action(action, is_delayed)
         try:
             if not self._handle_generic_action(action):
                 if self._handle_non_generic_action(action):
@@ -328,14 +429,44 @@ class StateMachine(Jsonable):
             self._context.add_response(str(exc))
         return self._context.take_responses()
 
+    def _record_action(self, action: StateMachineAction, is_delayed: bool):
+        self._actions_counter += 1
+        if not self._is_journaling or self._is_replaying:
+            return
+        self._journal_entries.append({
+            'seq': self._actions_counter,
+            'command': action.command,
+            'args': list(action.args),
+            'is_given_by_admin': action.is_given_by_admin,
+            'is_delayed': is_delayed,
+            'timestamp': self._services.now().isoformat(),
+            'player_name': self._player_name
+        })
+
+    def is_mutating_action(self, action: StateMachineAction) -> bool:
+        generic_action_handler = self._find_generic_action_handler(action)
+        if generic_action_handler is not None:
+            _, is_mutating_command, _ = generic_action_handler
+            return is_mutating_command
+        state_transition_table = self._current_state_transition_table()
+        return state_transition_table is not None and action.command in state_transition_table
+
     def _handle_generic_action(self, action: StateMachineAction) -> bool:
-        for command, (is_admin_command, handler) in self._generic_actions_handlers.items():
-            if command == action.command:
-                if not is_admin_command or action.is_given_by_admin:
-                    handler(action)
-                    return True
-        else:
+        generic_action_handler = self._find_generic_action_handler(action)
+        if generic_action_handler is None:
             return False
+        _, _, handler = generic_action_handler
+        handler(action)
+        return True
+
+    def _find_generic_action_handler(self, action: StateMachineAction):
+        generic_action_handler = self._generic_actions_handlers.get(action.command)
+        if generic_action_handler is None:
+            return None
+        is_admin_command, _, _ = generic_action_handler
+        if is_admin_command and not action.is_given_by_admin:
+            return None
+        return generic_action_handler
 
     def _show_available_commands(self, action: StateMachineAction):
         available_specific_commands = self._available_specific_commands(action.is_given_by_admin)
@@ -353,14 +484,14 @@ class StateMachine(Jsonable):
 
     def _available_specific_commands(self, is_admin: bool):
         available_specific_commands = []
-        for command, transition in self._current_state_transition_table().items():
+        for command, transition in (self._current_state_transition_table() or {}).items():
             if transition.guard(StateMachineAction(command, is_given_by_admin=is_admin)):
                 available_specific_commands.append(command)
         return available_specific_commands
 
     def _available_generic_commands(self, is_admin: bool):
         available_generic_commands = []
-        for command, (is_admin_command, _) in self._generic_actions_handlers.items():
+        for command, (is_admin_command, _, _) in self._generic_actions_handlers.items():
             if not is_admin_command or is_admin:
                 available_generic_commands.append(command)
         return available_generic_commands
@@ -422,11 +553,7 @@ class StateMachine(Jsonable):
     def _find_item(self, *item_name_parts):
         if len(item_name_parts) < 1:
             return None
-        searched_item_name = normalize_item_name(*item_name_parts)
-        for item in all_items():
-            if normalize_item_name(item.name).startswith(searched_item_name):
-                return item
-        return None
+        return Items.find_item_by_prefix(*item_name_parts)
 
     def _restore_hp(self, action):
         if not self._has_entered_tower():
@@ -592,13 +719,17 @@ class StateMachine(Jsonable):
         if delay == 0:
             self._handle_non_generic_action(action)
         else:
+            self._scheduled_delayed_action = (delay, action)
+            if self._is_replaying:
+                return
             self._services.timer(
                 name=f'Delayed "{action}" action',
                 interval=delay,
                 callback=lambda: self._handle_delayed_action(action))
 
     def _handle_delayed_action(self, action: StateMachineAction):
-        responses = self.on_action(action)
+        self._scheduled_delayed_action = None
+        responses = self._on_action(action, is_delayed=True)
         self._autonomous_action_result_handler(self.player_id, responses)
 
     def _current_state_transition_table(self) -> dict:
@@ -617,6 +748,10 @@ class StateMachine(Jsonable):
             self._state = transition.nextState.create(self._context, action.args)
             logger.debug(f"{self} changed state to {self._state}.")
             self._state.on_enter()
+            self._state_changed_handler(self._state)
 
     def __str__(self):
         return f'SM for "{self.player_id}"'
+
+
+StateMachine._STATE_CLASSES_DICT = {state_class.state_name(): state_class for state_class in StateMachine.TRANSITIONS}
@@ -8,16 +8,17 @@ from curry_quest.jsonable import Jsonable, InvalidJson, JsonReaderHelper
 from curry_quest.physical_attack_unit_action import PhysicalAttackUnitActionHandler
 from curry_quest.records import Records
 from curry_quest.records_events_handler import RecordsEventsHandler, EmptyRecordsEventsHandler
+from curry_quest.rng_state import encode_rng_state, decode_rng_state
 from curry_quest.spell_cast_unit_action import SpellCastContext, SpellCastActionHandler
 from curry_quest.state_machine_action import StateMachineAction
 from curry_quest.talents import Talents
 from curry_quest.unit import Unit
 from curry_quest.unit_action import UnitActionContext
 from curry_quest.unit_creator import UnitCreator
-from curry_quest.unit_traits import UnitTraits
 from curry_quest.services import Services
-from curry_quest.weight import WeightHandler
+from curry_quest.weight import WeightPenalties, WeightTable
 import logging
+import random
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +35,16 @@ class BattleContext(Jsonable):
         self.clear_turn_counter()
         self._finished = False
 
+    def clone(self) -> '__class__':
+        battle_context = self.__class__(self._enemy.clone())
+        battle_context._prepare_phase_counter = self._prepare_phase_counter
+        battle_context._holy_scroll_counter = self._holy_scroll_counter
+        battle_context.is_first_turn = self.is_first_turn
+        battle_context.is_player_turn = self.is_player_turn
+        battle_context._turn_counter = self._turn_counter
+        battle_context._finished = self._finished
+        return battle_context
+
     def to_json_object(self):
         return {
             'enemy': self._enemy.to_json_object(),
@@ -108,6 +119,8 @@ class BattleContext(Jsonable):
 class StateMachineContext(Jsonable):
     RESPONSE_LINE_BREAK = '\n'
     MIN_FLOOR = 0
+    COMPACT_RNG_STATE_VERSION = 4
+    ENEMY_FORBIDDEN_TALENTS = Talents.StrengthIncreased | Talents.Hard
 
     def __init__(self, game_config, services: Services=None):
         from curry_quest.config import Config
@@ -128,18 +141,21 @@ class StateMachineContext(Jsonable):
         self._generated_action = None
         self._floor_turns_counter = 0
         self._go_up_on_next_event_finished_flag = False
-        self._event_weight_handlers = {}
-        self._item_weight_handlers = {}
-        self._character_weight_handlers = {}
-        self._trap_weight_handlers = {}
-        self._fill_weight_handlers(self.game_config.events_weights, self._event_weight_handlers, key_suffix='_event')
-        self._fill_weight_handlers(self.game_config.found_items_weights, self._item_weight_handlers)
-        self._fill_weight_handlers(self.game_config.character_events_weights, self._character_weight_handlers)
-        self._fill_weight_handlers(self.game_config.traps_weights, self._trap_weight_handlers)
-
-    def _fill_weight_handlers(self, weight_descriptors, weight_handlers, key_suffix=''):
-        for key, weight_descriptor in weight_descriptors.items():
-            weight_handlers[key + key_suffix] = WeightHandler.from_descriptor(weight_descriptor)
+        self._weight_penalties = WeightPenalties(self._weight_tables.size)
+
+    def clone(self) -> '__class__':
+        context = self.__class__.__new__(self.__class__)
+        context.__dict__.update(self.__dict__)
+        context._current_climb_records = self._current_climb_records.clone()
+        context._familiar = None if self._familiar is None else self._familiar.clone()
+        context._inventory = self._inventory.clone()
+        context._battle_context = None if self._battle_context is None else self._battle_context.clone()
+        context._unit_buffer = None if self._unit_buffer is None else self._unit_buffer.clone()
+        context._rng = random.Random()
+        context._rng.setstate(self._rng.getstate())
+        context._responses = list(self._responses)
+        context._weight_penalties = self._weight_penalties.clone()
+        return context
 
     def to_json_object(self):
         json_object = {
@@ -147,7 +163,7 @@ class StateMachineContext(Jsonable):
             'is_tutorial_done': self.is_tutorial_done,
             'floor': self.floor,
             'inventory': self.inventory.to_json_object(),
-            'rng_state': jsonpickle.encode(self.rng.getstate()),
+            'rng_state': encode_rng_state(self.rng.getstate()),
             'responses': self._responses,
             'floor_turns_counter': self._floor_turns_counter,
             'go_up_on_next_event_finished_flag': self._go_up_on_next_event_finished_flag
@@ -162,10 +178,11 @@ class StateMachineContext(Jsonable):
             json_object['unit_buffer'] = self._unit_buffer.to_json_object()
         if self.has_action():
             json_object['generated_action'] = self._generated_action_to_json_object()
-        json_object['events_penalties'] = self._weight_handlers_to_json_object(self._event_weight_handlers)
-        json_object['items_penalties'] = self._weight_handlers_to_json_object(self._item_weight_handlers)
-        json_object['characters_penalties'] = self._weight_handlers_to_json_object(self._character_weight_handlers)
-        json_object['traps_penalties'] = self._weight_handlers_to_json_object(self._trap_weight_handlers)
+        weight_tables = self._weight_tables
+        json_object['events_penalties'] = weight_tables.events.penalty_timers(self._weight_penalties)
+        json_object['items_penalties'] = weight_tables.found_items.penalty_timers(self._weight_penalties)
+        json_object['characters_penalties'] = weight_tables.characters.penalty_timers(self._weight_penalties)
+        json_object['traps_penalties'] = weight_tables.traps.penalty_timers(self._weight_penalties)
         return json_object
 
     def _generated_action_to_json_object(self):
@@ -184,15 +201,7 @@ class StateMachineContext(Jsonable):
                 return False
         return True
 
-    def _weight_handlers_to_json_object(self, weight_handlers):
-        return {
-            key: weight_handler.penalty_timer
-            for key, weight_handler
-            in weight_handlers.items()
-            if weight_handler.has_penalty()
-        }
-
-    def from_json_object(self, json_object):
+    def from_json_object(self, json_object, version: int=None):
         json_reader_helper = JsonReaderHelper(json_object)
         self._is_tutorial_done = json_reader_helper.read_bool('is_tutorial_done')
         self._current_climb_records.from_json_object(json_reader_helper.read_dict('records'))
@@ -209,29 +218,35 @@ class StateMachineContext(Jsonable):
             self.buffer_item(ItemJsonLoader.from_json_object(json_object['item_buffer']))
         if 'unit_buffer' in json_object:
             self.buffer_unit(self.create_monster_from_json_object(json_object['unit_buffer']))
-        self._rng.setstate(jsonpickle.decode(json_reader_helper.read_string('rng_state')))
+        self._rng.setstate(self._read_rng_state(json_reader_helper.read_string('rng_state'), version))
         self._responses = json_reader_helper.read_list('responses')
         generated_action_json_object = json_reader_helper.read_optional_value_of_type('generated_action', dict)
         if generated_action_json_object is not None:
             self._read_generated_action_from_json_object(generated_action_json_object)
         self._floor_turns_counter = json_reader_helper.read_int_with_min('floor_turns_counter', min_value=0)
         self._go_up_on_next_event_finished_flag = json_reader_helper.read_bool('go_up_on_next_event_finished_flag')
-        self._read_weight_handlers_from_json_object(
+        weight_tables = self._weight_tables
+        self._read_weight_penalties_from_json_object(
             json_reader_helper,
             penalties_key='events_penalties',
-            weight_handlers=self._event_weight_handlers)
-        self._read_weight_handlers_from_json_object(
+            weight_table=weight_tables.events)
+        self._read_weight_penalties_from_json_object(
             json_reader_helper,
             penalties_key='items_penalties',
-            weight_handlers=self._item_weight_handlers)
-        self._read_weight_handlers_from_json_object(
+            weight_table=weight_tables.found_items)
+        self._read_weight_penalties_from_json_object(
             json_reader_helper,
             penalties_key='characters_penalties',
-            weight_handlers=self._character_weight_handlers)
-        self._read_weight_handlers_from_json_object(
+            weight_table=weight_tables.characters)
+        self._read_weight_penalties_from_json_object(
             json_reader_helper,
             penalties_key='traps_penalties',
-            weight_handlers=self._trap_weight_handlers)
+            weight_table=weight_tables.traps)
+
+    def _read_rng_state(self, rng_state_string: str, version: int) -> tuple:
+        if version is not None and version < self.COMPACT_RNG_STATE_VERSION:
+            return jsonpickle.decode(rng_state_string)
+        return decode_rng_state(rng_state_string)
 
     def _read_generated_action_from_json_object(self, json_object):
         json_reader_helper = JsonReaderHelper(json_object)
@@ -240,24 +255,28 @@ class StateMachineContext(Jsonable):
         args = json_reader_helper.read_list('args')
         self.generate_delayed_action(delay, command, *args)
 
-    def _read_weight_handlers_from_json_object(
+    def _read_weight_penalties_from_json_object(
             self,
             json_reader_helper: JsonReaderHelper,
             penalties_key: str,
-            weight_handlers: dict):
+            weight_table: WeightTable):
         penalties_json_object = json_reader_helper.read_optional_value_of_type(penalties_key, dict)
         if penalties_json_object is None:
             return
         penalties_json_reader_helper = JsonReaderHelper(penalties_json_object)
-        for key, weight_handler in weight_handlers.items():
+        for key in weight_table.keys:
             if key in penalties_json_reader_helper:
                 penalty_timer = penalties_json_reader_helper.read_non_negative(key)
-                weight_handler.penalty_timer = penalty_timer
+                weight_table.set_penalty_timer(self._weight_penalties, key, penalty_timer)
 
     @property
     def services(self) -> Services:
         return self._services
 
+    @services.setter
+    def services(self, new_services: Services):
+        self._services = new_services
+
     @property
     def records_events_handler(self):
         return self._records_events_handler
@@ -389,13 +408,12 @@ class StateMachineContext(Jsonable):
         highest_floor = self.game_config.highest_floor
         if floor > highest_floor:
             raise InvalidOperation(f'Highest floor is {highest_floor}')
-        floor_descriptor = self.game_config.floors[floor]
-        monster_descriptor = self.random_selection_with_weights(
-            dict(zip(floor_descriptor.monsters, floor_descriptor.weights)))
-        monster_traits = self.game_config.monsters_traits[monster_descriptor.name].copy()
-        self._remove_enemy_forbidden_talents(monster_traits)
-        monster_level = min(monster_descriptor.level + level_increase, self.game_config.levels.max_level)
-        return UnitCreator(monster_traits).create(monster_level, levels=self.game_config.levels)
+        spawn = self.game_config.floors[floor].spawn_table.select(self.rng)
+        monster_level = min(spawn.level + level_increase, self.game_config.levels.max_level)
+        return self.game_config.unit_prototypes.create(
+            spawn.traits,
+            monster_level,
+            forbidden_talents=self.ENEMY_FORBIDDEN_TALENTS)
 
     def generate_non_evolved_monster(self, level: int) -> Unit:
         monsters_traits = self.game_config.non_evolved_monster_traits
@@ -407,9 +425,6 @@ class StateMachineContext(Jsonable):
         logger.info(f"Selecting with weights '{element_weight_dictionary}'.")
         return self.rng.choices(list(element_weight_dictionary.keys()), list(element_weight_dictionary.values()))[0]
 
-    def _remove_enemy_forbidden_talents(self, enemy_traits: UnitTraits):
-        enemy_traits.talents &= ~(Talents.StrengthIncreased | Talents.Hard)
-
     def generate_action(self, command, *args):
         self._generate_action(0, command, *args)
 
@@ -549,51 +564,55 @@ class StateMachineContext(Jsonable):
             action_context.target = target
         return action_handler, action_context
 
+    @property
+    def _weight_tables(self):
+        return self.game_config.weight_tables
+
     @property
     def events_weights(self):
-        return self._create_weights(self._event_weight_handlers)
+        return self._weight_tables.events.weights(self, self._weight_penalties)
 
     @property
     def items_weights(self):
-        return self._create_weights(self._item_weight_handlers)
+        return self._weight_tables.found_items.weights(self, self._weight_penalties)
 
     @property
     def characters_weights(self):
-        return self._create_weights(self._character_weight_handlers)
+        return self._weight_tables.characters.weights(self, self._weight_penalties)
 
     @property
     def trap_weights(self):
-        return self._create_weights(self._trap_weight_handlers)
+        return self._weight_tables.traps.weights(self, self._weight_penalties)
+
+    def select_event(self):
+        return self._select_with_weight_table(self._weight_tables.events)
+
+    def select_found_item(self) -> Item:
+        return self._select_with_weight_table(self._weight_tables.found_items)
 
-    def _create_weights(self, weight_handlers):
-        weights = {}
-        for key, weight_handler in weight_handlers.items():
-            weight_value = weight_handler.value(self)
-            if weight_value > 0:
-                weights[key] = weight_value
-        return weights
+    def select_character(self, excluded_characters=()):
+        return self._select_with_weight_table(self._weight_tables.characters, excluded_characters)
+
+    def select_trap(self, excluded_traps=()):
+        return self._select_with_weight_table(self._weight_tables.traps, excluded_traps)
+
+    def _select_with_weight_table(self, weight_table: WeightTable, excluded_keys=()):
+        sampler = weight_table.sampler(self, self._weight_penalties, excluded_keys)
+        if sampler.is_empty():
+            return None
+        return sampler.select(self.rng)
 
     def set_event_weight_penalty(self, event):
-        self._set_weight_penalty(self._event_weight_handlers, event)
+        self._weight_tables.events.set_penalty(self._weight_penalties, event)
 
     def set_character_weight_penalty(self, character):
-        self._set_weight_penalty(self._character_weight_handlers, character)
+        self._weight_tables.characters.set_penalty(self._weight_penalties, character)
 
     def set_item_weight_penalty(self, item_name):
-        self._set_weight_penalty(self._item_weight_handlers, item_name)
+        self._weight_tables.found_items.set_penalty(self._weight_penalties, item_name)
 
     def set_trap_weight_penalty(self, trap):
-        self._set_weight_penalty(self._trap_weight_handlers, trap)
-
-    def _set_weight_penalty(self, weight_handlers, key):
-        weight_handlers[key].set_penalty()
+        self._weight_tables.traps.set_penalty(self._weight_penalties, trap)
 
     def decrease_weight_penalty_timers(self):
-        self._decrease_weight_penalty_timers(self._event_weight_handlers)
-        self._decrease_weight_penalty_timers(self._item_weight_handlers)
-        self._decrease_weight_penalty_timers(self._character_weight_handlers)
-        self._decrease_weight_penalty_timers(self._trap_weight_handlers)
-
-    def _decrease_weight_penalty_timers(self, weight_handlers):
-        for weight_handler in weight_handlers.values():
-            weight_handler.decrease_penalty_timer()
+        self._weight_penalties.decrease_timers()
@@ -21,21 +21,19 @@ class StateTrapEvent(StateBase):
         self._context.generate_action(command)
 
     def _select_trap(self):
-        traps_weights = self._context.trap_weights
-
-        def remove_weight(trap):
-            if trap in traps_weights:
-                del traps_weights[trap]
+        return self._trap or self._context.select_trap(self._excluded_traps())
 
+    def _excluded_traps(self):
+        excluded_traps = []
         if self._familiar().has_status(Statuses.Sleep):
-            remove_weight('Sleep')
+            excluded_traps.append('Sleep')
         if self._familiar().has_status(Statuses.Upheaval):
-            remove_weight('Upheaval')
+            excluded_traps.append('Upheaval')
         if self._familiar().has_status(Statuses.Crack):
-            remove_weight('Crack')
+            excluded_traps.append('Crack')
         if self._familiar().has_status(Statuses.Blind):
-            remove_weight('Blinder')
-        return self._trap or self._context.random_selection_with_weights(traps_weights)
+            excluded_traps.append('Blinder')
+        return excluded_traps
 
     def _familiar(self) -> Unit:
         return self._context.familiar
@@ -1,69 +1,266 @@
+from concurrent.futures import Future
+from curry_quest.jsonable import InvalidJson
+from curry_quest.persistence_writer import PersistenceWriter
+from curry_quest.replay import JournalGap, replay_journal_entry
 from curry_quest.state_machine import StateMachine
+from curry_quest.states_storage import StatesStorage, StateSummary, JsonFilesStatesStorage
 import json
 import logging
-import os.path
-from curry_quest.jsonable import InvalidJson
+import threading
 
 logger = logging.getLogger(__name__)
-STATE_FILE_SUFFIX = '.json'
 
 
-class StateFilesHandler:
-    def __init__(self, state_files_directory: str):
-        self._state_files_directory = state_files_directory
+class StatesHandler:
+    DEFAULT_SNAPSHOT_INTERVAL = 20
+
+    def __init__(
+            self,
+            states_storage: StatesStorage,
+            writer: PersistenceWriter=None,
+            snapshot_interval: int=DEFAULT_SNAPSHOT_INTERVAL):
+        self._states_storage = states_storage
+        self._writer = writer or PersistenceWriter()
+        self._snapshot_interval = snapshot_interval
+        self._failed_writes_lock = threading.Lock()
+        self._failed_writes_player_ids: set[int] = set()
 
-    def load(self, game_config):
-        return StateFilesLoader(self._state_files_directory, game_config).load()
+    def load(self, game_config) -> dict[int, StateMachine]:
+        self._writer.drain()
+        state_machines = {}
+        for state_json_object in self._states_storage.read_all():
+            try:
+                state_machine = self._create_state_machine(state_json_object, game_config)
+            except InvalidJson as exc:
+                logger.error(f"Error while loading state. Reason - {exc}.")
+                continue
+            state_machines[state_machine.player_id] = state_machine
+            logger.info(f"Loaded '{state_machine.player_id}'s' state.")
+        return state_machines
 
-    def save(self, state_machine: StateMachine):
-        player_id = state_machine.player_id
-        logger.debug(f"Saving state for '{player_id}'.")
+    def load_index(self, game_config) -> dict[int, StateSummary]:
+        states_index = self._read_states_index()
+        rebuilt_states_index = {}
+        for player_id in self._unindexed_player_ids():
+            summary = self._read_summary(player_id)
+            if summary is None:
+                state_machine = self.load_player(player_id, game_config)
+                if state_machine is None:
+                    continue
+                summary = self.state_summary(state_machine)
+            rebuilt_states_index[player_id] = summary
+        if len(rebuilt_states_index) > 0:
+            logger.info(f"Rebuilt states index for {len(rebuilt_states_index)} player(s).")
+            self._write_states_index(rebuilt_states_index)
+            states_index.update(rebuilt_states_index)
+        return states_index
+
+    def _read_states_index(self) -> dict[int, StateSummary]:
         try:
-            with open(self._player_state_file_path(player_id), mode='w') as player_state_file:
-                player_state_file.write(json.dumps(state_machine.to_json_object(), indent=2))
-        except IOError as exc:
-            logger.error(f"Could not save state file for '{player_id}'. Reason - {exc}.")
+            return self._states_storage.read_index()
+        except StatesStorage.StorageError as exc:
+            logger.error(f"Could not read states index. Reason - {exc}.")
+            return {}
 
-    def delete(self, player_id: int):
-        logger.debug(f"Removing state for '{player_id}'.")
+    def _unindexed_player_ids(self) -> list[int]:
+        try:
+            return self._states_storage.unindexed_player_ids()
+        except StatesStorage.StorageError as exc:
+            logger.error(f"Could not read unindexed player IDs. Reason - {exc}.")
+            return []
+
+    def _read_summary(self, player_id: int) -> StateSummary:
+        try:
+            return self._states_storage.read_summary(player_id)
+        except StatesStorage.StorageError as exc:
+            logger.error(f"Could not read '{player_id}'s' state summary. Reason - {exc}.")
+            return None
+
+    def _write_states_index(self, states_index: dict[int, StateSummary]):
         try:
-            os.remove(self._player_state_file_path(player_id))
-        except (IOError, FileNotFoundError) as exc:
-            logger.error(f"Could not delete state file for '{player_id}'. Reason - {exc}.")
-
-    def _player_state_file_path(self, player_id: int) -> str:
-        return os.path.join(self._state_files_directory, self._player_state_file_name(player_id))
-
-    def _player_state_file_name(self, player_id: int) -> str:
-        return str(player_id) + STATE_FILE_SUFFIX
-
-
-class StateFilesLoader:
-    def __init__(self, state_files_directory: str, game_config):
-        self._game_config = game_config
-        self._state_files_directory = state_files_directory
-        self._state_machines = {}
-
-    def load(self) -> dict[str, StateMachine]:
-        for file_name in os.listdir(self._state_files_directory):
-            file_path = os.path.join(self._state_files_directory, file_name)
-            if os.path.isfile(file_path):
-                self._load_state_file(file_path)
-        return self._state_machines
-
-    def _load_state_file(self, state_file_path: str):
-        _, state_file_name = os.path.split(state_file_path)
-        _, file_extension = os.path.splitext(state_file_name)
-        if file_extension != STATE_FILE_SUFFIX:
-            logger.debug(f"Non-json file trying to be loaded - {state_file_path}.")
+            self._states_storage.write_index(states_index)
+        except StatesStorage.StorageError as exc:
+            logger.error(f"Could not write states index. Reason - {exc}.")
+
+    def load_player(self, player_id: int, game_config) -> StateMachine:
+        self._writer.barrier(player_id)
+        try:
+            state_machine = self._create_state_machine(self._states_storage.read(player_id), game_config)
+        except (StatesStorage.StorageError, InvalidJson) as exc:
+            logger.error(f"Error while loading '{player_id}'s' state. Reason - {exc}.")
+            return None
+        logger.info(f"Loaded '{player_id}'s' state.")
+        return state_machine
+
+    @classmethod
+    def state_summary(cls, state_machine: StateMachine) -> StateSummary:
+        summary = StateSummary.Empty
+        if state_machine.is_waiting_for_event():
+            summary |= StateSummary.WaitingForEvent
+        if state_machine.has_delayed_action():
+            summary |= StateSummary.DelayedAction
+        return summary
+
+    def _create_state_machine(self, state_json_object, game_config) -> StateMachine:
+        player_id = StateMachine.player_id_from_json_object(state_json_object)
+        state_machine = StateMachine(game_config, player_id, player_name='')
+        state_machine.from_json_object(state_json_object)
+        self._replay_journal(state_machine)
+        self._attach_journal(state_machine)
+        return state_machine
+
+    def _attach_journal(self, state_machine: StateMachine):
+        if self._is_journaling_enabled:
+            state_machine.enable_journaling()
+
+    def _replay_journal(self, state_machine: StateMachine):
+        try:
+            journal = self._states_storage.read_journal(state_machine.player_id)
+        except StatesStorage.StorageError as exc:
+            logger.error(f"Could not read '{state_machine.player_id}'s' journal. Reason - {exc}.")
             return
+        replayed_actions_count = 0
+        for journal_entry in journal:
+            try:
+                if replay_journal_entry(state_machine, journal_entry) is None:
+                    continue
+            except JournalGap as exc:
+                logger.warning(
+                    f"'{state_machine.player_id}'s' journal has a gap. {exc} "
+                    f"Recovered up to action {state_machine.actions_counter}.")
+                break
+            except Exception as exc:
+                logger.error(
+                    f"Could not replay '{state_machine.player_id}'s' journal entry {journal_entry}. "
+                    f"{exc.__class__.__name__}: {exc}.")
+                break
+            replayed_actions_count += 1
+        if replayed_actions_count > 0:
+            logger.info(f"Replayed {replayed_actions_count} action(s) of '{state_machine.player_id}'.")
+
+    def save(self, state_machine: StateMachine) -> list[Future]:
+        return self.save_many([state_machine])
+
+    def save_many(self, state_machines: list[StateMachine]) -> list[Future]:
+        if len(state_machines) == 0:
+            return []
+        logger.debug(f"Saving state for {[state_machine.player_id for state_machine in state_machines]}.")
+        state_machines_by_lane: dict[int, list[StateMachine]] = {}
+        for state_machine in state_machines:
+            state_machines_by_lane.setdefault(self._writer.lane(state_machine.player_id), []).append(state_machine)
+        return [
+            self._submit_write(lane, lane_state_machines)
+            for lane, lane_state_machines
+            in state_machines_by_lane.items()
+        ]
+
+    def _submit_write(self, lane: int, state_machines: list[StateMachine]) -> Future:
+        encoded_states = {}
+        journal_entries = {}
+        journal_truncations = {}
+        states_summaries = {}
+        for state_machine in state_machines:
+            player_id = state_machine.player_id
+            self._attach_journal(state_machine)
+            encoded_journal_entries = self._encode_journal_entries(state_machine.take_journal_entries())
+            if self._take_failed_write(player_id):
+                logger.info(f"Previous write of '{player_id}'s' state failed. Forcing snapshot.")
+                encoded_journal_entries = None
+            if encoded_journal_entries is not None and len(encoded_journal_entries) > 0:
+                journal_entries[player_id] = encoded_journal_entries
+            if self._requires_snapshot(state_machine, encoded_journal_entries):
+                encoded_states[player_id] = self._states_storage.encode(state_machine.to_json_object())
+                previous_snapshot_actions_counter = state_machine.mark_snapshot()
+                if self._is_journaling_enabled and previous_snapshot_actions_counter is not None:
+                    journal_truncations[player_id] = previous_snapshot_actions_counter
+            states_summaries[player_id] = self.state_summary(state_machine)
+        return self._writer.submit_to_lane(
+            lane,
+            lambda: self._write(encoded_states, journal_entries, journal_truncations, states_summaries))
+
+    def _take_failed_write(self, player_id: int) -> bool:
+        with self._failed_writes_lock:
+            if player_id not in self._failed_writes_player_ids:
+                return False
+            self._failed_writes_player_ids.remove(player_id)
+            return True
+
+    def _record_failed_writes(self, player_ids: list[int]):
+        with self._failed_writes_lock:
+            self._failed_writes_player_ids.update(player_ids)
+
+    @property
+    def _is_journaling_enabled(self) -> bool:
+        return self._snapshot_interval > 1
+
+    def _encode_journal_entries(self, journal_entries: list[dict]) -> list[tuple[int, str]]:
+        if not self._is_journaling_enabled:
+            return None
         try:
-            with open(state_file_path, mode='r') as state_file:
-                state_json_object = json.load(state_file)
-                player_id = StateMachine.player_id_from_json_object(state_json_object)
-                state_machine = StateMachine(self._game_config, player_id, player_name='')
-                state_machine.from_json_object(state_json_object)
-                self._state_machines[player_id] = state_machine
-                logger.info(f"Loaded '{player_id}'s' state.")
-        except (IOError, json.JSONDecodeError, InvalidJson) as exc:
-            logger.error(f"Error while loading '{state_file_name}' state file. Reason - {exc}.")
+            return [(journal_entry['seq'], json.dumps(journal_entry)) for journal_entry in journal_entries]
+        except (TypeError, ValueError) as exc:
+            logger.warning(f"Journal entries cannot be encoded ({exc}). Falling back to snapshot.")
+            return None
+
+    def _requires_snapshot(self, state_machine: StateMachine, encoded_journal_entries: list[tuple[int, str]]) -> bool:
+        if encoded_journal_entries is None or len(encoded_journal_entries) == 0:
+            return True
+        if state_machine.snapshot_actions_counter is None:
+            return True
+        return state_machine.actions_counter - state_machine.snapshot_actions_counter >= self._snapshot_interval
+
+    def _write(
+            self,
+            encoded_states: dict[int, str],
+            journal_entries: dict[int, list[tuple[int, str]]],
+            journal_truncations: dict[int, int],
+            states_summaries: dict[int, StateSummary]):
+        player_ids = list(states_summaries.keys())
+        try:
+            if len(journal_entries) > 0:
+                self._states_storage.append_journal(journal_entries)
+            if len(encoded_states) > 0:
+                self._states_storage.write_encoded_many(
+                    encoded_states,
+                    dict((player_id, states_summaries[player_id]) for player_id in encoded_states.keys()))
+            journaled_states_summaries = dict(
+                (player_id, summary)
+                for player_id, summary
+                in states_summaries.items()
+                if player_id not in encoded_states)
+            if len(journaled_states_summaries) > 0:
+                self._states_storage.write_index(journaled_states_summaries)
+            for player_id, up_to_sequence_number in journal_truncations.items():
+                self._states_storage.truncate_journal(player_id, up_to_sequence_number)
+        except StatesStorage.StorageError as exc:
+            logger.error(f"Could not save state for {player_ids}. Reason - {exc}.")
+            self._record_failed_writes(player_ids)
+
+    def delete(self, player_id: int) -> Future:
+        logger.debug(f"Removing state for '{player_id}'.")
+        return self._writer.submit(player_id, lambda: self._delete(player_id))
+
+    def _delete(self, player_id: int):
+        try:
+            self._states_storage.delete(player_id)
+        except StatesStorage.StorageError as exc:
+            logger.error(f"Could not delete state for '{player_id}'. Reason - {exc}.")
+
+    def flush(self):
+        self._writer.drain()
+
+    def flush_player(self, player_id: int):
+        self._writer.barrier(player_id)
+
+    def close(self):
+        self._writer.drain()
+        self._states_storage.close()
+
+
+class StateFilesHandler(StatesHandler):
+    def __init__(
+            self,
+            state_files_directory: str,
+            writer: PersistenceWriter=None,
+            snapshot_interval: int=StatesHandler.DEFAULT_SNAPSHOT_INTERVAL):
+        super().__init__(JsonFilesStatesStorage(state_files_directory), writer, snapshot_interval)
@@ -0,0 +1,590 @@
+from abc import ABC, abstractmethod
+from curry_quest.jsonable import InvalidJson
+from curry_quest.state_machine import StateMachine
+import enum
+import json
+import logging
+import os.path
+import sqlite3
+import threading
+from typing import Iterator
+import zlib
+
+logger = logging.getLogger(__name__)
+
+
+class StateSummary(enum.Flag):
+    Empty = 0x0
+    WaitingForEvent = 0x1
+    DelayedAction = 0x2
+
+
+class StatesStorage(ABC):
+    class StorageError(Exception):
+        pass
+
+    @abstractmethod
+    def player_ids(self) -> list[int]: pass
+
+    @abstractmethod
+    def read(self, player_id: int) -> dict: pass
+
+    @abstractmethod
+    def read_previous(self, player_id: int) -> dict: pass
+
+    @abstractmethod
+    def read_all(self) -> Iterator[dict]: pass
+
+    @abstractmethod
+    def read_index(self) -> dict[int, StateSummary]: pass
+
+    @abstractmethod
+    def unindexed_player_ids(self) -> list[int]: pass
+
+    @abstractmethod
+    def read_summary(self, player_id: int) -> StateSummary: pass
+
+    def encode(self, json_object: dict) -> str:
+        return json.dumps(json_object)
+
+    def write_many(self, json_objects: dict[int, dict], states_summaries: dict[int, StateSummary]=None):
+        self.write_encoded_many(
+            dict((player_id, self.encode(json_object)) for player_id, json_object in json_objects.items()),
+            states_summaries)
+
+    @abstractmethod
+    def write_encoded_many(self, encoded_states: dict[int, str], states_summaries: dict[int, StateSummary]=None):
+        pass
+
+    @abstractmethod
+    def write_index(self, states_summaries: dict[int, StateSummary]): pass
+
+    @abstractmethod
+    def append_journal(self, journal_entries: dict[int, list[tuple[int, str]]]): pass
+
+    @abstractmethod
+    def read_journal(self, player_id: int) -> list[dict]: pass
+
+    @abstractmethod
+    def truncate_journal(self, player_id: int, up_to_sequence_number: int): pass
+
+    @abstractmethod
+    def delete(self, player_id: int): pass
+
+    def close(self):
+        pass
+
+
+class JsonFilesStatesStorage(StatesStorage):
+    STATE_FILE_SUFFIX = '.json'
+    PREVIOUS_GENERATION_SUFFIX = '.prev'
+    TEMPORARY_FILE_SUFFIX = '.tmp'
+    JOURNAL_FILE_SUFFIX = '.journal'
+    CHECKSUM_HEADER_PREFIX = '#crc32:'
+    SUMMARY_HEADER_FIELD_PREFIX = 'summary:'
+    INDEX_FILE_NAME = 'states.index'
+    INDEX_HEADER = '#states-index'
+    INDEX_COMPACTION_MIN_LINES = 1000
+
+    def __init__(self, state_files_directory: str, fsync: bool=False):
+        self._state_files_directory = state_files_directory
+        self._fsync = fsync
+        self._states_index: dict[int, StateSummary] = None
+        self._is_states_index_complete = False
+        self._pending_unindexed_player_ids: set[int] = set()
+        self._states_index_log_lines_count = 0
+        self._states_index_lock = threading.Lock()
+
+    def player_ids(self) -> list[int]:
+        player_ids = set()
+        for file_name in os.listdir(self._state_files_directory):
+            if file_name.endswith(self.PREVIOUS_GENERATION_SUFFIX):
+                file_name = file_name[:-len(self.PREVIOUS_GENERATION_SUFFIX)]
+            player_id_string, file_extension = os.path.splitext(file_name)
+            if file_extension == self.STATE_FILE_SUFFIX and player_id_string.isdigit():
+                player_ids.add(int(player_id_string))
+        return list(player_ids)
+
+    def read(self, player_id: int) -> dict:
+        state_file_path = self._player_state_file_path(player_id)
+        try:
+            return self._read_state_file(state_file_path)
+        except self.StorageError as exc:
+            previous_generation_file_path = state_file_path + self.PREVIOUS_GENERATION_SUFFIX
+            if not os.path.isfile(previous_generation_file_path):
+                raise
+            logger.warning(f"'{player_id}'s' state is not valid ({exc}). Falling back to previous generation.")
+            return self._read_state_file(previous_generation_file_path)
+
+    def read_previous(self, player_id: int) -> dict:
+        previous_generation_file_path = self._player_state_file_path(player_id) + self.PREVIOUS_GENERATION_SUFFIX
+        if not os.path.isfile(previous_generation_file_path):
+            return None
+        return self._read_state_file(previous_generation_file_path)
+
+    def read_all(self) -> Iterator[dict]:
+        for player_id in self.player_ids():
+            try:
+                yield self.read(player_id)
+            except self.StorageError as exc:
+                logger.error(f"Error while loading '{player_id}'s' state file. Reason - {exc}.")
+
+    def _read_state_file(self, file_path: str) -> dict:
+        try:
+            with open(file_path, mode='r') as state_file:
+                state_file_content = state_file.read()
+        except IOError as exc:
+            raise self.StorageError(str(exc))
+        if state_file_content.startswith(self.CHECKSUM_HEADER_PREFIX):
+            header, _, state_file_content = state_file_content.partition('\n')
+            checksum, _ = self._parse_state_file_header(header)
+            if checksum != self._checksum(state_file_content):
+                raise self.StorageError(f'Checksum mismatch in "{file_path}"')
+        try:
+            return json.loads(state_file_content)
+        except json.JSONDecodeError as exc:
+            raise self.StorageError(str(exc))
+
+    def _parse_state_file_header(self, header: str) -> tuple[str, StateSummary]:
+        checksum, *fields = header[len(self.CHECKSUM_HEADER_PREFIX):].split(' ')
+        summary = None
+        for field in fields:
+            if field.startswith(self.SUMMARY_HEADER_FIELD_PREFIX):
+                try:
+                    summary = StateSummary(int(field[len(self.SUMMARY_HEADER_FIELD_PREFIX):]))
+                except ValueError:
+                    summary = None
+        return checksum, summary
+
+    def _checksum(self, encoded_state: str) -> str:
+        return f'{zlib.crc32(encoded_state.encode()):08x}'
+
+    def read_index(self) -> dict[int, StateSummary]:
+        with self._states_index_lock:
+            return dict(self._loaded_states_index())
+
+    def unindexed_player_ids(self) -> list[int]:
+        with self._states_index_lock:
+            states_index = self._loaded_states_index()
+            if self._is_states_index_complete:
+                return []
+            unindexed_player_ids = [player_id for player_id in self.player_ids() if player_id not in states_index]
+            self._pending_unindexed_player_ids = set(unindexed_player_ids)
+            if len(unindexed_player_ids) == 0:
+                self._complete_states_index()
+            return unindexed_player_ids
+
+    def read_summary(self, player_id: int) -> StateSummary:
+        if os.path.isfile(self._journal_file_path(player_id)):
+            return None
+        try:
+            with open(self._player_state_file_path(player_id), mode='r') as state_file:
+                header = state_file.readline().rstrip('\n')
+        except IOError:
+            return None
+        if not header.startswith(self.CHECKSUM_HEADER_PREFIX):
+            return None
+        _, summary = self._parse_state_file_header(header)
+        return summary
+
+    def _loaded_states_index(self) -> dict[int, StateSummary]:
+        if self._states_index is None:
+            self._states_index = self._read_states_index_file()
+        return self._states_index
+
+    def _read_states_index_file(self) -> dict[int, StateSummary]:
+        states_index = {}
+        try:
+            with open(self._index_file_path(), mode='r') as index_file:
+                index_lines = index_file.read().splitlines()
+        except FileNotFoundError:
+            return states_index
+        except IOError as exc:
+            logger.info(f"States index could not be read. Reason - {exc}.")
+            return states_index
+        self._is_states_index_complete = len(index_lines) > 0 and index_lines[0] == self.INDEX_HEADER
+        index_log_lines = index_lines[1:] if self._is_states_index_complete else index_lines
+        for index_line in index_log_lines:
+            try:
+                self._apply_states_index_changes(states_index, json.loads(index_line))
+            except (json.JSONDecodeError, AttributeError, TypeError, ValueError) as exc:
+                logger.warning(f"States index is truncated ({exc}). Ignoring remaining entries.")
+                self._is_states_index_complete = False
+                break
+        self._states_index_log_lines_count = len(index_log_lines)
+        return states_index
+
+    def _apply_states_index_changes(self, states_index: dict[int, StateSummary], changes_json_object: dict):
+        for player_id_string, summary_value in changes_json_object.items():
+            if summary_value is None:
+                states_index.pop(int(player_id_string), None)
+            else:
+                states_index[int(player_id_string)] = StateSummary(summary_value)
+
+    def encode(self, json_object: dict) -> str:
+        return json.dumps(json_object, indent=2)
+
+    def write_encoded_many(self, encoded_states: dict[int, str], states_summaries: dict[int, StateSummary]=None):
+        states_summaries = states_summaries or {}
+        self._update_states_index(encoded_states.keys(), states_summaries)
+        try:
+            for player_id, encoded_state in encoded_states.items():
+                self._write_temporary_state_file(player_id, encoded_state, states_summaries.get(player_id))
+            for player_id in encoded_states.keys():
+                self._replace_state_file(player_id)
+            if self._fsync:
+                self._fsync_directory()
+        except OSError as exc:
+            raise self.StorageError(str(exc))
+
+    def _write_temporary_state_file(self, player_id: int, encoded_state: str, summary: StateSummary):
+        header = f'{self.CHECKSUM_HEADER_PREFIX}{self._checksum(encoded_state)}'
+        if summary is not None:
+            header += f' {self.SUMMARY_HEADER_FIELD_PREFIX}{summary.value}'
+        with open(self._player_state_file_path(player_id) + self.TEMPORARY_FILE_SUFFIX, mode='w') as state_file:
+            state_file.write(f'{header}\n')
+            state_file.write(encoded_state)
+            if self._fsync:
+                state_file.flush()
+                os.fsync(state_file.fileno())
+
+    def _replace_state_file(self, player_id: int):
+        state_file_path = self._player_state_file_path(player_id)
+        if os.path.isfile(state_file_path):
+            os.replace(state_file_path, state_file_path + self.PREVIOUS_GENERATION_SUFFIX)
+        os.replace(state_file_path + self.TEMPORARY_FILE_SUFFIX, state_file_path)
+
+    def _fsync_directory(self):
+        if not hasattr(os, 'O_DIRECTORY'):
+            return
+        directory_fd = os.open(self._state_files_directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
+
+    def write_index(self, states_summaries: dict[int, StateSummary]):
+        self._update_states_index(states_summaries.keys(), states_summaries)
+
+    def _update_states_index(self, player_ids, states_summaries: dict[int, StateSummary]):
+        with self._states_index_lock:
+            self._update_loaded_states_index(player_ids, states_summaries)
+
+    def _update_loaded_states_index(self, player_ids, states_summaries: dict[int, StateSummary]):
+        states_index = self._loaded_states_index()
+        changes_json_object = {}
+        for player_id in player_ids:
+            summary = states_summaries.get(player_id)
+            if states_index.get(player_id) == summary:
+                continue
+            changes_json_object[player_id] = None if summary is None else summary.value
+        if len(changes_json_object) > 0:
+            self._append_states_index_changes(changes_json_object)
+            self._apply_states_index_changes(states_index, changes_json_object)
+        if len(self._pending_unindexed_player_ids) > 0:
+            self._pending_unindexed_player_ids.difference_update(states_index.keys())
+            if len(self._pending_unindexed_player_ids) == 0:
+                self._complete_states_index()
+                return
+        if self._states_index_log_lines_count > max(len(states_index), self.INDEX_COMPACTION_MIN_LINES):
+            self._write_states_index_file()
+
+    def _append_states_index_changes(self, changes_json_object: dict):
+        try:
+            with open(self._index_file_path(), mode='a') as index_file:
+                index_file.write(f'{json.dumps(changes_json_object)}\n')
+        except IOError as exc:
+            raise self.StorageError(str(exc))
+        self._states_index_log_lines_count += 1
+
+    def _complete_states_index(self):
+        self._is_states_index_complete = True
+        self._write_states_index_file()
+
+    def _write_states_index_file(self):
+        index_lines = [self.INDEX_HEADER] if self._is_states_index_complete else []
+        index_lines.append(
+            json.dumps(dict((player_id, summary.value) for player_id, summary in self._states_index.items())))
+        index_file_path = self._index_file_path()
+        temporary_index_file_path = index_file_path + self.TEMPORARY_FILE_SUFFIX
+        try:
+            with open(temporary_index_file_path, mode='w') as index_file:
+                index_file.writelines(f'{index_line}\n' for index_line in index_lines)
+            os.replace(temporary_index_file_path, index_file_path)
+        except IOError as exc:
+            raise self.StorageError(str(exc))
+        self._states_index_log_lines_count = 1
+
+    def append_journal(self, journal_entries: dict[int, list[tuple[int, str]]]):
+        try:
+            for player_id, player_journal_entries in journal_entries.items():
+                with open(self._journal_file_path(player_id), mode='a') as journal_file:
+                    journal_file.writelines(f'{encoded_entry}\n' for _, encoded_entry in player_journal_entries)
+                    if self._fsync:
+                        journal_file.flush()
+                        os.fsync(journal_file.fileno())
+        except OSError as exc:
+            raise self.StorageError(str(exc))
+
+    def read_journal(self, player_id: int) -> list[dict]:
+        journal_file_path = self._journal_file_path(player_id)
+        if not os.path.isfile(journal_file_path):
+            return []
+        try:
+            with open(journal_file_path, mode='r') as journal_file:
+                journal_lines = journal_file.readlines()
+        except OSError as exc:
+            raise self.StorageError(str(exc))
+        journal = []
+        for journal_line in journal_lines:
+            try:
+                journal.append(json.loads(journal_line))
+            except json.JSONDecodeError as exc:
+                logger.warning(f"'{player_id}'s' journal is truncated ({exc}). Ignoring remaining entries.")
+                break
+        return journal
+
+    def truncate_journal(self, player_id: int, up_to_sequence_number: int):
+        journal_file_path = self._journal_file_path(player_id)
+        remaining_journal = [
+            json.dumps(journal_entry)
+            for journal_entry
+            in self.read_journal(player_id)
+            if journal_entry.get('seq', 0) > up_to_sequence_number
+        ]
+        try:
+            if len(remaining_journal) == 0:
+                if os.path.isfile(journal_file_path):
+                    os.remove(journal_file_path)
+                return
+            with open(journal_file_path + self.TEMPORARY_FILE_SUFFIX, mode='w') as journal_file:
+                journal_file.writelines(f'{encoded_entry}\n' for encoded_entry in remaining_journal)
+            os.replace(journal_file_path + self.TEMPORARY_FILE_SUFFIX, journal_file_path)
+        except OSError as exc:
+            raise self.StorageError(str(exc))
+
+    def delete(self, player_id: int):
+        state_file_path = self._player_state_file_path(player_id)
+        try:
+            for file_path in [
+                    state_file_path,
+                    state_file_path + self.PREVIOUS_GENERATION_SUFFIX,
+                    state_file_path + self.TEMPORARY_FILE_SUFFIX,
+                    self._journal_file_path(player_id)]:
+                if os.path.isfile(file_path):
+                    os.remove(file_path)
+        except OSError as exc:
+            raise self.StorageError(str(exc))
+        self._update_states_index([player_id], {})
+
+    def close(self):
+        with self._states_index_lock:
+            if self._states_index is None or self._states_index_log_lines_count <= 1:
+                return
+            try:
+                self._write_states_index_file()
+            except self.StorageError as exc:
+                logger.error(f"Could not compact states index. Reason - {exc}.")
+
+    def _player_state_file_path(self, player_id: int) -> str:
+        return os.path.join(self._state_files_directory, self._player_state_file_name(player_id))
+
+    def _player_state_file_name(self, player_id: int) -> str:
+        return str(player_id) + self.STATE_FILE_SUFFIX
+
+    def _journal_file_path(self, player_id: int) -> str:
+        return os.path.join(self._state_files_directory, str(player_id) + self.JOURNAL_FILE_SUFFIX)
+
+    def _index_file_path(self) -> str:
+        return os.path.join(self._state_files_directory, self.INDEX_FILE_NAME)
+
+
+class SqliteStatesStorage(StatesStorage):
+    def __init__(self, database_path: str):
+        self._database_path = database_path
+        self._connection_lock = threading.Lock()
+        try:
+            self._connection = sqlite3.connect(database_path, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            with self._connection:
+                self._connection.execute(
+                    'CREATE TABLE IF NOT EXISTS player_states (player_id INTEGER PRIMARY KEY, state TEXT NOT NULL)')
+                self._add_missing_column('summary', 'INTEGER')
+                self._add_missing_column('previous_state', 'TEXT')
+                self._connection.execute(
+                    'CREATE TABLE IF NOT EXISTS player_journals ('
+                    'player_id INTEGER NOT NULL, seq INTEGER NOT NULL, entry TEXT NOT NULL, '
+                    'PRIMARY KEY (player_id, seq))')
+        except sqlite3.Error as exc:
+            raise self.StorageError(f'Could not open "{database_path}" - {exc}')
+
+    def _add_missing_column(self, column_name: str, column_type: str):
+        columns = self._connection.execute('PRAGMA table_info(player_states)').fetchall()
+        if column_name not in (column[1] for column in columns):
+            self._connection.execute(f'ALTER TABLE player_states ADD COLUMN {column_name} {column_type}')
+
+    def player_ids(self) -> list[int]:
+        return [player_id for player_id, in self._execute('SELECT player_id FROM player_states')]
+
+    def read(self, player_id: int) -> dict:
+        rows = self._execute('SELECT state FROM player_states WHERE player_id = ?', (player_id,))
+        if len(rows) == 0:
+            raise self.StorageError(f'No state for "{player_id}"')
+        state, = rows[0]
+        return self._decode(player_id, state)
+
+    def read_previous(self, player_id: int) -> dict:
+        rows = self._execute('SELECT previous_state FROM player_states WHERE player_id = ?', (player_id,))
+        if len(rows) == 0:
+            return None
+        previous_state, = rows[0]
+        return None if previous_state is None else self._decode(player_id, previous_state)
+
+    def read_all(self) -> Iterator[dict]:
+        for player_id, state in self._execute('SELECT player_id, state FROM player_states'):
+            try:
+                yield self._decode(player_id, state)
+            except self.StorageError as exc:
+                logger.error(f"Error while loading '{player_id}' state. Reason - {exc}.")
+
+    def read_index(self) -> dict[int, StateSummary]:
+        return dict(
+            (player_id, StateSummary(summary_value))
+            for player_id, summary_value
+            in self._execute('SELECT player_id, summary FROM player_states WHERE summary IS NOT NULL'))
+
+    def unindexed_player_ids(self) -> list[int]:
+        return [player_id for player_id, in self._execute('SELECT player_id FROM player_states WHERE summary IS NULL')]
+
+    def read_summary(self, player_id: int) -> StateSummary:
+        rows = self._execute('SELECT summary FROM player_states WHERE player_id = ?', (player_id,))
+        if len(rows) == 0:
+            return None
+        summary_value, = rows[0]
+        return None if summary_value is None else StateSummary(summary_value)
+
+    def _decode(self, player_id: int, state: str) -> dict:
+        try:
+            return json.loads(state)
+        except json.JSONDecodeError as exc:
+            raise self.StorageError(f'Invalid state for "{player_id}" - {exc}')
+
+    def write_encoded_many(self, encoded_states: dict[int, str], states_summaries: dict[int, StateSummary]=None):
+        states_summaries = states_summaries or {}
+        rows = [
+            (player_id, encoded_state, self._summary_value(states_summaries.get(player_id)))
+            for player_id, encoded_state
+            in encoded_states.items()
+        ]
+        self._execute_many(
+            'INSERT INTO player_states (player_id, state, summary) VALUES (?, ?, ?) '
+            'ON CONFLICT (player_id) DO UPDATE SET '
+            'previous_state = state, state = excluded.state, summary = excluded.summary',
+            rows)
+
+    def write_index(self, states_summaries: dict[int, StateSummary]):
+        self._execute_many(
+            'UPDATE player_states SET summary = ? WHERE player_id = ?',
+            [(self._summary_value(summary), player_id) for player_id, summary in states_summaries.items()])
+
+    def _summary_value(self, summary: StateSummary):
+        return None if summary is None else summary.value
+
+    def append_journal(self, journal_entries: dict[int, list[tuple[int, str]]]):
+        self._execute_many(
+            'INSERT OR REPLACE INTO player_journals (player_id, seq, entry) VALUES (?, ?, ?)',
+            [
+                (player_id, sequence_number, encoded_entry)
+                for player_id, player_journal_entries in journal_entries.items()
+                for sequence_number, encoded_entry in player_journal_entries
+            ])
+
+    def read_journal(self, player_id: int) -> list[dict]:
+        journal = []
+        for entry, in self._execute('SELECT entry FROM player_journals WHERE player_id = ? ORDER BY seq', (player_id,)):
+            try:
+                journal.append(json.loads(entry))
+            except json.JSONDecodeError as exc:
+                logger.warning(f"'{player_id}'s' journal is corrupted ({exc}). Ignoring remaining entries.")
+                break
+        return journal
+
+    def truncate_journal(self, player_id: int, up_to_sequence_number: int):
+        self._execute_many(
+            'DELETE FROM player_journals WHERE player_id = ? AND seq <= ?',
+            [(player_id, up_to_sequence_number)])
+
+    def delete(self, player_id: int):
+        self._execute_in_transaction([
+            ('DELETE FROM player_states WHERE player_id = ?', [(player_id,)]),
+            ('DELETE FROM player_journals WHERE player_id = ?', [(player_id,)])
+        ])
+
+    def _execute(self, query: str, parameters: tuple=()) -> list[tuple]:
+        try:
+            with self._connection_lock:
+                return self._connection.execute(query, parameters).fetchall()
+        except sqlite3.Error as exc:
+            raise self.StorageError(str(exc))
+
+    def _execute_many(self, query: str, parameters_list: list[tuple]):
+        self._execute_in_transaction([(query, parameters_list)])
+
+    def _execute_in_transaction(self, queries: list[tuple[str, list[tuple]]]):
+        try:
+            with self._connection_lock, self._connection:
+                for query, parameters_list in queries:
+                    self._connection.executemany(query, parameters_list)
+        except sqlite3.Error as exc:
+            raise self.StorageError(str(exc))
+
+    def close(self):
+        with self._connection_lock:
+            self._connection.close()
+
+
+def migrate_states(
+        source: StatesStorage,
+        destination: StatesStorage,
+        states_summaries: dict[int, StateSummary]=None,
+        batch_size: int=500) -> int:
+    if len(destination.player_ids()) > 0:
+        raise StatesStorage.StorageError('Destination already holds states')
+    states_summaries = states_summaries or {}
+    migrated_states_count = 0
+    batch = {}
+
+    def write_batch():
+        nonlocal migrated_states_count
+        destination.write_many(
+            batch,
+            dict(
+                (player_id, states_summaries[player_id])
+                for player_id
+                in batch.keys()
+                if player_id in states_summaries))
+        destination.append_journal(dict(
+            (player_id, [
+                (journal_entry['seq'], json.dumps(journal_entry))
+                for journal_entry
+                in source.read_journal(player_id)
+            ])
+            for player_id
+            in batch.keys()))
+        migrated_states_count += len(batch)
+        batch.clear()
+
+    for json_object in source.read_all():
+        try:
+            player_id = StateMachine.player_id_from_json_object(json_object)
+        except InvalidJson as exc:
+            logger.error(f"Skipping state without valid player ID. Reason - {exc}.")
+            continue
+        batch[player_id] = json_object
+        if len(batch) >= batch_size:
+            write_batch()
+    if len(batch) > 0:
+        write_batch()
+    logger.info(f"Migrated {migrated_states_count} state(s).")
+    return migrated_states_count
@@ -3,24 +3,95 @@ from curry_quest.talents import Talents
 from curry_quest.unit_traits import UnitTraits
 
 
+class StatsTable:
+    def __init__(self):
+        self.hp: list[int] = []
+        self.mp: list[int] = []
+        self.attack: list[int] = []
+        self.defense: list[int] = []
+        self.luck: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.hp)
+
+
 class StatsCalculator:
+    MAX_STAT = 255
+    MAX_GIVEN_EXPERIENCE = 65535
+    MAX_STATS_TABLES = 1024
+    _stats_tables: dict[tuple, StatsTable] = {}
+
     def __init__(self, unit_traits: UnitTraits):
         self._unit_traits = unit_traits
+        self._stats_table = self._shared_stats_table(self._stats_key(unit_traits))
+
+    @classmethod
+    def _shared_stats_table(cls, stats_key: tuple) -> StatsTable:
+        stats_table = cls._stats_tables.get(stats_key)
+        if stats_table is None:
+            if len(cls._stats_tables) >= cls.MAX_STATS_TABLES:
+                del cls._stats_tables[next(iter(cls._stats_tables))]
+            stats_table = cls._stats_tables[stats_key] = StatsTable()
+        return stats_table
+
+    @classmethod
+    def _stats_key(cls, unit_traits: UnitTraits) -> tuple:
+        return (
+            unit_traits.is_evolved,
+            unit_traits.base_hp,
+            unit_traits.hp_growth,
+            unit_traits.base_mp,
+            unit_traits.mp_growth,
+            unit_traits.base_attack,
+            unit_traits.attack_growth,
+            unit_traits.base_defense,
+            unit_traits.defense_growth,
+            unit_traits.base_luck,
+            unit_traits.luck_growth)
+
+    def tabulate(self, max_level: int):
+        stats_table = self._stats_table
+        for level in range(len(stats_table) + 1, max_level + 1):
+            stats_table.hp.append(self._calculate_hp(level))
+            stats_table.mp.append(self._calculate_non_hp_stat(level, self._mp_stat_descriptor()))
+            stats_table.attack.append(self._calculate_non_hp_stat(level, self._attack_stat_descriptor()))
+            stats_table.defense.append(self._calculate_non_hp_stat(level, self._defense_stat_descriptor()))
+            stats_table.luck.append(self._calculate_non_hp_stat(level, self._luck_stat_descriptor()))
+
+    def _tabulated_stats(self, level) -> StatsTable:
+        if level < 1:
+            return None
+        if level > len(self._stats_table):
+            self.tabulate(level)
+        return self._stats_table
 
     def hp(self, level):
-        return self._evolved_hp(level) if self._is_evolved() else self._non_evolved_hp(level)
+        stats_table = self._tabulated_stats(level)
+        return self._calculate_hp(level) if stats_table is None else stats_table.hp[level - 1]
 
     def mp(self, level):
-        return self._non_hp_stat(level, self._mp_stat_descriptor())
+        stats_table = self._tabulated_stats(level)
+        if stats_table is None:
+            return self._calculate_non_hp_stat(level, self._mp_stat_descriptor())
+        return stats_table.mp[level - 1]
 
     def attack(self, level):
-        return self._non_hp_stat(level, self._attack_stat_descriptor())
+        stats_table = self._tabulated_stats(level)
+        if stats_table is None:
+            return self._calculate_non_hp_stat(level, self._attack_stat_descriptor())
+        return stats_table.attack[level - 1]
 
     def defense(self, level):
-        return self._non_hp_stat(level, self._defense_stat_descriptor())
+        stats_table = self._tabulated_stats(level)
+        if stats_table is None:
+            return self._calculate_non_hp_stat(level, self._defense_stat_descriptor())
+        return stats_table.defense[level - 1]
 
     def luck(self, level):
-        return self._non_hp_stat(level, self._luck_stat_descriptor())
+        stats_table = self._tabulated_stats(level)
+        if stats_table is None:
+            return self._calculate_non_hp_stat(level, self._luck_stat_descriptor())
+        return stats_table.luck[level - 1]
 
     def hp_increase(self, level):
         return self._stat_increase(level, self._unit_traits.base_hp, self.hp)
@@ -45,32 +116,22 @@ class StatsCalculator:
         exp += (x * x * (base_exp_given + exp_growth * x)) // 512
         if self._unit_traits.talents.has(Talents.GrowthPromoted):
             exp *= 2
-        return min(exp, 65535)
+        return min(exp, self.MAX_GIVEN_EXPERIENCE)
 
-    def _evolved_hp(self, level):
-        hp = self._unit_traits.base_hp
-        for n in range(2, level + 1):
-            hp += self._evolved_hp_increase(n)
-        return hp
+    def _calculate_hp(self, level):
+        return self._evolved_hp(level) if self._is_evolved() else self._non_evolved_hp(level)
 
-    def _evolved_hp_increase(self, level):
-        if level == 1:
-            return self._unit_traits.base_hp
-        else:
-            hp_growth = self._unit_traits.hp_growth
-            hp_increase = hp_growth * (level - 1) // 16
-            hp_increase -= hp_growth * (level - 2) // 16
-            hp_increase += int(2896 * hp_growth * math.sqrt(hp_growth * (level - 1)) / 32768)
-            hp_increase -= int(2896 * hp_growth * math.sqrt(hp_growth * (level - 2)) / 32768)
-            return hp_increase
+    def _evolved_hp(self, level):
+        return self._unit_traits.base_hp + self._hp_growth(max(level, 1))
 
     def _non_evolved_hp(self, level):
-        base_hp = self._unit_traits.base_hp
+        return min(self._unit_traits.base_hp + self._hp_growth(level), self.MAX_STAT)
+
+    def _hp_growth(self, level):
         hp_growth = self._unit_traits.hp_growth
-        hp = base_hp
-        hp += (hp_growth * (level - 1)) // 16
+        hp = (hp_growth * (level - 1)) // 16
         hp += int(2896 * hp_growth * math.sqrt(hp_growth * (level - 1)) / 32768)
-        return min(hp, 255)
+        return hp
 
     def _mp_stat_descriptor(self):
         return (self._unit_traits.base_mp, self._unit_traits.mp_growth, 1024)
@@ -84,7 +145,7 @@ class StatsCalculator:
     def _luck_stat_descriptor(self):
         return (self._unit_traits.base_luck, self._unit_traits.luck_growth, 1024)
 
-    def _non_hp_stat(self, level, stat_descriptor):
+    def _calculate_non_hp_stat(self, level, stat_descriptor):
         if self._is_evolved():
             return self._evolved_non_hp_stat(level, stat_descriptor)
         else:
@@ -94,24 +155,12 @@ class StatsCalculator:
         return self._unit_traits.is_evolved
 
     def _evolved_non_hp_stat(self, level, stat_descriptor):
-        base_stat, _, _ = stat_descriptor
-        stat = base_stat
-        for n in range(2, level + 1):
-            stat += self._evolved_non_hp_stat_increase(n, stat_descriptor)
-        return stat
-
-    def _evolved_non_hp_stat_increase(self, level, stat_descriptor):
         base_stat, stat_growth, stat_divisor = stat_descriptor
-        if level == 1:
-            return base_stat
-        else:
-            stat_increase = (base_stat * stat_growth * (level - 1)) // stat_divisor
-            stat_decrease = (base_stat * stat_growth * (level - 2)) // stat_divisor
-            return stat_increase - stat_decrease
+        return base_stat + (base_stat * stat_growth * (max(level, 1) - 1)) // stat_divisor
 
     def _non_evolved_non_hp_stat(self, level, stat_descriptor):
         base_stat, stat_growth, stat_divisor = stat_descriptor
-        return min(base_stat + (base_stat * stat_growth * (level - 1) // stat_divisor), 255)
+        return min(base_stat + (base_stat * stat_growth * (level - 1) // stat_divisor), self.MAX_STAT)
 
     def _stat_increase(self, level, base_stat, calculate_stat):
         if level == 1:
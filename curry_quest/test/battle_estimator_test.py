@@ -0,0 +1,229 @@
+import itertools
+import random
+import unittest
+from unittest.mock import Mock
+try:
+    import numpy as np
+    from curry_quest.battle_estimator import BattleEstimator, physical_damages, spell_damages, hit_chances, \
+        critical_chances
+except ImportError:
+    np = None
+from curry_quest.config import Config
+from curry_quest.damage_calculator import DamageCalculator
+from curry_quest.genus import Genus
+from curry_quest.physical_attack_executor import PhysicalAttackExecutor, DamageRoll, RelativeHeight
+from curry_quest.state_machine_context import StateMachineContext
+from curry_quest.statuses import Statuses
+from curry_quest.talents import Talents
+from curry_quest.unit import Unit
+from curry_quest.unit_action import UnitActionContext
+from curry_quest.unit_creator import UnitCreator
+from curry_quest.unit_traits import UnitTraits
+from game_config import load_game_config
+
+
+@unittest.skipUnless(np is not None, 'NumPy is not installed')
+class VectorizedFormulasTest(unittest.TestCase):
+    def setUp(self):
+        self._config = Config()
+        self._attacker = Unit(UnitTraits(), self._config.levels)
+        self._defender = Unit(UnitTraits(), self._config.levels)
+
+    def _units_variants(self):
+        for attacker_genus, defender_genus, has_protection in itertools.product(
+                [Genus.Empty, Genus.Fire, Genus.Water, Genus.Wind],
+                [Genus.Empty, Genus.Fire, Genus.Water, Genus.Wind],
+                [False, True]):
+            self._attacker.genus = attacker_genus
+            self._defender.genus = defender_genus
+            self._defender.clear_statuses()
+            if has_protection:
+                for status in DamageCalculator.GENUS_PROTECTION_STATUS_MAPPING.values():
+                    self._defender.set_status(status)
+            yield DamageCalculator(self._attacker, self._defender)
+
+    def test_physical_damages_match_damage_calculator(self):
+        attacks = np.arange(1, 60, 7)
+        defenses = np.arange(1, 60, 8)
+        for damage_calculator in self._units_variants():
+            for damage_roll, relative_height, is_critical, weapon_damage in itertools.product(
+                    DamageRoll, RelativeHeight, [False, True], [0, 5]):
+                damages = physical_damages(
+                    attacks[:, np.newaxis],
+                    defenses[np.newaxis, :],
+                    damage_roll.value,
+                    relative_height.value,
+                    damage_calculator.physical_elemental_combat_advantage(),
+                    damage_calculator.does_defender_have_elemental_protection_against_attacker(),
+                    is_critical,
+                    weapon_damage)
+                for (attack_index, attack), (defense_index, defense) in itertools.product(
+                        enumerate(attacks), enumerate(defenses)):
+                    self._attacker.attack = int(attack)
+                    self._defender.defense = int(defense)
+                    self.assertEqual(
+                        damages[attack_index, defense_index],
+                        damage_calculator.physical_damage(damage_roll, relative_height, is_critical, weapon_damage))
+
+    def test_spell_damages_match_damage_calculator(self):
+        spell_levels = np.arange(1, 30, 2)
+        defenses = np.arange(1, 60, 4)
+        for damage_calculator in self._units_variants():
+            for raw_spell_damage in [8, 16, 24]:
+                damages = spell_damages(
+                    spell_levels[:, np.newaxis],
+                    raw_spell_damage,
+                    defenses[np.newaxis, :],
+                    damage_calculator.spell_combat_advantage(),
+                    damage_calculator.does_defender_have_elemental_protection_against_attacker())
+                for (level_index, spell_level), (defense_index, defense) in itertools.product(
+                        enumerate(spell_levels), enumerate(defenses)):
+                    self._attacker._spell_level = int(spell_level)
+                    self._defender.defense = int(defense)
+                    self.assertEqual(
+                        damages[level_index, defense_index],
+                        damage_calculator.spell_damage(raw_spell_damage))
+
+
+@unittest.skipUnless(np is not None, 'NumPy is not installed')
+class VectorizedChancesTest(unittest.TestCase):
+    def setUp(self):
+        self._config = Config()
+        self._does_action_succeed_mock = Mock(return_value=False)
+        self._state_machine_context = StateMachineContext(self._config)
+        self._state_machine_context.does_action_succeed = self._does_action_succeed_mock
+        self._attacker = Unit(UnitTraits(), self._config.levels)
+        self._defender = Unit(UnitTraits(), self._config.levels)
+        self._state_machine_context.familiar = self._attacker
+        self._state_machine_context.start_battle(self._defender)
+        unit_action_context = UnitActionContext()
+        unit_action_context.state_machine_context = self._state_machine_context
+        unit_action_context.performer = self._attacker
+        unit_action_context.target = self._defender
+        self._executor = PhysicalAttackExecutor(unit_action_context)
+
+    def test_hit_chances_match_executor(self):
+        lucks = np.arange(1, 100)
+        for is_blind, is_invisible in itertools.product([False, True], [False, True]):
+            self._attacker.clear_statuses()
+            self._defender.clear_statuses()
+            if is_blind:
+                self._attacker.set_status(Statuses.Blind)
+            if is_invisible:
+                self._defender.set_status(Statuses.Invisible)
+            chances = hit_chances(lucks, is_blind, is_invisible)
+            for luck, chance in zip(lucks, chances):
+                self._attacker.luck = int(luck)
+                self._executor._is_attack_accurate()
+                self.assertEqual(self._does_action_succeed_mock.call_args.kwargs['success_chance'], chance)
+
+    def test_hit_chance_is_0_when_attacker_has_no_luck(self):
+        self.assertEqual(hit_chances(0, False, False), 0.0)
+
+    def test_critical_chances_match_executor(self):
+        lucks = np.arange(0, 256)
+        for is_atrocious in [False, True]:
+            self._attacker._talents = Talents.Atrocious if is_atrocious else Talents.Empty
+            chances = critical_chances(lucks, is_atrocious)
+            for luck, chance in zip(lucks, chances):
+                self._attacker.luck = int(luck)
+                self._executor._select_whether_attack_is_critical()
+                self.assertEqual(self._does_action_succeed_mock.call_args.kwargs['success_chance'], chance)
+
+
+@unittest.skipUnless(np is not None, 'NumPy is not installed')
+class BattleEstimatorTest(unittest.TestCase):
+    SCALAR_TRIALS = 4000
+    VECTORIZED_TRIALS = 200000
+
+    def setUp(self):
+        self._game_config = load_game_config()
+        self._familiar_traits = self._game_config.monsters_traits['Kewne']
+        self._enemy_traits = self._game_config.monsters_traits['Troll'].copy()
+        self._enemy_traits.action_weights = UnitTraits.ActionWeights()
+
+    def _create_units(self):
+        levels = self._game_config.levels
+        return UnitCreator(self._familiar_traits).create(1, levels), UnitCreator(self._enemy_traits).create(1, levels)
+
+    def _scalar_battle(self, rng: random.Random):
+        familiar, enemy = self._create_units()
+        state_machine_context = StateMachineContext(self._game_config)
+        state_machine_context._rng = rng
+        state_machine_context.familiar = familiar
+        state_machine_context.start_battle(enemy)
+        turn = 0
+        while not familiar.is_dead() and not enemy.is_dead():
+            unit_action_context = UnitActionContext()
+            unit_action_context.state_machine_context = state_machine_context
+            unit_action_context.performer, unit_action_context.target = \
+                (familiar, enemy) if turn % 2 == 0 else (enemy, familiar)
+            PhysicalAttackExecutor(unit_action_context).execute()
+            turn += 1
+        return not familiar.is_dead(), turn, familiar.max_hp - max(familiar.hp, 0)
+
+    def test_estimate_is_consistent_with_scalar_battles(self):
+        rng = random.Random(0)
+        results = [self._scalar_battle(rng) for _ in range(self.SCALAR_TRIALS)]
+        estimate = BattleEstimator(*self._create_units()).estimate(self.VECTORIZED_TRIALS, np.random.default_rng(0))
+        self.assertEqual(estimate.trials, self.VECTORIZED_TRIALS)
+        self.assertEqual(estimate.unresolved, 0)
+        self.assertAlmostEqual(
+            estimate.win_probability,
+            sum(is_won for is_won, _, _ in results) / self.SCALAR_TRIALS,
+            delta=0.03)
+        self.assertAlmostEqual(
+            estimate.expected_turns,
+            sum(turns for _, turns, _ in results) / self.SCALAR_TRIALS,
+            delta=0.3)
+        self.assertAlmostEqual(
+            estimate.expected_hp_lost,
+            sum(hp_lost for _, _, hp_lost in results) / self.SCALAR_TRIALS,
+            delta=0.5)
+
+    def test_estimate_is_reproducible_for_seeded_generator(self):
+        estimator = BattleEstimator(*self._create_units())
+        first_estimate = estimator.estimate(1000, np.random.default_rng(5))
+        second_estimate = estimator.estimate(1000, np.random.default_rng(5))
+        self.assertEqual(first_estimate.wins, second_estimate.wins)
+        self.assertEqual(first_estimate.turns_sum, second_estimate.turns_sum)
+        self.assertEqual(first_estimate.hp_lost_sum, second_estimate.hp_lost_sum)
+
+    def test_estimate_is_split_into_batches(self):
+        estimator = BattleEstimator(*self._create_units())
+        estimator.BATCH_SIZE = 300
+        estimate = estimator.estimate(1000, np.random.default_rng(0))
+        self.assertEqual(estimate.trials, 1000)
+
+    def test_invincible_enemy_is_never_defeated(self):
+        familiar, enemy = self._create_units()
+        enemy.set_status(Statuses.Invincible)
+        estimate = BattleEstimator(familiar, enemy).estimate(1000, np.random.default_rng(0), max_turns=50)
+        self.assertEqual(estimate.wins, 0)
+
+    def test_battles_exceeding_max_turns_are_unresolved(self):
+        familiar, enemy = self._create_units()
+        familiar.set_status(Statuses.Invincible)
+        enemy.set_status(Statuses.Invincible)
+        estimate = BattleEstimator(familiar, enemy).estimate(100, np.random.default_rng(0), max_turns=10)
+        self.assertEqual(estimate.unresolved_probability, 1.0)
+        self.assertEqual(estimate.expected_turns, 10)
+        self.assertEqual(estimate.expected_hp_lost, 0)
+
+    def test_abilities_are_reported_as_not_modelled(self):
+        familiar, _ = self._create_units()
+        enemy = UnitCreator(self._game_config.monsters_traits['Troll']).create(5, self._game_config.levels)
+        estimator = BattleEstimator(familiar, enemy)
+        self.assertEqual(estimator.unmodelled_enemy_actions, ['Break obstacles'])
+        self.assertIn('not modelled: Break obstacles', estimator.estimate(10, np.random.default_rng(0)).to_string())
+
+    def test_for_monster_removes_enemy_forbidden_talents(self):
+        monster_traits = self._enemy_traits.copy()
+        monster_traits.talents = Talents.Hard | Talents.Quick
+        familiar, _ = self._create_units()
+        estimator = BattleEstimator.for_monster(familiar, monster_traits, 1, self._game_config.levels)
+        self.assertEqual(estimator.enemy.talents, Talents.Quick)
+
+
+if __name__ == '__main__':
+    unittest.main()
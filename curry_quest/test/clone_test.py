@@ -0,0 +1,90 @@
+import unittest
+from curry_quest.items import MedicinalHerb
+from curry_quest.spells import Spells
+from curry_quest.state_machine import StateMachine
+from curry_quest.statuses import Statuses
+from curry_quest.unit_creator import UnitCreator
+from game_config import load_game_config, play, ScriptedServices
+
+
+class UnitCloneTest(unittest.TestCase):
+    def setUp(self):
+        self._game_config = load_game_config()
+        self._unit = UnitCreator(self._game_config.monsters_traits['Troll']).create(2, self._game_config.levels)
+        self._unit.set_timed_status(Statuses.Poison, 3)
+
+    def test_clone_has_same_state(self):
+        self.assertEqual(self._unit.clone().to_json_object(), self._unit.to_json_object())
+
+    def test_clone_shares_immutable_objects(self):
+        clone = self._unit.clone()
+        self.assertIs(clone.traits, self._unit.traits)
+        self.assertIs(clone._levels, self._unit._levels)
+        self.assertIs(clone.spell_traits, self._unit.spell_traits)
+        self.assertIs(clone.ability, self._unit.ability)
+
+    def test_clone_modifications_do_not_affect_original(self):
+        clone = self._unit.clone()
+        clone.deal_damage(3)
+        clone.attack += 5
+        clone.decrease_timed_status_counters()
+        clone.set_timed_status(Statuses.Blind, 2)
+        clone.set_spell(Spells.find_spell_traits('Breath', clone.genus), 1)
+        clone.gain_exp(1000)
+        self.assertEqual(self._unit.hp, self._unit.max_hp)
+        self.assertEqual(self._unit.status_duration(Statuses.Poison), {Statuses.Poison: 3})
+        self.assertFalse(self._unit.has_status(Statuses.Blind))
+        self.assertEqual(self._unit.spell_traits.base_name, 'Rise')
+        self.assertEqual(self._unit.level, 2)
+
+
+class StateMachineContextCloneTest(unittest.TestCase):
+    def setUp(self):
+        self._game_config = load_game_config()
+        self._services = ScriptedServices(seed=3)
+        self._state_machine = StateMachine(self._game_config, 1, 'PLAYER', services=self._services)
+        play(self._state_machine, self._services, actions_count=60, seed=3)
+        self._context = self._state_machine._context
+
+    def test_clone_has_same_state(self):
+        self.assertEqual(self._context.clone().to_json_object(), self._context.to_json_object())
+
+    def test_clone_continues_same_random_sequence(self):
+        clone = self._context.clone()
+        self.assertEqual([clone.rng.random() for _ in range(5)], [self._context.rng.random() for _ in range(5)])
+
+    def test_clone_shares_config_and_services(self):
+        clone = self._context.clone()
+        self.assertIs(clone.game_config, self._context.game_config)
+        self.assertIs(clone.services, self._context.services)
+
+    def test_clone_modifications_do_not_affect_original(self):
+        json_object = self._context.to_json_object()
+        clone = self._context.clone()
+        clone.familiar.deal_damage(1)
+        clone.familiar.set_status(Statuses.Sleep)
+        clone.inventory.clear()
+        clone.inventory.add_item(MedicinalHerb())
+        clone.records.turns_counter += 10
+        clone.floor += 1
+        clone.add_response('Clone response.')
+        clone.rng.random()
+        for key in self._game_config.weight_tables.events.keys:
+            self._game_config.weight_tables.events.set_penalty_timer(clone._weight_penalties, key, 7)
+        self.assertEqual(self._context.to_json_object(), json_object)
+
+    def test_clone_of_battle_context_clones_enemy(self):
+        enemy = UnitCreator(self._game_config.monsters_traits['Kewne']).create(1, self._game_config.levels)
+        self._context.start_battle(enemy)
+        self._context.battle_context.start_prepare_phase(counter=3)
+        clone = self._context.clone()
+        self.assertEqual(clone.battle_context.to_json_object(), self._context.battle_context.to_json_object())
+        clone.battle_context.enemy.deal_damage(1)
+        clone.battle_context.dec_prepare_phase_counter()
+        self.assertEqual(enemy.hp, enemy.max_hp)
+        self.assertTrue(self._context.battle_context.is_prepare_phase())
+        self.assertEqual(self._context.battle_context._prepare_phase_counter, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
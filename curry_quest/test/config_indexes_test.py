@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import create_autospec
+from curry_quest.inventory import Inventory
+from curry_quest.items import all_items, ItemJsonLoader, Items, MedicinalHerb, Oleem, Pita
+from curry_quest.jsonable import InvalidJson
+from curry_quest.state_machine import StateMachine
+from dummy_item import DummyItem
+from game_config import load_game_config
+
+
+class ConfigIndexesTest(unittest.TestCase):
+    def setUp(self):
+        self._game_config = load_game_config()
+
+    def test_non_evolved_monster_traits(self):
+        self.assertEqual(list(self._game_config.non_evolved_monster_traits.keys()), ['Kewne', 'Pulunpa', 'Troll'])
+        self.assertIs(self._game_config.non_evolved_monster_traits, self._game_config.non_evolved_monster_traits)
+
+    def test_all_units_traits_include_special_units(self):
+        all_units_traits = self._game_config.all_units_traits
+        self.assertEqual(len(all_units_traits), len(self._game_config.monsters_traits) + 1)
+        ghosh_traits = self._game_config.special_units_traits.ghosh
+        self.assertIs(all_units_traits[ghosh_traits.name], ghosh_traits)
+
+    def test_cached_views_are_read_only(self):
+        with self.assertRaises(TypeError):
+            self._game_config.all_units_traits['Monster'] = None
+        with self.assertRaises(TypeError):
+            self._game_config.non_evolved_monster_traits['Monster'] = None
+
+    def test_monster_traits_are_found_regardless_of_case(self):
+        troll_traits = self._game_config.monsters_traits['Troll']
+        self.assertIs(self._game_config.find_monster_traits('troll'), troll_traits)
+        self.assertIs(self._game_config.find_monster_traits('TROLL'), troll_traits)
+        self.assertIsNone(self._game_config.find_monster_traits('Trol'))
+
+
+class StateClassesIndexTest(unittest.TestCase):
+    def test_every_state_class_is_found_by_name(self):
+        state_machine = StateMachine(load_game_config(), 1, 'PLAYER')
+        for state_class in StateMachine.TRANSITIONS:
+            self.assertIs(state_machine._find_state_class(state_class.state_name()), state_class)
+        self.assertIsNone(state_machine._find_state_class('StateUnknown'))
+
+
+class ItemsIndexTest(unittest.TestCase):
+    def test_loaded_item_is_shared_instance(self):
+        for item in all_items():
+            self.assertIs(ItemJsonLoader.from_json_object(item.to_json_object()), item)
+
+    def test_unknown_item_is_not_loaded(self):
+        with self.assertRaises(InvalidJson):
+            ItemJsonLoader.from_json_object({'name': 'Pit'})
+
+    def test_every_item_is_loaded_by_name(self):
+        inventory = Inventory(capacity=len(all_items()))
+        inventory.from_json_object([item.to_json_object() for item in all_items()])
+        self.assertEqual(inventory.items, [item.name for item in all_items()])
+        for index, item in enumerate(all_items()):
+            self.assertIs(inventory.peek_item(index), item)
+
+
+class InventoryItemsIdsTest(unittest.TestCase):
+    def setUp(self):
+        self._inventory = Inventory(capacity=3)
+
+    def test_registered_items_are_stored_as_ids(self):
+        self._inventory.add_item(Pita())
+        self._inventory.add_item(MedicinalHerb())
+        self.assertEqual(list(self._inventory._items_ids), [Items.item_id(Pita()), Items.item_id(MedicinalHerb())])
+        self.assertEqual(self._inventory.find_item('med'), (1, Items.find_item('Medicinal Herb')))
+        self.assertIs(self._inventory.take_item(1), Items.find_item('Medicinal Herb'))
+        self.assertEqual(self._inventory.items, ['Pita'])
+
+    def test_unregistered_item_is_not_added(self):
+        with self.assertRaises(ValueError):
+            self._inventory.add_item(create_autospec(spec=DummyItem))
+        self.assertTrue(self._inventory.is_empty())
+
+    def test_clone_does_not_share_items_ids(self):
+        self._inventory.add_item(Pita())
+        self._inventory.add_item(Oleem())
+        clone = self._inventory.clone()
+        clone.take_item(1)
+        clone.add_item(MedicinalHerb())
+        self.assertEqual(self._inventory.items, ['Pita', 'Oleem'])
+        self.assertEqual(clone.items, ['Pita', 'Medicinal Herb'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,23 +4,39 @@ from unittest.mock import Mock, PropertyMock, patch
 from curry_quest import commands
 from curry_quest.config import Config
 from curry_quest.controller import Controller
+from curry_quest.scheduler import Scheduler
 from curry_quest.state_machine import StateMachine
+from curry_quest.states_files_handler import StatesHandler
+from curry_quest.states_storage import StateSummary
 
 
 class ControllerTest(unittest.TestCase):
     def setUp(self):
         self._states_files_handler = Mock()
-        self._states_files_handler.load = Mock(return_value={})
+        self._set_players({})
         self._hall_of_fame_handler = Mock()
         self._services = Mock()
         self._rng = Mock()
         self._services.rng = Mock(return_value=self._rng)
         self._timer_mock = Mock()
         self._services.timer = Mock(return_value=self._timer_mock)
+        self._services.scheduler = Scheduler()
         self._now_mock = Mock(return_value=datetime(year=2022, month=2, day=9, hour=10, minute=30, second=45))
         self._services.now = self._now_mock
         self._send_message = Mock()
 
+    def _set_players(self, players: dict):
+        self._states_files_handler.load_index = Mock(return_value={
+            player_id: StatesHandler.state_summary(state_machine)
+            for player_id, state_machine
+            in players.items()
+        })
+        self._states_files_handler.load_player = Mock(side_effect=lambda player_id, _: players.get(player_id))
+
+    def _load_players(self, controller: Controller, players: dict):
+        for player_id in players.keys():
+            controller._player_state_machines.get(player_id)
+
     def _create_controller(self, game_config: Config=None):
         controller = Controller(
             game_config or self._config(),
@@ -53,7 +69,7 @@ class ControllerTest(unittest.TestCase):
 
     def test_when_player_exists_then_add_player_is_ignored(self):
         state_machine_mock = Mock()
-        self._states_files_handler.load = Mock(return_value={4: state_machine_mock})
+        self._set_players({4: state_machine_mock})
         with patch('curry_quest.controller.StateMachine') as StateMachineMock:
             created_state_machine_mock = StateMachineMock.return_value
             controller = self._create_controller()
@@ -68,7 +84,7 @@ class ControllerTest(unittest.TestCase):
 
     def test_when_player_exists_then_remove_player_removes_player_from_the_game(self):
         state_machine_mock = Mock()
-        self._states_files_handler.load = Mock(return_value={4: state_machine_mock})
+        self._set_players({4: state_machine_mock})
         controller = self._create_controller()
         controller.remove_player(4)
         self._send_message.assert_called_with('<@!4>: You were removed from Curry Quest.')
@@ -77,7 +93,7 @@ class ControllerTest(unittest.TestCase):
 
     def test_when_player_exists_then_remove_player_deletes_player_state_file(self):
         state_machine_mock = Mock()
-        self._states_files_handler.load = Mock(return_value={4: state_machine_mock})
+        self._set_players({4: state_machine_mock})
         controller = self._create_controller()
         controller.remove_player(4)
         self._states_files_handler.delete.assert_called_once_with(4)
@@ -103,7 +119,9 @@ class ControllerTest(unittest.TestCase):
             is_finished=False,
             is_started=True,
             is_waiting_for_event=True,
-            event_selection_penalty_end_dt=None):
+            has_delayed_action=False,
+            event_selection_penalty_end_dt=None,
+            is_mutating_action=True):
         state_machine_mock = Mock(spec=StateMachine)
         type(state_machine_mock).player_name = player_name_mock or PropertyMock(return_value='')
         state_machine_mock.has_event_selection_penalty = Mock(return_value=has_event_selection_penalty)
@@ -111,6 +129,8 @@ class ControllerTest(unittest.TestCase):
         state_machine_mock.is_finished = Mock(return_value=is_finished)
         state_machine_mock.is_started = Mock(return_value=is_started)
         state_machine_mock.is_waiting_for_event = Mock(return_value=is_waiting_for_event)
+        state_machine_mock.has_delayed_action = Mock(return_value=has_delayed_action)
+        state_machine_mock.is_mutating_action = Mock(return_value=is_mutating_action)
         state_machine_mock.event_selection_penalty_end_dt = \
             event_selection_penalty_end_dt or self._now_mock.return_value
 
@@ -138,11 +158,11 @@ class ControllerTest(unittest.TestCase):
             4: self._state_machine_mock(),
             7: self._state_machine_mock()
         }
-        self._states_files_handler.load = Mock(return_value=players)
+        self._set_players(players)
         controller = self._create_controller()
         controller.start_timers()
         _, _, timer_expiry_handler = self._timer_call_args()
-        self._rng.choices = Mock(return_value=(4,))
+        self._rng.random = Mock(return_value=0.0)
         timer_expiry_handler()
         self._assert_admin_on_action_call(players[4], commands.GENERATE_EVENT)
         players[7].on_action.assert_not_called()
@@ -155,15 +175,14 @@ class ControllerTest(unittest.TestCase):
             12: self._state_machine_mock(is_waiting_for_event=True),
             18: self._state_machine_mock(is_waiting_for_event=False)
         }
-        self._states_files_handler.load = Mock(return_value=players)
+        self._set_players(players)
         controller = self._create_controller()
+        self.assertEqual(sorted(controller._event_targets.player_ids()), [7, 12])
         controller.start_timers()
         _, _, timer_expiry_handler = self._timer_call_args()
-        self._rng.choices = Mock(return_value=(4,))
+        self._rng.random = Mock(return_value=0.99)
         timer_expiry_handler()
-        self._rng.choices.assert_called_once()
-        players = self._rng.choices.call_args.args[0]
-        self.assertEqual(players, [7, 12])
+        self._assert_admin_on_action_call(players[12], commands.GENERATE_EVENT)
 
     def test_players_are_selected_With_weights_based_on_selection_penalty(self):
         players = {
@@ -173,15 +192,16 @@ class ControllerTest(unittest.TestCase):
             12: self._state_machine_mock(has_event_selection_penalty=True),
             18: self._state_machine_mock(has_event_selection_penalty=False)
         }
-        self._states_files_handler.load = Mock(return_value=players)
+        self._set_players(players)
         controller = self._create_controller()
+        self._load_players(controller, players)
+        players_weights = [controller._event_targets.weight(player_id) for player_id in [4, 7, 8, 12, 18]]
+        self.assertEqual(players_weights, [5, 5, 10, 5, 10])
         controller.start_timers()
         _, _, timer_expiry_handler = self._timer_call_args()
-        self._rng.choices = Mock(return_value=(4,))
+        self._rng.random = Mock(return_value=11 / 35)
         timer_expiry_handler()
-        self._rng.choices.assert_called_once()
-        players_weights = self._rng.choices.call_args.args[1]
-        self.assertEqual(players_weights, [5, 5, 10, 5, 10])
+        self._assert_admin_on_action_call(players[8], commands.GENERATE_EVENT)
 
     def test_player_whose_penalty_timer_is_up_has_penalty_flag_clearer(self):
         players = {
@@ -189,15 +209,16 @@ class ControllerTest(unittest.TestCase):
                 has_event_selection_penalty=True,
                 event_selection_penalty_end_dt=self._now_mock.return_value - timedelta(seconds=1))
         }
-        self._states_files_handler.load = Mock(return_value=players)
+        self._set_players(players)
         controller = self._create_controller()
+        self._load_players(controller, players)
+        self.assertEqual(controller._event_targets.weight(4), 5)
         controller.start_timers()
         _, _, timer_expiry_handler = self._timer_call_args()
-        self._rng.choices = Mock(return_value=(4,))
+        self._rng.random = Mock(return_value=0.0)
         timer_expiry_handler()
-        self._rng.choices.assert_called_once()
-        players_weights = self._rng.choices.call_args.args[1]
-        self.assertEqual(players_weights, [10])
+        players[4].clear_event_selection_penalty.assert_called_once()
+        self.assertEqual(controller._event_targets.weight(4), 10)
 
     def test_when_there_is_no_eligible_players_then_timer_expiry_does_not_generate_actions(self):
         players = {
@@ -207,7 +228,7 @@ class ControllerTest(unittest.TestCase):
             12: self._state_machine_mock(is_waiting_for_event=False),
             18: self._state_machine_mock(is_waiting_for_event=False)
         }
-        self._states_files_handler.load = Mock(return_value=players)
+        self._set_players(players)
         controller = self._create_controller()
         controller.start_timers()
         _, _, timer_expiry_handler = self._timer_call_args()
@@ -221,17 +242,17 @@ class ControllerTest(unittest.TestCase):
     def test_when_selected_players_game_is_not_started_then_it_is_started(self):
         state_machine_mock = self._state_machine_mock(is_started=False)
         players = {4: state_machine_mock}
-        self._states_files_handler.load = Mock(return_value=players)
+        self._set_players(players)
         controller = self._create_controller()
         controller.start_timers()
         _, _, timer_expiry_handler = self._timer_call_args()
-        self._rng.choices = Mock(return_value=(4,))
+        self._rng.random = Mock(return_value=0.0)
         timer_expiry_handler()
         self._assert_admin_on_action_call(state_machine_mock, commands.STARTED)
 
     def test_when_handle_user_action_is_called_for_existing_player_then_it_is_handled(self):
         players = {4: self._state_machine_mock()}
-        self._states_files_handler.load = Mock(return_value=players)
+        self._set_players(players)
         controller = self._create_controller()
         controller.handle_user_action(4, 'player', 'test_command', ('arg1', 'arg2'))
         self._assert_user_on_action_call(players[4], 'test_command', 'arg1', 'arg2')
@@ -239,32 +260,113 @@ class ControllerTest(unittest.TestCase):
     def test_when_handle_user_action_is_called_for_existing_player_then_player_name_is_updated(self):
         player_name_mock = PropertyMock(return_value='old player name')
         players = {4: self._state_machine_mock(player_name_mock=player_name_mock)}
-        self._states_files_handler.load = Mock(return_value=players)
+        self._set_players(players)
         controller = self._create_controller()
         controller.handle_user_action(4, 'new player name', 'test_command', ())
         player_name_mock.assert_called_with('new player name')
 
     def test_when_handle_user_action_is_called_for_non_existing_player_then_it_is_not_handled(self):
         players = {4: self._state_machine_mock()}
-        self._states_files_handler.load = Mock(return_value=players)
+        self._set_players(players)
         controller = self._create_controller()
         controller.handle_user_action(5, 'player', 'test_command', ('arg1', 'arg2'))
         players[4].on_action.assert_not_called()
 
     def test_when_handle_admin_action_is_called_for_existing_player_then_it_is_handled(self):
         players = {4: self._state_machine_mock()}
-        self._states_files_handler.load = Mock(return_value=players)
+        self._set_players(players)
         controller = self._create_controller()
         self.assertTrue(controller.handle_admin_action(4, 'test_command', ('arg1', 'arg2')))
         self._assert_admin_on_action_call(players[4], 'test_command', 'arg1', 'arg2')
 
     def test_when_handle_admin_action_is_called_for_non_existing_player_then_it_is_not_handled(self):
         players = {4: self._state_machine_mock()}
-        self._states_files_handler.load = Mock(return_value=players)
+        self._set_players(players)
         controller = self._create_controller()
         self.assertFalse(controller.handle_admin_action(5, 'test_command', ('arg1', 'arg2')))
         players[4].on_action.assert_not_called()
 
+    def test_when_mutating_action_is_handled_then_player_state_is_saved(self):
+        players = {4: self._state_machine_mock(is_mutating_action=True)}
+        self._set_players(players)
+        controller = self._create_controller()
+        controller.handle_user_action(4, '', 'test_command', ())
+        self._states_files_handler.save.assert_called_once_with(players[4])
+
+    def test_when_read_only_action_is_handled_then_player_state_is_not_saved(self):
+        players = {4: self._state_machine_mock(is_mutating_action=False)}
+        self._set_players(players)
+        controller = self._create_controller()
+        controller.handle_user_action(4, '', 'test_command', ())
+        players[4].on_action.assert_called_once()
+        self._states_files_handler.save.assert_not_called()
+
+    def test_when_read_only_action_changes_player_name_then_player_state_is_saved(self):
+        players = {4: self._state_machine_mock(is_mutating_action=False)}
+        self._set_players(players)
+        controller = self._create_controller()
+        controller.handle_user_action(4, 'new player name', 'test_command', ())
+        self._states_files_handler.save.assert_called_once_with(players[4])
+
+    def test_player_state_is_not_loaded_until_it_is_needed(self):
+        players = {4: self._state_machine_mock(), 7: self._state_machine_mock()}
+        self._set_players(players)
+        controller = self._create_controller()
+        self._states_files_handler.load_player.assert_not_called()
+        controller.handle_user_action(4, '', 'test_command', ())
+        self._states_files_handler.load_player.assert_called_once_with(4, unittest.mock.ANY)
+        controller.handle_user_action(4, '', 'test_command', ())
+        self._states_files_handler.load_player.assert_called_once()
+
+    def test_loaded_player_state_machine_has_autonomous_action_result_handler_set(self):
+        players = {4: self._state_machine_mock()}
+        self._set_players(players)
+        controller = self._create_controller()
+        controller.handle_user_action(4, '', 'test_command', ())
+        players[4].set_autonomous_action_result_handler.assert_called_once()
+        players[4].set_records_events_handler.assert_called_once()
+        players[4].set_services.assert_called_once_with(self._services)
+
+    def test_player_selected_for_event_is_the_only_one_loaded(self):
+        players = {
+            4: self._state_machine_mock(is_waiting_for_event=True),
+            7: self._state_machine_mock(is_waiting_for_event=True),
+            8: self._state_machine_mock(is_waiting_for_event=False)
+        }
+        self._set_players(players)
+        controller = self._create_controller()
+        controller.start_timers()
+        _, _, timer_expiry_handler = self._timer_call_args()
+        self._rng.random = Mock(return_value=0.5)
+        timer_expiry_handler()
+        self._states_files_handler.load_player.assert_called_once_with(7, unittest.mock.ANY)
+        self._assert_admin_on_action_call(players[7], commands.GENERATE_EVENT)
+
+    def test_start_timers_handles_delayed_actions_only_of_indexed_players_with_delayed_actions(self):
+        players = {
+            4: self._state_machine_mock(has_delayed_action=True),
+            7: self._state_machine_mock(has_delayed_action=False)
+        }
+        self._set_players(players)
+        controller = self._create_controller()
+        controller.start_timers()
+        players[4].handle_delayed_action.assert_called_once()
+        players[7].handle_delayed_action.assert_not_called()
+        self._states_files_handler.load_player.assert_called_once_with(4, unittest.mock.ANY)
+
+    def test_player_whose_state_cannot_be_loaded_is_treated_as_non_existing(self):
+        self._states_files_handler.load_index = Mock(return_value={4: StateSummary.Empty})
+        self._states_files_handler.load_player = Mock(return_value=None)
+        controller = self._create_controller()
+        self.assertFalse(controller.handle_admin_action(4, 'test_command', ()))
+        self.assertFalse(controller.handle_admin_action(4, 'test_command', ()))
+        self._states_files_handler.load_player.assert_called_once()
+
+    def test_shutdown_flushes_pending_states(self):
+        controller = self._create_controller()
+        controller.shutdown()
+        self._states_files_handler.flush.assert_called_once()
+
 
 if __name__ == '__main__':
     unittest.main()
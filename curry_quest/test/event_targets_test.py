@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+import unittest
+from unittest.mock import Mock
+from curry_quest.event_targets import EventTargets, FenwickTree
+
+
+class FenwickTreeTest(unittest.TestCase):
+    def setUp(self):
+        self._sut = FenwickTree(5)
+        for index, weight in enumerate([3, 0, 5, 1, 2]):
+            self._sut.set(index, weight)
+
+    def test_prefix_sums_are_accumulated(self):
+        self.assertEqual([self._sut.prefix_sum(count) for count in range(6)], [0, 3, 3, 8, 9, 11])
+        self.assertEqual(self._sut.total, 11)
+
+    def test_find_returns_index_containing_value(self):
+        self.assertEqual(
+            [self._sut.find(value) for value in [0, 2.9, 3, 7.9, 8, 9, 10.9]],
+            [0, 0, 2, 2, 3, 4, 4])
+
+    def test_find_of_total_returns_last_weighted_index(self):
+        self._sut.resize(8)
+        self.assertEqual(self._sut.find(11), 4)
+        self.assertEqual(self._sut.find(12), 4)
+
+    def test_updated_weight_changes_sums(self):
+        self._sut.set(2, 1)
+        self.assertEqual(self._sut.weight(2), 1)
+        self.assertEqual(self._sut.total, 7)
+        self.assertEqual(self._sut.find(3.5), 2)
+
+    def test_resized_tree_keeps_weights(self):
+        self._sut.resize(9)
+        self._sut.set(8, 4)
+        self.assertEqual(len(self._sut), 9)
+        self.assertEqual(self._sut.total, 15)
+        self.assertEqual(self._sut.find(11), 8)
+
+
+class EventTargetsTest(unittest.TestCase):
+    def setUp(self):
+        self._sut = EventTargets(weight_without_penalty=10, weight_with_penalty=5)
+        self._now = datetime(year=2022, month=2, day=9)
+
+    def _rng(self, value):
+        rng = Mock()
+        rng.random = Mock(return_value=value)
+        return rng
+
+    def test_only_players_waiting_for_event_are_targets(self):
+        self._sut.update(4, is_waiting_for_event=True)
+        self._sut.update(7, is_waiting_for_event=False)
+        self.assertIn(4, self._sut)
+        self.assertNotIn(7, self._sut)
+        self.assertEqual(self._sut.total_weight, 10)
+
+    def test_player_no_longer_waiting_for_event_is_removed(self):
+        self._sut.update(4, is_waiting_for_event=True)
+        self._sut.update(4, is_waiting_for_event=False)
+        self.assertEqual(len(self._sut), 0)
+        self.assertIsNone(self._sut.select(self._rng(0.0)))
+
+    def test_players_are_selected_proportionally_to_weights(self):
+        self._sut.update(4, is_waiting_for_event=True)
+        self._sut.update(7, is_waiting_for_event=True, penalty_end_dt=self._now)
+        self._sut.update(8, is_waiting_for_event=True)
+        self.assertEqual(self._sut.select(self._rng(0.0)), 4)
+        self.assertEqual(self._sut.select(self._rng(10 / 25)), 7)
+        self.assertEqual(self._sut.select(self._rng(15 / 25)), 8)
+
+    def test_random_value_rounded_up_to_total_weight_selects_last_player(self):
+        self._sut.update(4, is_waiting_for_event=True)
+        self._sut.update(7, is_waiting_for_event=True, penalty_end_dt=self._now)
+        self.assertEqual(self._sut.select(self._rng(1 - 2 ** -53)), 7)
+        self.assertEqual(self._sut.select(self._rng(1.0)), 7)
+
+    def test_slots_of_removed_players_are_reused(self):
+        self._sut.update(4, is_waiting_for_event=True)
+        self._sut.discard(4)
+        self._sut.update(7, is_waiting_for_event=True)
+        self.assertEqual(self._sut.select(self._rng(0.0)), 7)
+
+    def test_targets_grow_beyond_initial_capacity(self):
+        players_count = 3 * EventTargets.INITIAL_CAPACITY
+        for player_id in range(players_count):
+            self._sut.update(player_id, is_waiting_for_event=True)
+        self.assertEqual(self._sut.total_weight, 10 * players_count)
+        self.assertEqual(self._sut.select(self._rng(0.999)), players_count - 1)
+
+    def test_expired_penalties_are_lifted(self):
+        self._sut.update(4, is_waiting_for_event=True, penalty_end_dt=self._now)
+        self._sut.update(7, is_waiting_for_event=True, penalty_end_dt=self._now + timedelta(seconds=10))
+        self.assertEqual(self._sut.expire_penalties(self._now), [])
+        self.assertEqual(self._sut.expire_penalties(self._now + timedelta(seconds=1)), [4])
+        self.assertFalse(self._sut.has_penalty(4))
+        self.assertTrue(self._sut.has_penalty(7))
+        self.assertEqual(self._sut.weight(4), 10)
+        self.assertEqual(self._sut.weight(7), 5)
+
+    def test_replaced_penalty_does_not_expire_early(self):
+        self._sut.update(4, is_waiting_for_event=True, penalty_end_dt=self._now)
+        self._sut.update(4, is_waiting_for_event=True, penalty_end_dt=self._now + timedelta(seconds=10))
+        self.assertEqual(self._sut.expire_penalties(self._now + timedelta(seconds=1)), [])
+        self.assertEqual(self._sut.weight(4), 5)
+
+    def test_penalty_of_removed_player_does_not_expire(self):
+        self._sut.update(4, is_waiting_for_event=True, penalty_end_dt=self._now)
+        self._sut.discard(4)
+        self.assertEqual(self._sut.expire_penalties(self._now + timedelta(seconds=1)), [])
+        self.assertNotIn(4, self._sut)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import random
+import unittest
+from curry_quest.floor_descriptor import FloorDescriptor, Monster
+from curry_quest.state_machine_context import StateMachineContext
+from curry_quest.unit_traits import UnitTraits
+from game_config import load_game_config
+
+
+class SpawnTableTest(unittest.TestCase):
+    def setUp(self):
+        self._monsters_traits = {'Kewne': UnitTraits(), 'Troll': UnitTraits()}
+        self._floor = FloorDescriptor()
+        self._floor.add_monster(Monster('Kewne', 2), 3)
+        self._floor.add_monster(Monster('Troll', 4), 1)
+        self._floor.add_monster(Monster('Kewne', 5), 2)
+        self._floor.compile_spawn_table(self._monsters_traits)
+
+    def test_entries_have_resolved_traits_and_levels(self):
+        entries = self._floor.spawn_table.entries
+        self.assertEqual([entry.traits for entry in entries], [
+            self._monsters_traits['Kewne'],
+            self._monsters_traits['Troll'],
+            self._monsters_traits['Kewne']
+        ])
+        self.assertEqual([entry.level for entry in entries], [2, 4, 5])
+
+    def test_draws_are_same_as_random_choices_over_monsters(self):
+        spawn_table_rng = random.Random(7)
+        choices_rng = random.Random(7)
+        for _ in range(200):
+            self.assertIs(
+                self._floor.spawn_table.select(spawn_table_rng).monster,
+                choices_rng.choices(self._floor.monsters, self._floor.weights)[0])
+
+    def test_adding_monster_requires_recompilation(self):
+        self._floor.add_monster(Monster('Troll', 6), 1)
+        self.assertIsNone(self._floor.spawn_table)
+        self._floor.compile_spawn_table(self._monsters_traits)
+        self.assertEqual(len(self._floor.spawn_table.entries), 4)
+
+
+class GenerateFloorMonsterTest(unittest.TestCase):
+    def setUp(self):
+        self._game_config = load_game_config()
+        self._context = StateMachineContext(self._game_config)
+
+    def test_parsed_floors_have_spawn_tables(self):
+        for floor in self._game_config.floors:
+            self.assertEqual(
+                [entry.traits for entry in floor.spawn_table.entries],
+                [self._game_config.monsters_traits[monster.name] for monster in floor.monsters])
+
+    def test_monster_is_generated_from_floor_spawn_table(self):
+        floor_monsters = [(monster.name, monster.level) for monster in self._game_config.floors[2].monsters]
+        for _ in range(20):
+            monster = self._context.generate_floor_monster(2)
+            self.assertIn((monster.name, monster.level), floor_monsters)
+
+    def test_level_increase_is_capped_at_max_level(self):
+        max_level = self._game_config.levels.max_level
+        monster = self._context.generate_floor_monster(2, level_increase=max_level)
+        self.assertEqual(monster.level, max_level)
+
+
+if __name__ == '__main__':
+    unittest.main()
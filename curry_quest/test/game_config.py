@@ -0,0 +1,43 @@
+import datetime
+import os.path
+import random
+from curry_quest import commands
+from curry_quest.config import Config
+from curry_quest.state_machine import StateMachine
+from curry_quest.state_machine_action import StateMachineAction
+
+GAME_CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'game_config.json')
+
+
+def load_game_config() -> Config:
+    with open(GAME_CONFIG_PATH, 'r') as game_config_file:
+        return Config.Parser(game_config_file).parse()
+
+
+class ScriptedServices:
+    def __init__(self, seed=0):
+        self._seed = seed
+        self.timers = []
+
+    def rng(self):
+        return random.Random(self._seed)
+
+    def timer(self, name, interval, callback):
+        self.timers.append(callback)
+
+    def now(self):
+        return datetime.datetime(2000, 1, 1)
+
+
+def play(state_machine: StateMachine, services: ScriptedServices, actions_count: int, seed=0):
+    rng = random.Random(seed)
+    if not state_machine.is_started():
+        state_machine.on_action(StateMachineAction.by_admin(commands.STARTED))
+    for _ in range(actions_count):
+        if len(services.timers) > 0:
+            services.timers.pop(0)()
+        elif state_machine.is_waiting_for_event():
+            state_machine.on_action(StateMachineAction.by_admin(commands.GENERATE_EVENT))
+        else:
+            available_commands = state_machine.available_commands() or [commands.RESTART]
+            state_machine.on_action(StateMachineAction.by_user(rng.choice(available_commands)))
@@ -3,13 +3,15 @@ from unittest.mock import create_autospec, PropertyMock
 from curry_quest.genus import Genus
 from curry_quest.items import Item, DefaultFamiliarTargetItem, DefaultEnemyTargetItem, NoDefaultTargetItem, \
     FamiliarOnlyItem, EnemyOnlyItem, FamiliarAndEnemyItem, BattlePhaseOnlyItem, Pita, Oleem, HolyScroll, \
-    MedicinalHerb, CureAllHerb, FireBall, WaterCrystal, LightSeed, SeaSeed, WindSeed, all_items
+    MedicinalHerb, CureAllHerb, FireBall, WaterCrystal, LightSeed, SeaSeed, WindSeed, all_items, \
+    normalize_item_name, Items
 from curry_quest.levels_config import Levels
 from curry_quest.state_machine_context import StateMachineContext, BattleContext
 from curry_quest.statuses import Statuses
 from curry_quest.unit import Unit
 from curry_quest.unit_action import UnitActionContext
 from curry_quest.unit_traits import UnitTraits
+from dummy_item import DummyItem
 import inspect
 
 
@@ -477,6 +479,45 @@ class AllItemsTest(unittest.TestCase):
         inspected_all_items = set(value for _, value in inspect.getmembers(curry_quest.items) if is_item(value))
         self.assertEqual(all_items_classes, inspected_all_items)
 
+    def test_all_items_returns_same_instances(self):
+        for item, other_item in zip(all_items(), all_items()):
+            self.assertIs(item, other_item)
+
+
+class ItemsRegistryTest(unittest.TestCase):
+    def test_item_is_found_by_exact_name(self):
+        for item in Items.all():
+            self.assertIs(Items.find_item(item.name), item)
+        self.assertIsNone(Items.find_item('Medicinal'))
+
+    def test_item_id_maps_to_registered_item(self):
+        for item_id, item in enumerate(Items.all()):
+            self.assertEqual(Items.item_id(item), item_id)
+            self.assertEqual(Items.item_id(type(item)()), item_id)
+            self.assertIs(Items.item(item_id), item)
+
+    def test_item_id_of_unregistered_item_is_none(self):
+        self.assertIsNone(Items.item_id(create_autospec(spec=DummyItem)))
+
+    def test_prefix_lookup_matches_first_item_with_normalized_name_prefix(self):
+        def linear_find_item(*item_name_parts):
+            searched_item_name = normalize_item_name(*item_name_parts)
+            for item in Items.all():
+                if normalize_item_name(item.name).startswith(searched_item_name):
+                    return item
+            return None
+
+        prefixes = ['', 'x', 'medicinalherbs']
+        for item in Items.all():
+            normalized_item_name = normalize_item_name(item.name)
+            prefixes += [normalized_item_name[:length] for length in range(1, len(normalized_item_name) + 1)]
+        for prefix in prefixes:
+            self.assertIs(Items.find_item_by_prefix(prefix), linear_find_item(prefix))
+
+    def test_prefix_lookup_normalizes_name_parts(self):
+        self.assertIs(Items.find_item_by_prefix('Medicinal', ' HERB'), Items.find_item('Medicinal Herb'))
+        self.assertIs(Items.find_item_by_prefix('c'), Items.find_item('Cure-All Herb'))
+
 
 if __name__ == '__main__':
     unittest.main()
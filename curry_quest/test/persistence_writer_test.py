@@ -0,0 +1,76 @@
+import threading
+import time
+import unittest
+from curry_quest.persistence_writer import PersistenceWriter, ThreadPoolPersistenceWriter
+
+
+class PersistenceWriterTest(unittest.TestCase):
+    def setUp(self):
+        self._sut = PersistenceWriter()
+
+    def test_task_is_executed_immediately(self):
+        executed_tasks = []
+        future = self._sut.submit(4, lambda: executed_tasks.append(4))
+        self.assertEqual(executed_tasks, [4])
+        self.assertTrue(future.done())
+
+    def test_task_exception_is_stored_in_future(self):
+        def failing_task():
+            raise IOError('disk error')
+
+        future = self._sut.submit(4, failing_task)
+        self.assertIsInstance(future.exception(), IOError)
+
+
+class ThreadPoolPersistenceWriterTest(unittest.TestCase):
+    def setUp(self):
+        self._sut = ThreadPoolPersistenceWriter(lanes_count=2, max_pending=10)
+
+    def tearDown(self):
+        self._sut.close()
+
+    def test_tasks_are_executed_outside_of_calling_thread(self):
+        executing_threads = []
+        self._sut.submit(4, lambda: executing_threads.append(threading.current_thread())).result()
+        self.assertIsNot(executing_threads[0], threading.current_thread())
+
+    def test_tasks_with_same_key_are_executed_in_submission_order(self):
+        executed_tasks = []
+
+        def task(index):
+            time.sleep(0.001 * (5 - index))
+            executed_tasks.append(index)
+
+        for index in range(5):
+            self._sut.submit(4, lambda index=index: task(index))
+        self._sut.drain()
+        self.assertEqual(executed_tasks, list(range(5)))
+
+    def test_keys_are_assigned_to_lanes(self):
+        self.assertEqual(self._sut.lane(4), self._sut.lane(6))
+        self.assertNotEqual(self._sut.lane(4), self._sut.lane(7))
+
+    def test_drain_waits_for_all_pending_tasks(self):
+        release_event = threading.Event()
+        futures = [self._sut.submit(key, release_event.wait) for key in range(4)]
+        threading.Timer(0.01, release_event.set).start()
+        self._sut.drain()
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(self._sut.pending_count, 0)
+
+    def test_barrier_waits_for_tasks_with_same_key(self):
+        executed_tasks = []
+        self._sut.submit(4, lambda: (time.sleep(0.01), executed_tasks.append(4)))
+        self._sut.barrier(4)
+        self.assertEqual(executed_tasks, [4])
+
+    def test_task_exception_is_stored_in_future(self):
+        def failing_task():
+            raise IOError('disk error')
+
+        future = self._sut.submit(4, failing_task)
+        self.assertIsInstance(future.exception(), IOError)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+from unittest.mock import Mock
+from curry_quest.player_state_machines import PlayerStateMachines
+from curry_quest.state_machine import StateMachine
+from curry_quest.states_storage import StateSummary
+
+
+class PlayerStateMachinesTest(unittest.TestCase):
+    def setUp(self):
+        self._players = {}
+        self._states_handler = Mock()
+        self._states_handler.load_index = Mock(side_effect=lambda _: {
+            player_id: StateSummary.WaitingForEvent
+            for player_id
+            in self._players.keys()
+        })
+        self._states_handler.load_player = Mock(side_effect=lambda player_id, _: self._players.get(player_id))
+        self._state_machine_loaded_handler = Mock()
+
+    def _create_sut(self, max_resident=None):
+        return PlayerStateMachines(
+            self._states_handler,
+            Mock(),
+            self._state_machine_loaded_handler,
+            max_resident)
+
+    def _state_machine_mock(self, is_waiting_for_event=True, has_delayed_action=False):
+        state_machine_mock = Mock(spec=StateMachine)
+        state_machine_mock.is_waiting_for_event = Mock(return_value=is_waiting_for_event)
+        state_machine_mock.has_delayed_action = Mock(return_value=has_delayed_action)
+        state_machine_mock.has_event_selection_penalty = Mock(return_value=False)
+        return state_machine_mock
+
+    def _add_players(self, *player_ids, **kwargs):
+        for player_id in player_ids:
+            self._players[player_id] = self._state_machine_mock(**kwargs)
+
+    def test_state_machine_is_loaded_once_on_first_access(self):
+        self._add_players(4)
+        sut = self._create_sut()
+        self.assertFalse(sut.is_loaded(4))
+        self.assertIs(sut.get(4), self._players[4])
+        self.assertIs(sut.get(4), self._players[4])
+        self._states_handler.load_player.assert_called_once()
+        self._state_machine_loaded_handler.assert_called_once_with(4, self._players[4])
+
+    def test_non_existing_player_is_not_loaded(self):
+        sut = self._create_sut()
+        self.assertIsNone(sut.get(4))
+        self._states_handler.load_player.assert_not_called()
+
+    def test_without_limit_state_machines_are_not_evicted(self):
+        self._add_players(4, 7, 8)
+        sut = self._create_sut()
+        for player_id in [4, 7, 8]:
+            sut.get(player_id)
+        self.assertEqual(sut.loaded_count, 3)
+
+    def test_least_recently_used_state_machine_is_evicted_over_limit(self):
+        self._add_players(4, 7, 8)
+        sut = self._create_sut(max_resident=2)
+        sut.get(4)
+        sut.get(7)
+        sut.get(4)
+        sut.get(8)
+        self.assertEqual(sut.loaded_count, 2)
+        self.assertTrue(sut.is_loaded(4))
+        self.assertFalse(sut.is_loaded(7))
+        self.assertTrue(sut.is_loaded(8))
+
+    def test_evicted_state_machine_is_flushed(self):
+        self._add_players(4, 7)
+        sut = self._create_sut(max_resident=1)
+        sut.get(4)
+        sut.get(7)
+        self._states_handler.flush_player.assert_called_once_with(4)
+
+    def test_evicted_state_machine_is_reloaded_on_access(self):
+        self._add_players(4, 7)
+        sut = self._create_sut(max_resident=1)
+        sut.get(4)
+        sut.get(7)
+        self.assertIs(sut.get(4), self._players[4])
+        self.assertEqual(self._states_handler.load_player.call_count, 3)
+
+    def test_evicted_state_machine_summary_is_indexed(self):
+        self._add_players(4, 7)
+        sut = self._create_sut(max_resident=1)
+        sut.get(4)
+        self._players[4].is_waiting_for_event.return_value = False
+        sut.get(7)
+        self.assertFalse(sut.is_waiting_for_event(4))
+
+    def test_state_machine_with_delayed_action_is_not_evicted(self):
+        self._add_players(4, has_delayed_action=True)
+        self._add_players(7)
+        sut = self._create_sut(max_resident=1)
+        sut.get(4)
+        sut.get(7)
+        self.assertTrue(sut.is_loaded(4))
+        self.assertTrue(sut.is_loaded(7))
+
+    def test_added_state_machine_counts_towards_limit(self):
+        self._add_players(4)
+        sut = self._create_sut(max_resident=1)
+        sut.get(4)
+        sut.add(7, self._state_machine_mock())
+        self.assertFalse(sut.is_loaded(4))
+        self.assertTrue(sut.is_loaded(7))
+        self.assertIn(7, sut)
+
+    def test_removed_player_is_no_longer_indexed(self):
+        self._add_players(4)
+        sut = self._create_sut()
+        sut.get(4)
+        sut.remove(4)
+        self.assertNotIn(4, sut)
+        self.assertFalse(sut.is_loaded(4))
+
+
+if __name__ == '__main__':
+    unittest.main()
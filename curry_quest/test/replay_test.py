@@ -0,0 +1,144 @@
+import unittest
+from curry_quest.replay import Replay, diff_json_objects
+from curry_quest.state_machine import StateMachine
+from curry_quest.states_storage import SqliteStatesStorage
+from game_config import ScriptedServices, load_game_config, play
+
+
+class ReplayTest(unittest.TestCase):
+    ACTIONS_COUNT = 40
+
+    def setUp(self):
+        self._game_config = load_game_config()
+        self._services = ScriptedServices(seed=3)
+        self._state_machine = StateMachine(self._game_config, 4, 'PLAYER', self._services)
+        self._state_machine.enable_journaling()
+        self._initial_state = self._state_machine.to_json_object()
+        self._snapshots = {}
+        for seed in range(self.ACTIONS_COUNT):
+            play(self._state_machine, self._services, actions_count=1, seed=seed)
+            self._snapshots[self._state_machine.actions_counter] = self._state_machine.to_json_object()
+        self._journal = self._state_machine.take_journal_entries()
+
+    def _create_sut(self, journal=None):
+        return Replay(self._game_config, self._initial_state, self._journal if journal is None else journal)
+
+    def test_replay_reproduces_recorded_game(self):
+        sut = self._create_sut()
+        self.assertEqual(sut.fast_forward(), self._state_machine.actions_counter)
+        self.assertTrue(sut.is_finished())
+        self.assertEqual(sut.state_machine.to_json_object(), self._state_machine.to_json_object())
+
+    def test_replay_steps_one_turn_at_a_time(self):
+        sut = self._create_sut()
+        self.assertEqual(sut.turn, 0)
+        self.assertIsNotNone(sut.step())
+        self.assertEqual(sut.turn, 1)
+        self.assertEqual(sut.last_turn, self._state_machine.actions_counter)
+
+    def test_fast_forward_stops_at_requested_turn(self):
+        sut = self._create_sut()
+        self.assertEqual(sut.fast_forward(10), 10)
+        self.assertEqual(sut.diff(self._snapshots[10]), [])
+
+    def test_fast_forward_to_earlier_turn_restarts_replay(self):
+        sut = self._create_sut()
+        sut.fast_forward(20)
+        self.assertEqual(sut.fast_forward(5), 5)
+        self.assertEqual(sut.diff(self._snapshots[5]), [])
+
+    def test_matching_snapshot_has_no_differences(self):
+        self.assertEqual(self._create_sut().diff_with_snapshot(self._snapshots[15]), [])
+
+    def test_differences_from_snapshot_are_reported(self):
+        snapshot = dict(self._snapshots[15])
+        snapshot['player_name'] = 'OTHER PLAYER'
+        self.assertEqual(
+            self._create_sut().diff_with_snapshot(snapshot),
+            ["player_name: expected 'OTHER PLAYER', got 'PLAYER'"])
+
+    def test_snapshot_beyond_recording_cannot_be_diffed(self):
+        snapshot = dict(self._snapshots[15])
+        snapshot['actions_counter'] = self._state_machine.actions_counter + 1
+        with self.assertRaises(Replay.ReplayError):
+            self._create_sut().diff_with_snapshot(snapshot)
+
+    def test_gap_in_journal_stops_replay(self):
+        sut = self._create_sut(self._journal[:5] + self._journal[6:])
+        with self.assertRaises(Replay.ReplayError):
+            sut.fast_forward()
+        self.assertEqual(sut.turn, 5)
+        self.assertTrue(sut.is_finished())
+
+    def test_recording_can_be_serialized(self):
+        sut = Replay.from_json_object(self._create_sut().to_json_object(), self._game_config)
+        sut.fast_forward()
+        self.assertEqual(sut.state_machine.to_json_object(), self._state_machine.to_json_object())
+
+    def test_invalid_recording_is_rejected(self):
+        with self.assertRaises(Replay.ReplayError):
+            Replay.from_json_object({'journal': []}, self._game_config)
+
+    def test_recording_is_read_from_storage(self):
+        storage = SqliteStatesStorage(':memory:')
+        storage.write_many({4: self._snapshots[10]})
+        storage.append_journal({4: [
+            (journal_entry['seq'], storage.encode(journal_entry))
+            for journal_entry
+            in self._journal[10:]
+        ]})
+        sut = Replay.from_storage(storage, 4, self._game_config)
+        storage.close()
+        self.assertEqual(sut.first_turn, 10)
+        sut.fast_forward()
+        self.assertEqual(sut.state_machine.to_json_object(), self._state_machine.to_json_object())
+
+    def _write_recording_to_storage(self, storage, snapshots_turns, first_journal_turn):
+        for snapshot_turn in snapshots_turns:
+            storage.write_many({4: self._snapshots[snapshot_turn]})
+        storage.append_journal({4: [
+            (journal_entry['seq'], storage.encode(journal_entry))
+            for journal_entry
+            in self._journal[first_journal_turn:]
+        ]})
+
+    def test_recording_from_storage_starts_at_previous_snapshot(self):
+        storage = SqliteStatesStorage(':memory:')
+        self._write_recording_to_storage(storage, [10, 20], first_journal_turn=10)
+        sut = Replay.from_storage(storage, 4, self._game_config)
+        storage.close()
+        self.assertEqual(sut.first_turn, 10)
+        self.assertEqual(sut.fast_forward(15), 15)
+        self.assertEqual(sut.diff(self._snapshots[15]), [])
+
+    def test_recording_from_storage_starts_at_latest_snapshot_when_journal_has_no_earlier_turns(self):
+        storage = SqliteStatesStorage(':memory:')
+        self._write_recording_to_storage(storage, [10, 20], first_journal_turn=20)
+        sut = Replay.from_storage(storage, 4, self._game_config)
+        storage.close()
+        self.assertEqual(sut.first_turn, 20)
+        sut.fast_forward()
+        self.assertEqual(sut.state_machine.to_json_object(), self._state_machine.to_json_object())
+
+    def test_missing_recording_cannot_be_read_from_storage(self):
+        storage = SqliteStatesStorage(':memory:')
+        with self.assertRaises(Replay.ReplayError):
+            Replay.from_storage(storage, 4, self._game_config)
+        storage.close()
+
+
+class DiffJsonObjectsTest(unittest.TestCase):
+    def test_equal_objects_have_no_differences(self):
+        self.assertEqual(diff_json_objects({'a': [1, {'b': 2}]}, {'a': [1, {'b': 2}]}), [])
+
+    def test_nested_differences_are_reported_with_paths(self):
+        self.assertEqual(
+            diff_json_objects({'a': [1, {'b': 2}], 'c': 3}, {'a': [1, {'b': 4}], 'd': 3}),
+            ['a[1].b: expected 2, got 4', 'c: missing', 'd: unexpected'])
+
+    def test_lists_of_different_lengths_are_reported_whole(self):
+        self.assertEqual(diff_json_objects({'a': [1]}, {'a': [1, 2]}), ['a: expected [1], got [1, 2]'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -31,6 +31,8 @@ from curry_quest.talents import Talents
 from curry_quest.unit import Unit
 from curry_quest.unit_traits import UnitTraits
 import json
+import jsonpickle
+from curry_quest.jsonable import InvalidJson
 from curry_quest.weight import StaticWeight, NoWeightPenaltyHandler
 
 
@@ -117,6 +119,30 @@ class SaveLoadStateTest(unittest.TestCase):
         loaded_random_list = [context.rng.randint(1, 100) for _ in range(100)]
         self.assertEqual(random_list, loaded_random_list, 'RNG object is not loaded correctly.')
 
+    def test_rng_state_with_gauss_next_is_handled_correctly(self):
+        self._sut._context.rng.gauss(0, 1)
+        context = self._test_save_load_state_machine_context()
+        self.assertEqual(context.rng.getstate(), self._sut._context.rng.getstate())
+
+    def test_legacy_rng_state_is_loaded_from_previous_version(self):
+        json_object = json.loads(json.dumps(self._sut.to_json_object()))
+        json_object['version'] = 3
+        json_object['context']['rng_state'] = jsonpickle.encode(self._sut._context.rng.getstate())
+        loaded_state_machine = self._create_state_machine()
+        loaded_state_machine.from_json_object(json_object)
+        self.assertEqual(loaded_state_machine._context.rng.getstate(), self._sut._context.rng.getstate())
+
+    def test_rng_state_is_stored_compactly(self):
+        json_object = self._sut.to_json_object()
+        legacy_rng_state = jsonpickle.encode(self._sut._context.rng.getstate())
+        self.assertLess(len(json_object['context']['rng_state']), len(legacy_rng_state) // 2)
+
+    def test_invalid_rng_state_raises_invalid_json(self):
+        json_object = json.loads(json.dumps(self._sut.to_json_object()))
+        json_object['context']['rng_state'] = 'invalid'
+        with self.assertRaises(InvalidJson):
+            self._create_state_machine().from_json_object(json_object)
+
     def test_responses_field_is_handled_correctly(self):
         self._sut._context.add_response('Response 1')
         self._sut._context.add_response('Response 3')
@@ -161,25 +187,29 @@ class SaveLoadStateTest(unittest.TestCase):
         context = self._test_save_load_state_machine_context()
         self.assertIsInstance(context.peek_buffered_item(), Oleem)
 
-    def test_event_weight_handlers_are_handled_correctly(self):
-        self._sut._context._event_weight_handlers['character_event'].penalty_timer = 3
+    def test_event_weight_penalties_are_handled_correctly(self):
+        weight_table = self._game_config.weight_tables.events
+        weight_table.set_penalty_timer(self._sut._context._weight_penalties, 'character_event', 3)
         context = self._test_save_load_state_machine_context()
-        self.assertEqual(context._event_weight_handlers['character_event'].penalty_timer, 3)
+        self.assertEqual(weight_table.penalty_timer(context._weight_penalties, 'character_event'), 3)
 
-    def test_item_weight_handlers_are_handled_correctly(self):
-        self._sut._context._item_weight_handlers['Pita'].penalty_timer = 2
+    def test_item_weight_penalties_are_handled_correctly(self):
+        weight_table = self._game_config.weight_tables.found_items
+        weight_table.set_penalty_timer(self._sut._context._weight_penalties, 'Pita', 2)
         context = self._test_save_load_state_machine_context()
-        self.assertEqual(context._item_weight_handlers['Pita'].penalty_timer, 2)
+        self.assertEqual(weight_table.penalty_timer(context._weight_penalties, 'Pita'), 2)
 
-    def test_character_weight_handlers_are_handled_correctly(self):
-        self._sut._context._character_weight_handlers['Cherrl'].penalty_timer = 6
+    def test_character_weight_penalties_are_handled_correctly(self):
+        weight_table = self._game_config.weight_tables.characters
+        weight_table.set_penalty_timer(self._sut._context._weight_penalties, 'Cherrl', 6)
         context = self._test_save_load_state_machine_context()
-        self.assertEqual(context._character_weight_handlers['Cherrl'].penalty_timer, 6)
+        self.assertEqual(weight_table.penalty_timer(context._weight_penalties, 'Cherrl'), 6)
 
-    def test_trap_weight_handlers_are_handled_correctly(self):
-        self._sut._context._trap_weight_handlers['Sleep'].penalty_timer = 5
+    def test_trap_weight_penalties_are_handled_correctly(self):
+        weight_table = self._game_config.weight_tables.traps
+        weight_table.set_penalty_timer(self._sut._context._weight_penalties, 'Sleep', 5)
         context = self._test_save_load_state_machine_context()
-        self.assertEqual(context._trap_weight_handlers['Sleep'].penalty_timer, 5)
+        self.assertEqual(weight_table.penalty_timer(context._weight_penalties, 'Sleep'), 5)
 
     def _test_save_load_familiar(self, familiar) -> Unit:
         self._sut._context.familiar = familiar
@@ -0,0 +1,121 @@
+import asyncio
+import unittest
+from unittest.mock import Mock
+from curry_quest.scheduler import Scheduler
+from curry_quest.services import Services
+
+
+class FakeLoop:
+    def __init__(self):
+        self.now = 100.0
+        self.wakeups = []
+
+    def time(self):
+        return self.now
+
+    def is_closed(self):
+        return False
+
+    def call_at(self, when, callback):
+        handle = Mock()
+        self.wakeups.append((when, callback, handle))
+        return handle
+
+    def active_wakeups(self):
+        return [(when, callback) for when, callback, handle in self.wakeups if not handle.cancel.called]
+
+    def advance(self, seconds):
+        self.now += seconds
+        for when, callback in self.active_wakeups():
+            if when <= self.now:
+                callback()
+
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self._loop = FakeLoop()
+        self._sut = Scheduler(self._loop)
+
+    def test_timer_fires_after_interval(self):
+        callback = Mock()
+        timer = self._sut.schedule('Timer', 5, callback)
+        self._loop.advance(4)
+        callback.assert_not_called()
+        self._loop.advance(1)
+        callback.assert_called_once()
+        self.assertTrue(timer.done())
+        self.assertFalse(timer.cancelled())
+
+    def test_single_wakeup_is_armed_for_earliest_timer(self):
+        for interval in [30, 20, 10, 40]:
+            self._sut.schedule('Timer', interval, Mock())
+        self.assertEqual(self._loop.active_wakeups()[0][0], 110.0)
+        self.assertEqual(len(self._loop.active_wakeups()), 1)
+
+    def test_timers_fire_in_deadline_order(self):
+        fired = []
+        for interval in [3, 1, 2]:
+            self._sut.schedule('Timer', interval, lambda interval=interval: fired.append(interval))
+        self._loop.advance(5)
+        self.assertEqual(fired, [1, 2, 3])
+
+    def test_cancelled_timer_does_not_fire(self):
+        callback = Mock()
+        timer = self._sut.schedule('Timer', 5, callback)
+        self.assertTrue(timer.cancel())
+        self.assertFalse(timer.cancel())
+        self._loop.advance(5)
+        callback.assert_not_called()
+        self.assertTrue(timer.cancelled())
+        self.assertEqual(self._sut.queue_depth, 0)
+        self.assertEqual(self._loop.active_wakeups(), [])
+
+    def test_queue_depth_counts_pending_timers(self):
+        timers = [self._sut.schedule('Timer', interval, Mock()) for interval in [1, 2, 3]]
+        timers[1].cancel()
+        self.assertEqual(self._sut.queue_depth, 2)
+        self._loop.advance(1)
+        self.assertEqual(self._sut.queue_depth, 1)
+
+    def test_lag_of_late_timers_is_measured(self):
+        self._sut.schedule('Timer', 1, Mock())
+        self._sut.schedule('Timer', 2, Mock())
+        self._loop.now += 3
+        self._sut.run_due_timers()
+        self.assertEqual(self._sut.fired_count, 2)
+        self.assertEqual(self._sut.last_lag, 1.0)
+        self.assertEqual(self._sut.max_lag, 2.0)
+
+    def test_timer_scheduled_by_callback_waits_for_next_wakeup(self):
+        callback = Mock()
+        self._sut.schedule('Timer', 0, lambda: self._sut.schedule('Timer', 0, callback))
+        self._sut.run_due_timers()
+        callback.assert_not_called()
+        self.assertEqual(self._sut.queue_depth, 1)
+
+    def test_failing_callback_does_not_stop_other_timers(self):
+        callback = Mock()
+        self._sut.schedule('Timer', 1, Mock(side_effect=RuntimeError('failure')))
+        self._sut.schedule('Timer', 1, callback)
+        self._loop.advance(1)
+        callback.assert_called_once()
+
+
+class ServicesTimerTest(unittest.TestCase):
+    def test_timers_run_on_event_loop(self):
+        services = Services(Scheduler())
+        fired = []
+
+        async def run():
+            services.timer('Second', 0.02, lambda: fired.append('second'))
+            services.timer('First', 0.01, lambda: fired.append('first'))
+            services.timer('Cancelled', 0.01, lambda: fired.append('cancelled')).cancel()
+            await asyncio.sleep(0.05)
+
+        asyncio.run(run())
+        self.assertEqual(fired, ['first', 'second'])
+        self.assertEqual(services.scheduler.queue_depth, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
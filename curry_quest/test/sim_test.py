@@ -0,0 +1,98 @@
+import unittest
+from curry_quest import commands
+from curry_quest.sim import ClimbPolicy, ClimbResult, SimulationReport, run_simulation, simulate_climb
+from curry_quest.state_battle import StateBattlePlayerTurn
+from curry_quest.state_machine import StateMachine
+from curry_quest.state_machine_action import StateMachineAction
+from game_config import load_game_config
+
+
+class SimulateClimbTest(unittest.TestCase):
+    def setUp(self):
+        self._game_config = load_game_config()
+
+    def _climb_summary(self, result: ClimbResult):
+        return (result.is_cleared, result.is_timed_out, result.turns, result.actions, result.floor, result.events)
+
+    def test_climb_runs_until_game_is_over(self):
+        result = simulate_climb(self._game_config, seed=1)
+        self.assertFalse(result.is_timed_out)
+        self.assertTrue(result.is_cleared or result.is_dead)
+        self.assertGreater(result.actions, 0)
+        self.assertGreater(sum(result.events.values()), 0)
+
+    def test_climbs_with_the_same_seed_are_identical(self):
+        self.assertEqual(
+            self._climb_summary(simulate_climb(self._game_config, seed=4)),
+            self._climb_summary(simulate_climb(self._game_config, seed=4)))
+
+    def test_climb_exceeding_actions_limit_is_timed_out(self):
+        result = simulate_climb(self._game_config, seed=1, max_actions=3)
+        self.assertTrue(result.is_timed_out)
+        self.assertFalse(result.is_dead)
+
+    def test_process_pool_gives_the_same_results_as_single_process(self):
+        single_process_report = run_simulation(self._game_config, climbs_count=6, first_seed=10, workers=1, chunk_size=4)
+        process_pool_report = run_simulation(self._game_config, climbs_count=6, first_seed=10, workers=2, chunk_size=4)
+        self.assertEqual(process_pool_report.climbs_count, 6)
+        self.assertEqual(process_pool_report.to_string(), single_process_report.to_string())
+
+
+class ClimbPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self._sut = ClimbPolicy()
+        self._state_machine = StateMachine(load_game_config(), player_id=5, player_name='PLAYER')
+        self._state_machine.on_action(StateMachineAction.by_admin(commands.STARTED))
+        self._state_machine._state = StateBattlePlayerTurn(self._state_machine._context)
+
+    def test_familiar_attacks_in_battle(self):
+        self.assertEqual(self._sut.choose_action(self._state_machine).command, commands.ATTACK)
+
+    def test_familiar_with_low_hp_is_healed(self):
+        familiar = self._state_machine._context.familiar
+        familiar.hp = 1
+        action = self._sut.choose_action(self._state_machine)
+        self.assertEqual(action.command, commands.USE_ITEM)
+        self.assertEqual(action.args, ('Medicinal', 'Herb'))
+
+
+class SimulationReportTest(unittest.TestCase):
+    def _result(self, is_cleared=False, is_timed_out=False, turns=0, floor=0, events=None):
+        result = ClimbResult(seed=0)
+        result.is_cleared = is_cleared
+        result.is_timed_out = is_timed_out
+        result.turns = turns
+        result.floor = floor
+        result.events.update(events or {})
+        return result
+
+    def setUp(self):
+        self._sut = SimulationReport([
+            self._result(is_cleared=True, turns=10, floor=2, events={'battle': 3, 'item': 1}),
+            self._result(is_cleared=True, turns=20, floor=2, events={'battle': 1}),
+            self._result(floor=0, events={'battle': 2, 'trap': 1}),
+            self._result(floor=1, events={'elevator': 1}),
+            self._result(is_timed_out=True, floor=1, events={'familiar': 1})
+        ])
+
+    def test_clear_rate_is_fraction_of_cleared_climbs(self):
+        self.assertEqual(self._sut.clear_rate, 0.4)
+        self.assertEqual(self._sut.timed_out_count, 1)
+
+    def test_turns_distribution_covers_cleared_climbs(self):
+        turns_distribution = self._sut.turns_distribution()
+        self.assertEqual(turns_distribution['min'], 10)
+        self.assertEqual(turns_distribution['median'], 15)
+        self.assertEqual(turns_distribution['max'], 20)
+
+    def test_deaths_are_counted_per_floor(self):
+        self.assertEqual(self._sut.deaths_per_floor(), {1: 1, 2: 1})
+
+    def test_events_frequencies_are_relative(self):
+        self.assertEqual(
+            self._sut.events_frequencies(),
+            {'battle': 0.6, 'item': 0.1, 'trap': 0.1, 'elevator': 0.1, 'familiar': 0.1})
+
+
+if __name__ == '__main__':
+    unittest.main()
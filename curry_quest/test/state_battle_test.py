@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import Mock, PropertyMock, call, create_autospec, patch
 from curry_quest import commands
 from curry_quest.ability import Ability
+from curry_quest.items import Pita, Oleem, HolyScroll, MedicinalHerb, CureAllHerb
 from curry_quest.levels_config import Levels
 from curry_quest.physical_attack_unit_action import PhysicalAttackUnitActionHandler
 from curry_quest.spell_cast_unit_action import SpellCastContext
@@ -73,6 +74,13 @@ class StateBattleEventTest(StateBattleTestBase):
         self.assertIs(enemy.traits, unit_traits)
         self.assertEqual(enemy.level, 4)
 
+    def test_monster_name_is_matched_case_insensitively(self):
+        unit_traits = UnitTraits()
+        self._game_config._monsters_traits['TestMonster'] = unit_traits
+        self._test_on_enter('tESTmONSTER', '3')
+        _, enemy = self._context.generate_action.call_args.args
+        self.assertIs(enemy.traits, unit_traits)
+
     def test_when_created_with_monster_and_level_then_level_is_same_as_request(self):
         unit_traits = UnitTraits()
         self._game_config._monsters_traits['TestMonster'] = unit_traits
@@ -1657,18 +1665,22 @@ class StateBattleConfusedUnitTurnTest(StateBattleStartedTestBase):
         action_context = self._test_enemy_ability_use()
         self.assertFalse(action_context.has_target())
 
-    def _create_usable_item(self, item_name='', item_use_response=''):
-        return self._create_item_mock(can_use=True, item_name=item_name, item_use_response=item_use_response)
+    def _create_usable_item(self, item_class=Pita, item_use_response=''):
+        return self._create_item(item_class, can_use=True, item_use_response=item_use_response)
 
-    def _create_unusable_item(self, item_name=''):
-        return self._create_item_mock(can_use=False, item_name=item_name)
+    def _create_unusable_item(self, item_class=Oleem):
+        return self._create_item(item_class, can_use=False)
 
-    def _create_item_mock(self, can_use, item_name='', item_use_response=''):
-        item = create_autospec(spec=DummyItem)
-        type(item).name = PropertyMock(return_value=item_name)
-        item.cannot_use_reason.return_value = '' if can_use else 'REASON'
-        item.use.return_value = item_use_response
-        return item
+    def _create_item(self, item_class, can_use, item_use_response=''):
+        for attribute_name, return_value in [
+                ('cannot_use_reason', '' if can_use else 'REASON'),
+                ('use', item_use_response),
+                ('can_target_familiar', True),
+                ('can_target_enemy', True)]:
+            patcher = patch.object(item_class, attribute_name, return_value=return_value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return item_class()
 
     def _add_item(self, item):
         self._context.inventory.add_item(item)
@@ -1683,16 +1695,16 @@ class StateBattleConfusedUnitTurnTest(StateBattleStartedTestBase):
 
     def test_response_on_item_use(self):
         self._clear_inventory()
-        self._add_item(self._create_usable_item(item_name='ITEM', item_use_response='Item use.'))
+        self._add_item(self._create_usable_item(item_use_response='Item use.'))
         self._test_item_use()
-        self._assert_responses('You used the ITEM. Item use.')
+        self._assert_responses('You used the Pita. Item use.')
 
     def test_when_inventory_has_4_items_then_item_selection_range_is_from_0_to_4(self):
         self._clear_inventory()
-        self._add_item(self._create_usable_item())
-        self._add_item(self._create_usable_item())
-        self._add_item(self._create_unusable_item())
-        self._add_item(self._create_usable_item())
+        self._add_item(self._create_usable_item(Pita))
+        self._add_item(self._create_usable_item(MedicinalHerb))
+        self._add_item(self._create_unusable_item(Oleem))
+        self._add_item(self._create_usable_item(Pita))
         self._test_item_use()
         self.assertEqual(self._randrange_range, (0, 4))
 
@@ -1705,11 +1717,11 @@ class StateBattleConfusedUnitTurnTest(StateBattleStartedTestBase):
 
     def test_selected_item_is_used(self):
         self._clear_inventory()
-        for i in range(5):
-            self._add_item(self._create_usable_item(item_name=f'ITEM_{i}', item_use_response=f'Item {i}'))
+        for i, item_class in enumerate([Pita, Oleem, HolyScroll, MedicinalHerb, CureAllHerb]):
+            self._add_item(self._create_usable_item(item_class, item_use_response=f'Item {i}'))
         self._rng_randrange_result = 2
         self._test_item_use()
-        self._assert_responses('You used the ITEM_2. Item 2')
+        self._assert_responses('You used the Holy Scroll. Item 2')
 
     def _test_item_use_context(self) -> UnitActionContext:
         self._clear_inventory()
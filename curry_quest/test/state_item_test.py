@@ -1,11 +1,11 @@
 from curry_quest import commands
-from curry_quest.items import Item
+from curry_quest.items import Item, MedicinalHerb, Pita
 from curry_quest.state_item import StateItemUse
 from curry_quest.unit import Unit
 from dummy_item import DummyItem
 from state_test_base import StateTestBase
 import unittest
-from unittest.mock import PropertyMock, create_autospec
+from unittest.mock import PropertyMock, create_autospec, patch
 
 
 class StateItemUseTest(StateTestBase):
@@ -21,13 +21,6 @@ class StateItemUseTest(StateTestBase):
             args = ('',)
         super()._test_on_enter(*args)
 
-    def _create_matched_item(self, can_use, item_name='', item_use_response=''):
-        return self._create_item_mock(
-            can_use,
-            does_name_match=True,
-            item_name=item_name,
-            item_use_response=item_use_response)
-
     def _create_non_matched_item(self, item_name=''):
         return self._create_item_mock(can_use=False, does_name_match=False, item_name=item_name)
 
@@ -52,6 +45,16 @@ class StateItemUseTest(StateTestBase):
         item.use.return_value = item_use_response
         return item
 
+    def _create_inventory_item(self, item_class=Pita, cannot_use_reason='', item_use_response=''):
+        for attribute_name, return_value in [
+                ('cannot_use_reason', cannot_use_reason),
+                ('use', item_use_response),
+                ('can_target_familiar', True)]:
+            patcher = patch.object(item_class, attribute_name, return_value=return_value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return item_class()
+
     def _set_found_item(self, item):
         self._context.buffer_item(item)
 
@@ -82,32 +85,30 @@ class StateItemUseTest(StateTestBase):
     def _assert_item_name_match(self, item: Item, expected_name):
         item.matches_normalized_name.assert_called_with(expected_name)
 
-    def _test_inventory_item_used(self, item_name='', item_use_response=''):
+    def _test_inventory_item_used(self, item_use_response=''):
         self._set_found_item(self._create_non_matched_item())
-        inventory_item = self._create_matched_item(
-            can_use=True,
-            item_name=item_name,
-            item_use_response=item_use_response)
-        self._test_inventory_item_matched(inventory_item, item_name)
+        inventory_item = self._create_inventory_item(item_use_response=item_use_response)
+        self._test_inventory_item_matched(inventory_item)
         self.assertTrue(self._context.inventory.is_empty())
 
-    def _test_inventory_item_matched(self, item, item_name):
+    def _test_inventory_item_matched(self, item):
         self._clear_inventory()
         self._add_inventory_item(item)
-        self._test_on_enter(item_name if item_name else 'ITEM')
+        self._test_on_enter(item.name)
 
     def test_action_when_inventory_item_used(self):
         self._test_inventory_item_used()
         self._assert_action(commands.INVENTORY_ITEM_USED)
 
     def test_response_when_inventory_item_used(self):
-        self._test_inventory_item_used(item_name='INVENTORY_ITEM', item_use_response='INVENTORY ITEM USED.')
-        self._assert_responses('You used the INVENTORY_ITEM. INVENTORY ITEM USED.')
+        self._test_inventory_item_used(item_use_response='INVENTORY ITEM USED.')
+        self._assert_responses('You used the Pita. INVENTORY ITEM USED.')
 
     def _test_no_items_match(self):
         self._set_found_item(self._create_non_matched_item())
-        self._add_inventory_item(self._create_non_matched_item())
-        self._test_on_enter()
+        self._clear_inventory()
+        self._add_inventory_item(self._create_inventory_item(Pita))
+        self._test_on_enter('Medicinal Herb')
 
     def test_action_when_no_items_match(self):
         self._test_no_items_match()
@@ -120,14 +121,13 @@ class StateItemUseTest(StateTestBase):
     def test_items_are_searched_by_correct_name(self):
         found_item = self._create_non_matched_item()
         self._set_found_item(found_item)
-        inventory_item_1 = self._create_non_matched_item()
-        inventory_item_2 = self._create_non_matched_item()
-        self._add_inventory_item(inventory_item_1)
-        self._add_inventory_item(inventory_item_2)
-        self._test_on_enter('SEARCHED ', ' ITEM')
-        self._assert_item_name_match(found_item, expected_name='searcheditem')
-        self._assert_item_name_match(inventory_item_1, expected_name='searcheditem')
-        self._assert_item_name_match(inventory_item_2, expected_name='searcheditem')
+        self._clear_inventory()
+        self._add_inventory_item(self._create_inventory_item(Pita))
+        self._add_inventory_item(self._create_inventory_item(MedicinalHerb))
+        self._test_on_enter('MEDICINAL ', ' HERB')
+        self._assert_item_name_match(found_item, expected_name='medicinalherb')
+        self._assert_action(commands.INVENTORY_ITEM_USED)
+        self.assertEqual(self._context.inventory.items, ['Pita'])
 
     def _test_found_item_cannot_be_used(self, item_name='', cannot_use_reason='REASON'):
         item = self._create_unusable_item(item_name, cannot_use_reason)
@@ -142,20 +142,20 @@ class StateItemUseTest(StateTestBase):
         self._test_found_item_cannot_be_used(item_name='FOUND ITEM', cannot_use_reason='REASON.')
         self._assert_responses('Cannot use FOUND ITEM. REASON.')
 
-    def _test_inventory_item_cannot_be_used(self, item_name='', cannot_use_reason='REASON'):
+    def _test_inventory_item_cannot_be_used(self, cannot_use_reason='REASON'):
         self._set_found_item(self._create_non_matched_item())
-        inventory_item = self._create_unusable_item(item_name, cannot_use_reason)
-        self._test_inventory_item_matched(inventory_item, item_name)
+        inventory_item = self._create_inventory_item(cannot_use_reason=cannot_use_reason)
+        self._test_inventory_item_matched(inventory_item)
         self.assertEqual(self._context.inventory.size, 1)
-        self.assertEqual(self._context.inventory.peek_item(0), inventory_item)
+        self.assertIsInstance(self._context.inventory.peek_item(0), Pita)
 
     def test_action_when_inventory_item_cannot_be_used(self):
         self._test_inventory_item_cannot_be_used()
         self._assert_action(commands.CANNOT_USE_ITEM)
 
     def test_response_when_inventory_item_cannot_be_used(self):
-        self._test_inventory_item_cannot_be_used(item_name='INVENTORY ITEM', cannot_use_reason='REASON.')
-        self._assert_responses('Cannot use INVENTORY ITEM. REASON.')
+        self._test_inventory_item_cannot_be_used(cannot_use_reason='REASON.')
+        self._assert_responses('Cannot use Pita. REASON.')
 
     def _set_item_target(self, item: Item, target: Unit):
         item.select_target.return_value = target
@@ -0,0 +1,164 @@
+import unittest
+from unittest.mock import Mock
+from curry_quest import commands
+from curry_quest.config import Config
+from curry_quest.state_machine import StateMachine
+from curry_quest.state_machine_action import StateMachineAction
+from game_config import ScriptedServices, load_game_config
+
+
+class StateMachineMutatingActionTest(unittest.TestCase):
+    def setUp(self):
+        self._sut = StateMachine(Config(), player_id=5, player_name='PLAYER')
+
+    def _is_mutating_user_action(self, command):
+        return self._sut.is_mutating_action(StateMachineAction.by_user(command))
+
+    def _is_mutating_admin_action(self, command):
+        return self._sut.is_mutating_action(StateMachineAction.by_admin(command))
+
+    def test_queries_are_not_mutating(self):
+        for command in [
+                commands.HELP,
+                commands.SHOW_FAMILIAR_STATS,
+                commands.SHOW_INVENTORY,
+                commands.SHOW_FLOOR,
+                commands.SHOW_STATE,
+                commands.RECORDS,
+                commands.HALL_OF_FAME]:
+            self.assertFalse(self._is_mutating_user_action(command), command)
+
+    def test_admin_turn_counters_query_is_not_mutating(self):
+        self.assertFalse(self._is_mutating_admin_action(commands.TURN_COUNTERS))
+
+    def test_admin_generic_commands_changing_state_are_mutating(self):
+        for command in [
+                commands.RESTART,
+                commands.GIVE_ITEM,
+                commands.RESTORE_HP,
+                commands.RESTORE_MP,
+                commands.GIVE_FAMILIAR_SPELL,
+                commands.GIVE_FAMILIAR_STATUS,
+                commands.GIVE_ENEMY_SPELL,
+                commands.GIVE_ENEMY_STATUS,
+                commands.SET_FLOOR]:
+            self.assertTrue(self._is_mutating_admin_action(command), command)
+
+    def test_command_with_transition_in_current_state_is_mutating(self):
+        self.assertTrue(self._is_mutating_admin_action(commands.STARTED))
+
+    def test_command_without_transition_in_current_state_is_not_mutating(self):
+        self.assertFalse(self._is_mutating_user_action(commands.ATTACK))
+
+    def test_admin_generic_command_given_by_user_is_not_mutating(self):
+        self.assertFalse(self._is_mutating_user_action(commands.SET_FLOOR))
+
+
+class StateMachineDelayedActionTest(unittest.TestCase):
+    def setUp(self):
+        self._sut = StateMachine(Config(), player_id=5, player_name='PLAYER')
+        self._sut._services = Mock()
+
+    def _schedule_delayed_action(self, delay, command):
+        self._sut._context.generate_delayed_action(delay, command)
+        self._sut._handle_context_action()
+
+    def _restored_state_machine(self):
+        state_machine = StateMachine(Config(), player_id=5, player_name='PLAYER')
+        state_machine.from_json_object(self._sut.to_json_object())
+        return state_machine
+
+    def test_state_machine_without_delayed_action_does_not_have_it(self):
+        self.assertFalse(self._sut.has_delayed_action())
+        self.assertNotIn('delayed_action', self._sut.to_json_object())
+
+    def test_scheduled_delayed_action_is_reported(self):
+        self._schedule_delayed_action(10, commands.EVENT_FINISHED)
+        self._sut._services.timer.assert_called_once()
+        self.assertTrue(self._sut.has_delayed_action())
+
+    def test_scheduled_delayed_action_is_restored_from_json(self):
+        self._schedule_delayed_action(10, commands.EVENT_FINISHED)
+        state_machine = self._restored_state_machine()
+        self.assertTrue(state_machine.has_delayed_action())
+        delay, action = state_machine._context.take_action()
+        self.assertEqual(delay, 10)
+        self.assertEqual(action.command, commands.EVENT_FINISHED)
+        self.assertTrue(action.is_given_by_admin)
+
+    def test_handled_delayed_action_is_no_longer_scheduled(self):
+        self._schedule_delayed_action(10, commands.EVENT_FINISHED)
+        self._sut._services.timer.call_args.kwargs['callback']()
+        self.assertFalse(self._sut.has_delayed_action())
+        self.assertNotIn('delayed_action', self._sut.to_json_object())
+
+
+class StateMachineAccessorsTest(unittest.TestCase):
+    def setUp(self):
+        self._game_config = load_game_config()
+        self._sut = StateMachine(self._game_config, player_id=5, player_name='PLAYER', services=ScriptedServices())
+
+    def test_available_commands_depend_on_action_giver(self):
+        self.assertEqual(self._sut.available_commands(), [])
+        self.assertEqual(self._sut.available_commands(is_admin=True), [commands.STARTED])
+        self._sut.on_action(StateMachineAction.by_admin(commands.STARTED))
+        self.assertEqual(self._sut.available_commands(), [commands.ENTER_TOWER])
+
+    def test_state_and_context_are_exposed(self):
+        self._sut.on_action(StateMachineAction.by_admin(commands.STARTED))
+        self.assertEqual(self._sut.state.state_name(), 'StateInitialize')
+        self.assertIs(self._sut.context.game_config, self._game_config)
+
+    def test_state_changed_handler_is_called_with_entered_states(self):
+        state_changed_handler = Mock()
+        self._sut.set_state_changed_handler(state_changed_handler)
+        self._sut.on_action(StateMachineAction.by_admin(commands.STARTED))
+        self._sut.on_action(StateMachineAction.by_user(commands.HELP))
+        self.assertEqual(
+            [call.args[0].state_name() for call in state_changed_handler.call_args_list],
+            ['StateInitialize'])
+
+
+class StateMachineJournalTest(unittest.TestCase):
+    def setUp(self):
+        self._game_config = load_game_config()
+        self._sut = StateMachine(self._game_config, player_id=5, player_name='PLAYER', services=ScriptedServices())
+        self._sut.enable_journaling()
+
+    def test_mutating_action_is_journaled(self):
+        self._sut.on_action(StateMachineAction.by_admin(commands.STARTED))
+        self.assertEqual(self._sut.actions_counter, 1)
+        journal_entries = self._sut.take_journal_entries()
+        self.assertEqual(len(journal_entries), 1)
+        self.assertEqual(journal_entries[0]['seq'], 1)
+        self.assertEqual(journal_entries[0]['command'], commands.STARTED)
+        self.assertTrue(journal_entries[0]['is_given_by_admin'])
+        self.assertFalse(journal_entries[0]['is_delayed'])
+        self.assertEqual(self._sut.take_journal_entries(), [])
+
+    def test_mutating_action_is_counted_but_not_journaled_without_journaling(self):
+        state_machine = StateMachine(self._game_config, player_id=5, player_name='PLAYER', services=ScriptedServices())
+        state_machine.on_action(StateMachineAction.by_admin(commands.STARTED))
+        self.assertEqual(state_machine.actions_counter, 1)
+        self.assertEqual(state_machine.take_journal_entries(), [])
+
+    def test_non_mutating_action_is_not_journaled(self):
+        self._sut.on_action(StateMachineAction.by_user(commands.HELP))
+        self.assertEqual(self._sut.actions_counter, 0)
+        self.assertEqual(self._sut.take_journal_entries(), [])
+
+    def test_replayed_action_is_counted_but_not_journaled(self):
+        self._sut.replay_action(StateMachineAction.by_admin(commands.STARTED))
+        self.assertEqual(self._sut.actions_counter, 1)
+        self.assertEqual(self._sut.take_journal_entries(), [])
+
+    def test_actions_counter_is_restored_from_json(self):
+        self._sut.on_action(StateMachineAction.by_admin(commands.STARTED))
+        state_machine = StateMachine(self._game_config, player_id=5, player_name='PLAYER')
+        state_machine.from_json_object(self._sut.to_json_object())
+        self.assertEqual(state_machine.actions_counter, 1)
+        self.assertEqual(state_machine.snapshot_actions_counter, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,580 @@
+import json
+import os.path
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+from curry_quest.config import Config
+from curry_quest.persistence_writer import ThreadPoolPersistenceWriter
+from curry_quest.replay import Replay
+from curry_quest.states_files_handler import StatesHandler
+from curry_quest.states_storage import StatesStorage, StateSummary, JsonFilesStatesStorage, SqliteStatesStorage, \
+    migrate_states
+from curry_quest.state_machine import StateMachine
+from game_config import ScriptedServices, load_game_config, play
+
+
+class StatesStorageTestBase:
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self._directory = self._temporary_directory.name
+        self._sut = self._create_storage()
+
+    def tearDown(self):
+        self._sut.close()
+        self._temporary_directory.cleanup()
+
+    def _create_storage(self) -> StatesStorage:
+        raise NotImplementedError()
+
+    def _state_json_object(self, player_id, player_name='PLAYER'):
+        return {'player_id': player_id, 'player_name': player_name}
+
+    def test_written_states_can_be_read(self):
+        self._sut.write_many({4: self._state_json_object(4), 7: self._state_json_object(7)})
+        self.assertEqual(self._sut.read(4), self._state_json_object(4))
+        self.assertEqual(self._sut.read(7), self._state_json_object(7))
+
+    def test_overwritten_state_can_be_read_as_previous(self):
+        self._sut.write_many({4: self._state_json_object(4, 'OLD')})
+        self.assertIsNone(self._sut.read_previous(4))
+        self._sut.write_many({4: self._state_json_object(4, 'NEW')})
+        self.assertEqual(self._sut.read_previous(4), self._state_json_object(4, 'OLD'))
+
+    def test_previous_state_of_non_existing_player_is_none(self):
+        self.assertIsNone(self._sut.read_previous(4))
+
+    def test_player_ids_returns_all_written_players(self):
+        self._sut.write_many({4: self._state_json_object(4), 7: self._state_json_object(7)})
+        self.assertEqual(sorted(self._sut.player_ids()), [4, 7])
+
+    def test_read_all_returns_all_written_states(self):
+        self._sut.write_many({4: self._state_json_object(4), 7: self._state_json_object(7)})
+        self.assertEqual(
+            sorted(self._sut.read_all(), key=lambda json_object: json_object['player_id']),
+            [self._state_json_object(4), self._state_json_object(7)])
+
+    def test_write_overwrites_previous_state(self):
+        self._sut.write_many({4: self._state_json_object(4, 'OLD')})
+        self._sut.write_many({4: self._state_json_object(4, 'NEW')})
+        self.assertEqual(self._sut.read(4), self._state_json_object(4, 'NEW'))
+
+    def test_deleted_state_cannot_be_read(self):
+        self._sut.write_many({4: self._state_json_object(4)})
+        self._sut.delete(4)
+        self.assertEqual(self._sut.player_ids(), [])
+        with self.assertRaises(StatesStorage.StorageError):
+            self._sut.read(4)
+
+    def test_deleting_non_existing_state_succeeds(self):
+        self._sut.delete(4)
+        self.assertEqual(self._sut.player_ids(), [])
+
+    def test_reading_non_existing_state_raises_storage_error(self):
+        with self.assertRaises(StatesStorage.StorageError):
+            self._sut.read(4)
+
+    def test_written_states_summaries_are_indexed(self):
+        self._sut.write_many(
+            {4: self._state_json_object(4), 7: self._state_json_object(7)},
+            {4: StateSummary.WaitingForEvent, 7: StateSummary.WaitingForEvent | StateSummary.DelayedAction})
+        self.assertEqual(
+            self._sut.read_index(),
+            {4: StateSummary.WaitingForEvent, 7: StateSummary.WaitingForEvent | StateSummary.DelayedAction})
+
+    def test_states_written_without_summaries_are_not_indexed(self):
+        self._sut.write_many({4: self._state_json_object(4)}, {4: StateSummary.WaitingForEvent})
+        self._sut.write_many({4: self._state_json_object(4), 7: self._state_json_object(7)})
+        self.assertEqual(self._sut.read_index(), {})
+
+    def test_written_index_updates_summaries(self):
+        self._sut.write_many({4: self._state_json_object(4)})
+        self._sut.write_index({4: StateSummary.DelayedAction})
+        self.assertEqual(self._sut.read_index(), {4: StateSummary.DelayedAction})
+
+    def test_deleted_state_is_removed_from_index(self):
+        self._sut.write_many({4: self._state_json_object(4)}, {4: StateSummary.Empty})
+        self._sut.delete(4)
+        self.assertEqual(self._sut.read_index(), {})
+
+    def test_index_is_persisted(self):
+        self._sut.write_many({4: self._state_json_object(4)}, {4: StateSummary.WaitingForEvent})
+        self._sut.close()
+        self._sut = self._create_storage()
+        self.assertEqual(self._sut.read_index(), {4: StateSummary.WaitingForEvent})
+
+    def _journal_entries(self, *sequence_numbers):
+        return [(sequence_number, json.dumps({'seq': sequence_number})) for sequence_number in sequence_numbers]
+
+    def test_appended_journal_entries_are_read_in_order(self):
+        self._sut.append_journal({4: self._journal_entries(1, 2), 7: self._journal_entries(1)})
+        self._sut.append_journal({4: self._journal_entries(3)})
+        self.assertEqual(self._sut.read_journal(4), [{'seq': 1}, {'seq': 2}, {'seq': 3}])
+        self.assertEqual(self._sut.read_journal(7), [{'seq': 1}])
+
+    def test_journal_of_player_without_entries_is_empty(self):
+        self.assertEqual(self._sut.read_journal(4), [])
+
+    def test_truncated_journal_keeps_only_later_entries(self):
+        self._sut.append_journal({4: self._journal_entries(1, 2, 3)})
+        self._sut.truncate_journal(4, 2)
+        self.assertEqual(self._sut.read_journal(4), [{'seq': 3}])
+        self._sut.truncate_journal(4, 3)
+        self.assertEqual(self._sut.read_journal(4), [])
+
+    def test_deleted_state_journal_is_removed(self):
+        self._sut.write_many({4: self._state_json_object(4)})
+        self._sut.append_journal({4: self._journal_entries(1)})
+        self._sut.delete(4)
+        self.assertEqual(self._sut.read_journal(4), [])
+
+
+class JsonFilesStatesStorageTest(StatesStorageTestBase, unittest.TestCase):
+    def _create_storage(self):
+        return JsonFilesStatesStorage(self._directory)
+
+    def test_journal_is_read_up_to_torn_entry(self):
+        self._sut.append_journal({4: self._journal_entries(1)})
+        with open(os.path.join(self._directory, '4' + JsonFilesStatesStorage.JOURNAL_FILE_SUFFIX), 'a') as f:
+            f.write('{"seq": 2')
+        self.assertEqual(self._sut.read_journal(4), [{'seq': 1}])
+
+    def test_non_json_files_are_ignored(self):
+        with open(os.path.join(self._directory, 'notes.txt'), 'w') as f:
+            f.write('notes')
+        self._sut.write_many({4: self._state_json_object(4)})
+        self.assertEqual(self._sut.player_ids(), [4])
+        self.assertEqual(list(self._sut.read_all()), [self._state_json_object(4)])
+
+    def test_index_file_is_not_read_as_state(self):
+        self._sut.write_many({4: self._state_json_object(4)}, {4: StateSummary.WaitingForEvent})
+        self.assertEqual(self._sut.player_ids(), [4])
+        self.assertEqual(list(self._sut.read_all()), [self._state_json_object(4)])
+
+    def test_invalid_json_files_are_skipped(self):
+        with open(os.path.join(self._directory, '5.json'), 'w') as f:
+            f.write('{')
+        self._sut.write_many({4: self._state_json_object(4)})
+        self.assertEqual(list(self._sut.read_all()), [self._state_json_object(4)])
+
+    def _state_file_path(self, player_id, suffix=''):
+        return os.path.join(self._directory, f'{player_id}.json{suffix}')
+
+    def _write_file(self, file_path, content):
+        with open(file_path, 'w') as f:
+            f.write(content)
+
+    def test_state_file_has_checksum_header(self):
+        self._sut.write_many({4: self._state_json_object(4)})
+        with open(self._state_file_path(4)) as f:
+            self.assertTrue(f.readline().startswith(JsonFilesStatesStorage.CHECKSUM_HEADER_PREFIX))
+
+    def test_legacy_state_file_without_checksum_is_read(self):
+        self._write_file(self._state_file_path(4), json.dumps(self._state_json_object(4)))
+        self.assertEqual(self._sut.read(4), self._state_json_object(4))
+
+    def test_no_temporary_files_are_left_after_write(self):
+        self._sut.write_many({4: self._state_json_object(4)})
+        self._sut.write_many({4: self._state_json_object(4)})
+        self.assertEqual(sorted(os.listdir(self._directory)), ['4.json', '4.json.prev'])
+
+    def test_previous_generation_is_read_when_state_file_is_truncated(self):
+        self._sut.write_many({4: self._state_json_object(4, 'OLD')})
+        self._sut.write_many({4: self._state_json_object(4, 'NEW')})
+        with open(self._state_file_path(4)) as f:
+            content = f.read()
+        self._write_file(self._state_file_path(4), content[:len(content) // 2])
+        self.assertEqual(self._sut.read(4), self._state_json_object(4, 'OLD'))
+
+    def test_previous_generation_is_read_when_checksum_does_not_match(self):
+        self._sut.write_many({4: self._state_json_object(4, 'OLD')})
+        self._sut.write_many({4: self._state_json_object(4, 'NEW')})
+        with open(self._state_file_path(4)) as f:
+            content = f.read()
+        self._write_file(self._state_file_path(4), content.replace('NEW', 'BAD'))
+        self.assertEqual(self._sut.read(4), self._state_json_object(4, 'OLD'))
+
+    def test_previous_generation_is_read_when_crash_happened_between_renames(self):
+        self._sut.write_many({4: self._state_json_object(4, 'OLD')})
+        os.replace(self._state_file_path(4), self._state_file_path(4, '.prev'))
+        self.assertEqual(self._sut.player_ids(), [4])
+        self.assertEqual(self._sut.read(4), self._state_json_object(4, 'OLD'))
+
+    def test_invalid_state_without_previous_generation_raises_storage_error(self):
+        self._write_file(self._state_file_path(4), '#crc32:00000000\n{}')
+        with self.assertRaises(StatesStorage.StorageError):
+            self._sut.read(4)
+
+    def test_delete_removes_all_generations(self):
+        self._sut.write_many({4: self._state_json_object(4)})
+        self._sut.write_many({4: self._state_json_object(4)})
+        self._sut.delete(4)
+        self.assertEqual(os.listdir(self._directory), [])
+
+    def _index_file_lines(self):
+        with open(os.path.join(self._directory, JsonFilesStatesStorage.INDEX_FILE_NAME)) as f:
+            return f.read().splitlines()
+
+    def test_summary_changes_are_appended_to_index(self):
+        self._sut.write_many(
+            {4: self._state_json_object(4), 7: self._state_json_object(7)},
+            {4: StateSummary.Empty, 7: StateSummary.Empty})
+        index_file_lines = self._index_file_lines()
+        self._sut.write_index({4: StateSummary.Empty, 7: StateSummary.DelayedAction})
+        self.assertEqual(self._index_file_lines(), index_file_lines + [json.dumps({'7': 2})])
+        self._sut.write_index({7: StateSummary.DelayedAction})
+        self.assertEqual(len(self._index_file_lines()), len(index_file_lines) + 1)
+
+    def test_index_is_compacted_on_close(self):
+        self._sut.write_many({4: self._state_json_object(4)}, {4: StateSummary.Empty})
+        for summary in [StateSummary.WaitingForEvent, StateSummary.DelayedAction, StateSummary.Empty]:
+            self._sut.write_index({4: summary})
+        self._sut.close()
+        self.assertEqual(self._index_file_lines(), [json.dumps({'4': 0})])
+        self._sut = self._create_storage()
+        self.assertEqual(self._sut.read_index(), {4: StateSummary.Empty})
+
+    def test_index_is_read_up_to_torn_entry(self):
+        self._sut.write_many({4: self._state_json_object(4)}, {4: StateSummary.Empty})
+        with open(os.path.join(self._directory, JsonFilesStatesStorage.INDEX_FILE_NAME), 'a') as f:
+            f.write('{"4": 1')
+        self._sut = self._create_storage()
+        self.assertEqual(self._sut.read_index(), {4: StateSummary.Empty})
+
+    def test_players_missing_from_incomplete_index_are_unindexed(self):
+        self._sut.write_many({4: self._state_json_object(4), 7: self._state_json_object(7)}, {4: StateSummary.Empty})
+        self.assertEqual(self._sut.unindexed_player_ids(), [7])
+        self._sut.write_index({7: StateSummary.Empty})
+        self.assertEqual(self._index_file_lines()[0], JsonFilesStatesStorage.INDEX_HEADER)
+        self._sut = self._create_storage()
+        self.assertEqual(self._sut.unindexed_player_ids(), [])
+        self.assertEqual(self._sut.read_index(), {4: StateSummary.Empty, 7: StateSummary.Empty})
+
+    def test_complete_index_does_not_list_state_files(self):
+        self._sut.write_many({4: self._state_json_object(4)}, {4: StateSummary.Empty})
+        self.assertEqual(self._sut.unindexed_player_ids(), [])
+        self._write_file(self._state_file_path(7), json.dumps(self._state_json_object(7)))
+        self._sut = self._create_storage()
+        self.assertEqual(self._sut.unindexed_player_ids(), [])
+
+    def test_summary_is_read_from_state_file_header(self):
+        self._sut.write_many({4: self._state_json_object(4)}, {4: StateSummary.WaitingForEvent})
+        self.assertEqual(self._sut.read_summary(4), StateSummary.WaitingForEvent)
+        self.assertEqual(self._sut.read(4), self._state_json_object(4))
+
+    def test_summary_is_not_read_from_state_file_header_when_journal_exists(self):
+        self._sut.write_many({4: self._state_json_object(4)}, {4: StateSummary.WaitingForEvent})
+        self._sut.append_journal({4: self._journal_entries(1)})
+        self.assertIsNone(self._sut.read_summary(4))
+
+    def test_summary_of_legacy_state_file_is_unknown(self):
+        self._write_file(self._state_file_path(4), json.dumps(self._state_json_object(4)))
+        self.assertIsNone(self._sut.read_summary(4))
+        self.assertIsNone(self._sut.read_summary(7))
+
+    def test_states_are_written_with_fsync(self):
+        self._sut = JsonFilesStatesStorage(self._directory, fsync=True)
+        self._sut.write_many({4: self._state_json_object(4), 7: self._state_json_object(7)})
+        self.assertEqual(self._sut.read(7), self._state_json_object(7))
+
+
+class SqliteStatesStorageTest(StatesStorageTestBase, unittest.TestCase):
+    def _create_storage(self):
+        return SqliteStatesStorage(self._database_path())
+
+    def _database_path(self):
+        return os.path.join(self._directory, 'states.db')
+
+    def test_database_uses_wal_journal_mode(self):
+        journal_mode, = self._sut._connection.execute('PRAGMA journal_mode').fetchone()
+        self.assertEqual(journal_mode, 'wal')
+
+    def test_summary_column_is_added_to_existing_database(self):
+        self._sut.close()
+        os.remove(self._database_path())
+        connection = sqlite3.connect(self._database_path())
+        with connection:
+            connection.execute('CREATE TABLE player_states (player_id INTEGER PRIMARY KEY, state TEXT NOT NULL)')
+            connection.execute('INSERT INTO player_states VALUES (4, ?)', (json.dumps(self._state_json_object(4)),))
+        connection.close()
+        self._sut = self._create_storage()
+        self.assertEqual(self._sut.read_index(), {})
+        self._sut.write_index({4: StateSummary.WaitingForEvent})
+        self.assertEqual(self._sut.read_index(), {4: StateSummary.WaitingForEvent})
+
+    def test_states_are_persisted_between_connections(self):
+        self._sut.write_many({4: self._state_json_object(4)})
+        self._sut.close()
+        self._sut = self._create_storage()
+        self.assertEqual(self._sut.read(4), self._state_json_object(4))
+
+
+class MigrateStatesTest(unittest.TestCase):
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self._directory = self._temporary_directory.name
+        self._source = JsonFilesStatesStorage(self._directory)
+        self._destination = SqliteStatesStorage(':memory:')
+
+    def tearDown(self):
+        self._destination.close()
+        self._temporary_directory.cleanup()
+
+    def test_all_states_are_migrated(self):
+        self._source.write_many(dict((player_id, {'player_id': player_id}) for player_id in range(1, 8)))
+        self.assertEqual(migrate_states(self._source, self._destination, batch_size=3), 7)
+        self.assertEqual(sorted(self._destination.player_ids()), list(range(1, 8)))
+
+    def test_states_without_valid_player_id_are_skipped(self):
+        with open(os.path.join(self._directory, '5.json'), 'w') as f:
+            f.write(json.dumps({'player_name': 'PLAYER'}))
+        self._source.write_many({4: {'player_id': 4}})
+        self.assertEqual(migrate_states(self._source, self._destination), 1)
+        self.assertEqual(self._destination.player_ids(), [4])
+
+    def test_states_summaries_are_migrated(self):
+        self._source.write_many({4: {'player_id': 4}, 7: {'player_id': 7}})
+        migrate_states(self._source, self._destination, {4: StateSummary.DelayedAction})
+        self.assertEqual(self._destination.read_index(), {4: StateSummary.DelayedAction})
+        self.assertEqual(self._destination.unindexed_player_ids(), [7])
+
+    def test_states_are_not_migrated_to_destination_holding_states(self):
+        self._source.write_many({4: {'player_id': 4, 'player_name': 'OLD'}})
+        self._destination.write_many({4: {'player_id': 4, 'player_name': 'NEW'}})
+        with self.assertRaises(StatesStorage.StorageError):
+            migrate_states(self._source, self._destination)
+        self.assertEqual(self._destination.read(4), {'player_id': 4, 'player_name': 'NEW'})
+
+
+class StatesHandlerTest(unittest.TestCase):
+    def setUp(self):
+        self._game_config = Config()
+        self._storage = SqliteStatesStorage(':memory:')
+        self._sut = StatesHandler(self._storage)
+
+    def tearDown(self):
+        self._sut.close()
+
+    def test_saved_state_machines_are_loaded(self):
+        self._sut.save_many([
+            StateMachine(self._game_config, 4, 'PLAYER 4'),
+            StateMachine(self._game_config, 7, 'PLAYER 7')
+        ])
+        state_machines = self._sut.load(self._game_config)
+        self.assertEqual(sorted(state_machines.keys()), [4, 7])
+        self.assertEqual(state_machines[4].player_name, 'PLAYER 4')
+        self.assertEqual(state_machines[7].player_name, 'PLAYER 7')
+
+    def test_invalid_states_are_not_loaded(self):
+        self._storage.write_many({4: {'player_id': 4}})
+        self._sut.save(StateMachine(self._game_config, 7, 'PLAYER 7'))
+        self.assertEqual(list(self._sut.load(self._game_config).keys()), [7])
+
+    def test_saved_state_machine_is_loaded_on_demand(self):
+        self._sut.save(StateMachine(self._game_config, 4, 'PLAYER 4'))
+        self.assertEqual(self._sut.load_player(4, self._game_config).player_name, 'PLAYER 4')
+
+    def test_invalid_state_is_not_loaded_on_demand(self):
+        self._storage.write_many({4: {'player_id': 4}})
+        self.assertIsNone(self._sut.load_player(4, self._game_config))
+        self.assertIsNone(self._sut.load_player(7, self._game_config))
+
+    def test_saved_state_machines_are_indexed_with_summaries(self):
+        self._sut.save(StateMachine(self._game_config, 4, 'PLAYER 4'))
+        self.assertEqual(self._sut.load_index(self._game_config), {4: StateSummary.Empty})
+
+    def test_missing_index_entries_are_rebuilt(self):
+        self._storage.write_many({4: StateMachine(self._game_config, 4, 'PLAYER 4').to_json_object()})
+        self.assertEqual(self._storage.read_index(), {})
+        self.assertEqual(self._sut.load_index(self._game_config), {4: StateSummary.Empty})
+        self.assertEqual(self._storage.read_index(), {4: StateSummary.Empty})
+
+    def test_players_with_invalid_states_are_not_indexed(self):
+        self._storage.write_many({4: {'player_id': 4}})
+        self.assertEqual(self._sut.load_index(self._game_config), {})
+
+
+class JsonFilesStatesHandlerIndexTest(unittest.TestCase):
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self._directory = self._temporary_directory.name
+        self._game_config = Config()
+        self._storage = JsonFilesStatesStorage(self._directory)
+        self._sut = StatesHandler(self._storage)
+
+    def tearDown(self):
+        self._sut.close()
+        self._temporary_directory.cleanup()
+
+    def test_index_is_rebuilt_from_state_files_headers(self):
+        self._storage.write_many({4: {'player_id': 4}}, {4: StateSummary.DelayedAction})
+        os.remove(os.path.join(self._directory, JsonFilesStatesStorage.INDEX_FILE_NAME))
+        self._storage = JsonFilesStatesStorage(self._directory)
+        self._sut = StatesHandler(self._storage)
+        self.assertEqual(self._sut.load_index(self._game_config), {4: StateSummary.DelayedAction})
+        self.assertEqual(self._storage.unindexed_player_ids(), [])
+
+    def test_legacy_state_files_are_indexed_by_loading_them(self):
+        with open(os.path.join(self._directory, '4.json'), 'w') as f:
+            f.write(json.dumps(StateMachine(self._game_config, 4, 'PLAYER 4').to_json_object()))
+        self.assertEqual(self._sut.load_index(self._game_config), {4: StateSummary.Empty})
+        self.assertEqual(self._storage.read_index(), {4: StateSummary.Empty})
+
+
+class JournalingStatesHandlerTest(unittest.TestCase):
+    SNAPSHOT_INTERVAL = 5
+
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self._game_config = load_game_config()
+        self._storage = JsonFilesStatesStorage(self._temporary_directory.name)
+        self._services = ScriptedServices()
+        self._state_machine = StateMachine(self._game_config, 4, 'PLAYER', self._services)
+        self._sut = self._create_sut(self.SNAPSHOT_INTERVAL)
+
+    def tearDown(self):
+        self._sut.close()
+        self._temporary_directory.cleanup()
+
+    def _create_sut(self, snapshot_interval):
+        return StatesHandler(self._storage, snapshot_interval=snapshot_interval)
+
+    def _play_and_save(self, actions_count):
+        for seed in range(actions_count):
+            play(self._state_machine, self._services, actions_count=1, seed=seed)
+            self._sut.save(self._state_machine)
+
+    def _snapshot_actions_counter(self):
+        return self._storage.read(4)['actions_counter']
+
+    def test_state_is_snapshotted_every_interval_actions(self):
+        self._play_and_save(12)
+        self.assertLess(self._state_machine.actions_counter - self._snapshot_actions_counter(), self.SNAPSHOT_INTERVAL)
+        self.assertLess(self._snapshot_actions_counter(), self._state_machine.actions_counter)
+
+    def test_actions_after_snapshot_are_journaled(self):
+        self._play_and_save(12)
+        self.assertEqual(
+            [journal_entry['seq'] for journal_entry in self._storage.read_journal(4)][-1],
+            self._state_machine.actions_counter)
+
+    def test_journal_is_truncated_after_snapshots(self):
+        self._play_and_save(30)
+        self.assertLess(len(self._storage.read_journal(4)), 2 * self.SNAPSHOT_INTERVAL + 2)
+
+    def test_loaded_state_machine_replays_journal(self):
+        self._play_and_save(23)
+        state_machine = self._sut.load_player(4, self._game_config)
+        self.assertEqual(state_machine.actions_counter, self._state_machine.actions_counter)
+        self.assertEqual(state_machine.to_json_object(), self._state_machine.to_json_object())
+
+    def test_recording_covers_turns_since_previous_snapshot(self):
+        self._play_and_save(12)
+        replay = Replay.from_storage(self._storage, 4, self._game_config)
+        self.assertLess(replay.first_turn, self._snapshot_actions_counter())
+        replay.fast_forward()
+        self.assertEqual(replay.state_machine.to_json_object(), self._state_machine.to_json_object())
+
+    def test_replay_stops_at_journal_gap(self):
+        self._play_and_save(3)
+        self._storage.append_journal({4: [(self._state_machine.actions_counter + 2, json.dumps({
+            'seq': self._state_machine.actions_counter + 2,
+            'command': 'restart',
+            'args': [],
+            'is_given_by_admin': True,
+            'is_delayed': False
+        }))]})
+        state_machine = self._sut.load_player(4, self._game_config)
+        self.assertEqual(state_machine.to_json_object(), self._state_machine.to_json_object())
+
+    def _play_and_fail_to_save(self, storage_method_name, actions_count):
+        with patch.object(self._storage, storage_method_name, side_effect=StatesStorage.StorageError('Disk full')), \
+                self.assertLogs('curry_quest.states_files_handler', level='ERROR'):
+            self._play_and_save(actions_count)
+
+    def _assert_loaded_state_is_latest(self):
+        state_machine = self._sut.load_player(4, self._game_config)
+        self.assertEqual(state_machine.to_json_object(), self._state_machine.to_json_object())
+
+    def test_state_is_restored_after_failed_journal_append(self):
+        self._play_and_save(2)
+        self._play_and_fail_to_save('append_journal', 2)
+        self._play_and_save(1)
+        self._assert_loaded_state_is_latest()
+
+    def test_state_is_restored_after_failed_snapshot_write(self):
+        self._play_and_fail_to_save('write_encoded_many', 1)
+        self._play_and_save(2)
+        self._assert_loaded_state_is_latest()
+
+    def test_snapshot_interval_of_one_disables_journaling(self):
+        self._sut = self._create_sut(snapshot_interval=1)
+        self._play_and_save(6)
+        self.assertEqual(self._storage.read_journal(4), [])
+        self.assertEqual(self._snapshot_actions_counter(), self._state_machine.actions_counter)
+
+    def test_snapshot_interval_of_one_does_not_record_journal_entries(self):
+        self._sut = self._create_sut(snapshot_interval=1)
+        self._play_and_save(1)
+        play(self._state_machine, self._services, actions_count=3, seed=1)
+        self.assertEqual(self._state_machine.take_journal_entries(), [])
+
+
+class ThreadedStatesHandlerTest(unittest.TestCase):
+    def setUp(self):
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self._game_config = Config()
+        self._writer = ThreadPoolPersistenceWriter(lanes_count=2)
+        self._storage = SqliteStatesStorage(os.path.join(self._temporary_directory.name, 'states.db'))
+        self._sut = StatesHandler(self._storage, self._writer)
+
+    def tearDown(self):
+        self._sut.close()
+        self._writer.close()
+        self._temporary_directory.cleanup()
+
+    def test_save_returns_futures_completed_when_state_is_written(self):
+        futures = self._sut.save_many([
+            StateMachine(self._game_config, 4, 'PLAYER 4'),
+            StateMachine(self._game_config, 7, 'PLAYER 7')
+        ])
+        self.assertEqual(len(futures), 2)
+        for future in futures:
+            future.result()
+        self.assertEqual(sorted(self._storage.player_ids()), [4, 7])
+
+    def test_player_loaded_after_save_has_latest_state(self):
+        state_machine = StateMachine(self._game_config, 4, 'OLD NAME')
+        self._sut.save(state_machine)
+        state_machine.player_name = 'NEW NAME'
+        self._sut.save(state_machine)
+        self.assertEqual(self._sut.load_player(4, self._game_config).player_name, 'NEW NAME')
+
+    def test_flush_waits_for_pending_writes(self):
+        self._sut.save_many([
+            StateMachine(self._game_config, 4, 'PLAYER 4'),
+            StateMachine(self._game_config, 7, 'PLAYER 7')
+        ])
+        self._sut.flush()
+        self.assertEqual(sorted(self._storage.player_ids()), [4, 7])
+
+    def test_flush_player_waits_for_pending_player_writes(self):
+        self._sut.save(StateMachine(self._game_config, 4, 'PLAYER 4'))
+        self._sut.flush_player(4)
+        self.assertEqual(self._storage.player_ids(), [4])
+
+    def test_state_is_snapshotted_when_saved(self):
+        state_machine = StateMachine(self._game_config, 4, 'SAVED NAME')
+        futures = self._sut.save(state_machine)
+        state_machine.player_name = 'CHANGED NAME'
+        futures[0].result()
+        self.assertEqual(self._storage.read(4)['player_name'], 'SAVED NAME')
+
+    def test_deleted_player_is_not_loaded(self):
+        self._sut.save(StateMachine(self._game_config, 4, 'PLAYER 4'))
+        self._sut.delete(4).result()
+        self.assertIsNone(self._sut.load_player(4, self._game_config))
+
+
+if __name__ == '__main__':
+    unittest.main()
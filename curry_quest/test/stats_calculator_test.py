@@ -0,0 +1,117 @@
+import math
+import random
+import unittest
+from curry_quest.stats_calculator import StatsCalculator
+from curry_quest.unit_traits import UnitTraits
+
+
+def iterative_evolved_hp(unit_traits: UnitTraits, level):
+    hp = unit_traits.base_hp
+    hp_growth = unit_traits.hp_growth
+    for n in range(2, level + 1):
+        hp += hp_growth * (n - 1) // 16 - hp_growth * (n - 2) // 16
+        hp += int(2896 * hp_growth * math.sqrt(hp_growth * (n - 1)) / 32768)
+        hp -= int(2896 * hp_growth * math.sqrt(hp_growth * (n - 2)) / 32768)
+    return hp
+
+
+def iterative_evolved_non_hp_stat(base_stat, stat_growth, stat_divisor, level):
+    stat = base_stat
+    for n in range(2, level + 1):
+        stat += (base_stat * stat_growth * (n - 1)) // stat_divisor
+        stat -= (base_stat * stat_growth * (n - 2)) // stat_divisor
+    return stat
+
+
+class StatsCalculatorTest(unittest.TestCase):
+    MAX_LEVEL = 99
+
+    def _random_unit_traits(self, rng: random.Random, is_evolved: bool) -> UnitTraits:
+        unit_traits = UnitTraits()
+        unit_traits.is_evolved = is_evolved
+        unit_traits.base_hp = rng.randint(1, 60)
+        unit_traits.hp_growth = rng.randint(0, 40)
+        unit_traits.base_mp = rng.randint(0, 60)
+        unit_traits.mp_growth = rng.randint(0, 40)
+        unit_traits.base_attack = rng.randint(1, 30)
+        unit_traits.attack_growth = rng.randint(0, 20)
+        unit_traits.base_defense = rng.randint(1, 30)
+        unit_traits.defense_growth = rng.randint(0, 20)
+        unit_traits.base_luck = rng.randint(0, 30)
+        unit_traits.luck_growth = rng.randint(0, 40)
+        return unit_traits
+
+    def test_evolved_stats_match_iterative_sums(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            unit_traits = self._random_unit_traits(rng, is_evolved=True)
+            stats_calculator = StatsCalculator(unit_traits)
+            for level in range(1, self.MAX_LEVEL + 1):
+                self.assertEqual(stats_calculator.hp(level), iterative_evolved_hp(unit_traits, level))
+                self.assertEqual(
+                    stats_calculator.mp(level),
+                    iterative_evolved_non_hp_stat(unit_traits.base_mp, unit_traits.mp_growth, 1024, level))
+                self.assertEqual(
+                    stats_calculator.attack(level),
+                    iterative_evolved_non_hp_stat(unit_traits.base_attack, unit_traits.attack_growth, 64, level))
+                self.assertEqual(
+                    stats_calculator.defense(level),
+                    iterative_evolved_non_hp_stat(unit_traits.base_defense, unit_traits.defense_growth, 64, level))
+                self.assertEqual(
+                    stats_calculator.luck(level),
+                    iterative_evolved_non_hp_stat(unit_traits.base_luck, unit_traits.luck_growth, 1024, level))
+
+    def test_non_evolved_stats_are_capped(self):
+        unit_traits = UnitTraits()
+        unit_traits.base_hp = 250
+        unit_traits.hp_growth = 40
+        unit_traits.base_attack = 200
+        unit_traits.attack_growth = 20
+        stats_calculator = StatsCalculator(unit_traits)
+        self.assertEqual(stats_calculator.hp(self.MAX_LEVEL), 255)
+        self.assertEqual(stats_calculator.attack(self.MAX_LEVEL), 255)
+
+    def test_stat_increases_are_differences_between_levels(self):
+        unit_traits = self._random_unit_traits(random.Random(1), is_evolved=False)
+        stats_calculator = StatsCalculator(unit_traits)
+        self.assertEqual(stats_calculator.hp_increase(1), unit_traits.base_hp)
+        for level in range(2, self.MAX_LEVEL + 1):
+            self.assertEqual(
+                stats_calculator.hp_increase(level),
+                stats_calculator.hp(level) - stats_calculator.hp(level - 1))
+            self.assertEqual(
+                stats_calculator.luck_increase(level),
+                stats_calculator.luck(level) - stats_calculator.luck(level - 1))
+
+    def test_stats_table_is_shared_between_traits_with_same_stats(self):
+        unit_traits = self._random_unit_traits(random.Random(2), is_evolved=True)
+        unit_traits_copy = unit_traits.copy()
+        unit_traits_copy.name = 'Copy'
+        StatsCalculator(unit_traits).tabulate(10)
+        self.assertIs(StatsCalculator(unit_traits_copy)._stats_table, StatsCalculator(unit_traits)._stats_table)
+
+    def test_stats_tables_cache_is_bounded(self):
+        rng = random.Random(4)
+        for _ in range(StatsCalculator.MAX_STATS_TABLES + 10):
+            StatsCalculator(self._random_unit_traits(rng, is_evolved=True))
+        self.assertLessEqual(len(StatsCalculator._stats_tables), StatsCalculator.MAX_STATS_TABLES)
+
+    def test_evicted_stats_table_keeps_serving_existing_calculator(self):
+        unit_traits = self._random_unit_traits(random.Random(5), is_evolved=True)
+        stats_calculator = StatsCalculator(unit_traits)
+        rng = random.Random(6)
+        for _ in range(StatsCalculator.MAX_STATS_TABLES):
+            StatsCalculator(self._random_unit_traits(rng, is_evolved=True))
+        self.assertEqual(stats_calculator.hp(10), iterative_evolved_hp(unit_traits, 10))
+
+    def test_traits_modification_does_not_use_stale_stats_table(self):
+        unit_traits = self._random_unit_traits(random.Random(3), is_evolved=True)
+        StatsCalculator(unit_traits).tabulate(10)
+        unit_traits.base_attack += 1
+        self.assertEqual(
+            StatsCalculator(unit_traits).attack(10),
+            iterative_evolved_non_hp_stat(unit_traits.base_attack, unit_traits.attack_growth, 64, 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
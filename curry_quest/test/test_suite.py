@@ -1,18 +1,35 @@
 import abilities_test
 import ability_use_unit_action_test
+import battle_estimator_test
+import clone_test
+import config_indexes_test
 import controller_test
 import curry_quest_test
+import event_targets_test
+import floor_descriptor_test
 import hall_of_fame_test
 import item_use_unit_action_test
 import items_test
+import persistence_writer_test
 import physical_attack_executor_test
 import physical_attack_unit_action_test
+import player_state_machines_test
+import replay_test
 import save_load_state_test
+import scheduler_test
+import sim_test
 import spell_cast_action_handler_test
 import spells_test
 import state_battle_test
 import state_item_test
+import state_machine_test
+import states_storage_test
+import stats_calculator_test
+import unit_prototypes_test
+import unit_test
+import virtual_services_test
 import weight_test
+import write_behind_states_handler_test
 import unittest
 
 
@@ -20,19 +37,36 @@ def suite():
     test_modules = [
         abilities_test,
         ability_use_unit_action_test,
+        battle_estimator_test,
+        clone_test,
+        config_indexes_test,
         controller_test,
         curry_quest_test,
+        event_targets_test,
+        floor_descriptor_test,
         hall_of_fame_test,
         item_use_unit_action_test,
         items_test,
+        persistence_writer_test,
         physical_attack_executor_test,
         physical_attack_unit_action_test,
+        player_state_machines_test,
+        replay_test,
         save_load_state_test,
+        scheduler_test,
+        sim_test,
         spell_cast_action_handler_test,
         spells_test,
         state_battle_test,
         state_item_test,
-        weight_test
+        state_machine_test,
+        states_storage_test,
+        stats_calculator_test,
+        unit_prototypes_test,
+        unit_test,
+        virtual_services_test,
+        weight_test,
+        write_behind_states_handler_test
     ]
     loader = unittest.TestLoader()
     return unittest.TestSuite([loader.loadTestsFromModule(test) for test in test_modules])
@@ -0,0 +1,56 @@
+import unittest
+from curry_quest.statuses import Statuses
+from curry_quest.talents import Talents
+from curry_quest.unit_creator import UnitCreator
+from curry_quest.unit_prototypes import UnitPrototypes
+from game_config import load_game_config
+
+
+class UnitPrototypesTest(unittest.TestCase):
+    def setUp(self):
+        self._game_config = load_game_config()
+        self._unit_traits = self._game_config.monsters_traits['Troll']
+        self._sut = UnitPrototypes(self._game_config.levels)
+
+    def test_created_unit_matches_unit_created_from_scratch(self):
+        unit = self._sut.create(self._unit_traits, 3)
+        self.assertEqual(
+            unit.to_json_object(),
+            UnitCreator(self._unit_traits).create(3, levels=self._game_config.levels).to_json_object())
+
+    def test_prototype_is_built_once_per_traits_and_level(self):
+        self._sut.create(self._unit_traits, 2)
+        self._sut.create(self._unit_traits, 2)
+        self._sut.create(self._unit_traits, 3)
+        self.assertEqual(len(self._sut), 2)
+
+    def test_created_units_do_not_share_mutable_state(self):
+        first_unit = self._sut.create(self._unit_traits, 2)
+        first_unit.deal_damage(5)
+        first_unit.set_timed_status(Statuses.Poison, 3)
+        second_unit = self._sut.create(self._unit_traits, 2)
+        self.assertEqual(second_unit.hp, second_unit.max_hp)
+        self.assertFalse(second_unit.has_any_status())
+        self.assertIs(first_unit.traits, second_unit.traits)
+
+    def test_forbidden_talents_are_removed_from_copy_of_traits(self):
+        self._unit_traits.talents = Talents.Hard | Talents.Quick
+        unit = self._sut.create(self._unit_traits, 2, forbidden_talents=Talents.Hard)
+        self.assertEqual(unit.talents, Talents.Quick)
+        self.assertEqual(self._unit_traits.talents, Talents.Hard | Talents.Quick)
+
+    def test_prototype_is_rebuilt_when_traits_are_replaced(self):
+        self._sut.create(self._unit_traits, 2)
+        unit_traits_copy = self._unit_traits.copy()
+        unit_traits_copy.base_attack += 10
+        unit = self._sut.create(unit_traits_copy, 2)
+        self.assertIs(unit.traits, unit_traits_copy)
+        self.assertEqual(unit.attack, UnitCreator(unit_traits_copy).create(2, self._game_config.levels).attack)
+
+    def test_reloaded_config_has_empty_prototypes_cache(self):
+        self._game_config.unit_prototypes.create(self._unit_traits, 2)
+        self.assertEqual(len(load_game_config().unit_prototypes), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
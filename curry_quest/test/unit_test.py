@@ -0,0 +1,218 @@
+import random
+import unittest
+from curry_quest.genus import Genus
+from curry_quest.statuses import Statuses
+from curry_quest.talents import Talents
+from curry_quest.unit import Unit
+from curry_quest.unit_creator import UnitCreator
+from game_config import load_game_config
+
+
+def uncached_derived_stats(unit: Unit) -> dict[str, int]:
+    stat_factor = 1.5 if unit.has_status(Statuses.StatsBoost) else 1.0
+    return {
+        'max_hp': unit._max_hp * (2 if unit.talents.has(Talents.HpIncreased) else 1),
+        'max_mp': unit._max_mp * (2 if unit.talents.has(Talents.MpIncreased) else 1),
+        'attack': int(unit._attack * stat_factor * (1.2 if unit.talents.has(Talents.StrengthIncreased) else 1)),
+        'defense': int(unit._defense * stat_factor * (1.2 if unit.talents.has(Talents.Hard) else 1)),
+        'luck': int(unit._luck * stat_factor)
+    }
+
+
+def derived_stats(unit: Unit) -> dict[str, int]:
+    return {
+        'max_hp': unit.max_hp,
+        'max_mp': unit.max_mp,
+        'attack': unit.attack,
+        'defense': unit.defense,
+        'luck': unit.luck
+    }
+
+
+class UnitDerivedStatsTest(unittest.TestCase):
+    STATS_NAMES = ['max_hp', 'max_mp', 'attack', 'defense', 'luck']
+    STATS_TALENTS = [Talents.HpIncreased, Talents.MpIncreased, Talents.StrengthIncreased, Talents.Hard]
+
+    def setUp(self):
+        self._game_config = load_game_config()
+        self._unit = UnitCreator(self._game_config.monsters_traits['Troll']).create(1, self._game_config.levels)
+        self._other_unit = UnitCreator(self._game_config.monsters_traits['Kewne']).create(1, self._game_config.levels)
+
+    def _assert_derived_stats_match(self):
+        self.assertEqual(derived_stats(self._unit), uncached_derived_stats(self._unit))
+
+    def test_derived_stats_follow_stats_setters(self):
+        for stat_name in self.STATS_NAMES:
+            derived_stats(self._unit)
+            setattr(self._unit, stat_name, 17)
+            self._assert_derived_stats_match()
+
+    def test_derived_stats_follow_stats_boost_status(self):
+        derived_stats(self._unit)
+        self._unit.set_status(Statuses.StatsBoost)
+        self._assert_derived_stats_match()
+        self._unit.clear_status(Statuses.StatsBoost)
+        self._assert_derived_stats_match()
+        self._unit.set_timed_status(Statuses.StatsBoost, 1)
+        self._assert_derived_stats_match()
+        self._unit.decrease_timed_status_counters()
+        self._assert_derived_stats_match()
+        self._unit.set_status(Statuses.StatsBoost)
+        derived_stats(self._unit)
+        self._unit.clear_statuses()
+        self._assert_derived_stats_match()
+
+    def test_derived_stats_follow_talents_change_on_fusion(self):
+        self._other_unit.traits.talents = Talents.HpIncreased | Talents.StrengthIncreased
+        derived_stats(self._unit)
+        self._unit.fuse(self._other_unit)
+        self._assert_derived_stats_match()
+        self.assertEqual(self._unit.max_hp, 2 * self._unit._max_hp)
+
+    def test_derived_stats_follow_json_load(self):
+        json_object = self._unit.to_json_object()
+        json_object['talents'] = (Talents.MpIncreased | Talents.Hard).value
+        json_object['statuses'] = Statuses.StatsBoost.value
+        derived_stats(self._unit)
+        self._unit.from_json_object(json_object)
+        self._assert_derived_stats_match()
+
+    def test_derived_stats_follow_level_changes(self):
+        self._unit.set_status(Statuses.StatsBoost)
+        derived_stats(self._unit)
+        self._unit.gain_exp(100000)
+        self._assert_derived_stats_match()
+        self._unit.decrease_level()
+        self._assert_derived_stats_match()
+
+    def _random_talents(self, rng: random.Random) -> Talents:
+        talents = Talents.Empty
+        for talent in rng.sample(self.STATS_TALENTS, rng.randint(0, len(self.STATS_TALENTS))):
+            talents |= talent
+        return talents
+
+    def test_derived_stats_match_uncached_calculation_for_random_changes(self):
+        rng = random.Random(0)
+        changes = [
+            lambda: setattr(self._unit, rng.choice(self.STATS_NAMES), rng.randint(1, 99)),
+            lambda: self._unit.set_status(Statuses.StatsBoost),
+            lambda: self._unit.clear_status(Statuses.StatsBoost),
+            lambda: self._unit.set_timed_status(Statuses.StatsBoost, rng.randint(1, 3)),
+            lambda: self._unit.decrease_timed_status_counters(),
+            lambda: self._unit.clear_statuses(),
+            lambda: self._unit._set_talents(self._random_talents(rng)),
+            lambda: setattr(self._unit, 'genus', rng.choice([Genus.Fire, Genus.Water, Genus.Wind])),
+            lambda: self._unit.gain_exp(rng.randint(0, 50)),
+            lambda: self._unit.decrease_level()
+        ]
+        for _ in range(2000):
+            rng.choice(changes)()
+            self._assert_derived_stats_match()
+
+
+class UnitTimedStatusesTest(unittest.TestCase):
+    def setUp(self):
+        self._game_config = load_game_config()
+        self._unit = UnitCreator(self._game_config.monsters_traits['Troll']).create(1, self._game_config.levels)
+        self._expected_durations: dict[Statuses, int] = {}
+
+    def _set_timed_status(self, statuses: Statuses, duration: int):
+        self._unit.set_timed_status(statuses, duration)
+        for status in Statuses:
+            if statuses & status:
+                self._expected_durations[status] = duration
+
+    def _clear_status(self, statuses: Statuses):
+        self._unit.clear_status(statuses)
+        for status in Statuses:
+            if statuses & status:
+                self._expected_durations.pop(status, None)
+
+    def _decrease_timed_status_counters(self):
+        expected_cleared_statuses = [
+            status for status, duration in self._expected_durations.items() if duration <= 1]
+        for status in list(self._expected_durations):
+            self._expected_durations[status] -= 1
+        for status in expected_cleared_statuses:
+            del self._expected_durations[status]
+        cleared_statuses = self._unit.decrease_timed_status_counters()
+        self.assertEqual(list(cleared_statuses), expected_cleared_statuses)
+
+    def _assert_timed_statuses_match(self):
+        for status in Statuses:
+            self.assertEqual(
+                self._unit.status_duration(status),
+                {status: self._expected_durations[status]} if status in self._expected_durations else {})
+            if status in self._expected_durations:
+                self.assertTrue(self._unit.has_status(status))
+        all_statuses = Statuses(0)
+        for status in Statuses:
+            all_statuses |= status
+        self.assertEqual(self._unit.status_duration(all_statuses), self._expected_durations)
+        self.assertEqual(
+            list(self._unit.to_json_object()['timed_statuses'].items()),
+            [(status.value, duration) for status, duration in self._expected_durations.items()])
+
+    def test_set_timed_status_sets_duration_of_each_status(self):
+        self._set_timed_status(Statuses.Blind | Statuses.Poison, 3)
+        self._assert_timed_statuses_match()
+        self.assertEqual(
+            self._unit.status_duration(Statuses.Blind | Statuses.Poison | Statuses.Sleep),
+            {Statuses.Blind: 3, Statuses.Poison: 3})
+
+    def test_decrease_timed_status_counters_clears_expired_statuses(self):
+        self._set_timed_status(Statuses.Blind, 1)
+        self._set_timed_status(Statuses.Invincible, 2)
+        self._decrease_timed_status_counters()
+        self.assertFalse(self._unit.has_status(Statuses.Blind))
+        self._assert_timed_statuses_match()
+        self._decrease_timed_status_counters()
+        self.assertFalse(self._unit.has_any_status())
+
+    def test_statuses_expiring_on_same_turn_are_cleared_in_application_order(self):
+        self._set_timed_status(Statuses.Poison, 3)
+        self._set_timed_status(Statuses.FireProtection, 1)
+        self._set_timed_status(Statuses.Blind, 1)
+        self._set_timed_status(Statuses.Poison, 1)
+        self.assertEqual(
+            self._unit.decrease_timed_status_counters(),
+            [Statuses.Poison, Statuses.FireProtection, Statuses.Blind])
+
+    def test_decrease_timed_status_counters_without_expired_statuses_returns_empty_sequence(self):
+        self.assertEqual(len(self._unit.decrease_timed_status_counters()), 0)
+        self._set_timed_status(Statuses.Confuse, 5)
+        self.assertEqual(len(self._unit.decrease_timed_status_counters()), 0)
+
+    def test_not_timed_status_is_kept_when_timed_statuses_expire(self):
+        self._unit.set_status(Statuses.Sleep)
+        self._set_timed_status(Statuses.Seal, 1)
+        self._decrease_timed_status_counters()
+        self.assertTrue(self._unit.has_status(Statuses.Sleep))
+        self.assertFalse(self._unit.has_status(Statuses.Seal))
+
+    def test_timed_statuses_survive_json_round_trip(self):
+        self._set_timed_status(Statuses.FireProtection | Statuses.Crack, 4)
+        self._set_timed_status(Statuses.Crack, 2)
+        unit = UnitCreator(self._game_config.monsters_traits['Troll']).create(1, self._game_config.levels)
+        unit.from_json_object(self._unit.to_json_object())
+        self.assertEqual(unit.to_json_object(), self._unit.to_json_object())
+        self.assertEqual(
+            unit.status_duration(Statuses.FireProtection | Statuses.Crack),
+            {Statuses.FireProtection: 4, Statuses.Crack: 2})
+
+    def test_timed_statuses_match_dict_model_for_random_changes(self):
+        rng = random.Random(0)
+        statuses = list(Statuses)
+        changes = [
+            lambda: self._set_timed_status(rng.choice(statuses) | rng.choice(statuses), rng.randint(1, 4)),
+            lambda: self._clear_status(rng.choice(statuses) | rng.choice(statuses)),
+            self._decrease_timed_status_counters,
+            self._decrease_timed_status_counters
+        ]
+        for _ in range(2000):
+            rng.choice(changes)()
+            self._assert_timed_statuses_match()
+
+
+if __name__ == '__main__':
+    unittest.main()
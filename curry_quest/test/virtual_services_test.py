@@ -0,0 +1,117 @@
+import datetime
+import random
+import unittest
+from unittest.mock import Mock
+from curry_quest.controller import Controller
+from curry_quest.states_files_handler import StatesHandler
+from curry_quest.states_storage import SqliteStatesStorage
+from curry_quest.virtual_services import VirtualEventLoop, VirtualServices
+from game_config import load_game_config
+
+
+class VirtualEventLoopTest(unittest.TestCase):
+    def setUp(self):
+        self._sut = VirtualEventLoop()
+
+    def test_time_jumps_to_next_callback(self):
+        fired_at = []
+        self._sut.call_at(3600.0, lambda: fired_at.append(self._sut.time()))
+        self.assertTrue(self._sut.run_next())
+        self.assertEqual(fired_at, [3600.0])
+        self.assertFalse(self._sut.run_next())
+
+    def test_run_until_stops_at_deadline(self):
+        callback = Mock()
+        self._sut.call_later(10.0, callback)
+        self._sut.call_later(30.0, callback)
+        self._sut.run_until(20.0)
+        self.assertEqual(callback.call_count, 1)
+        self.assertEqual(self._sut.time(), 20.0)
+        self.assertEqual(self._sut.next_deadline(), 30.0)
+
+    def test_cancelled_callback_is_not_run(self):
+        callback = Mock()
+        self._sut.call_later(10.0, callback).cancel()
+        self.assertEqual(self._sut.run_until_idle(), 0)
+        callback.assert_not_called()
+
+    def test_run_until_idle_runs_callbacks_scheduled_by_callbacks(self):
+        fired = []
+
+        def callback():
+            fired.append(self._sut.time())
+            if len(fired) < 3:
+                self._sut.call_later(5.0, callback)
+
+        self._sut.call_later(5.0, callback)
+        self.assertEqual(self._sut.run_until_idle(), 3)
+        self.assertEqual(fired, [5.0, 10.0, 15.0])
+
+
+class VirtualServicesTest(unittest.TestCase):
+    def test_now_follows_virtual_time(self):
+        sut = VirtualServices()
+        sut.run_for(90)
+        self.assertEqual(sut.now(), VirtualServices.DEFAULT_START_DT + datetime.timedelta(seconds=90))
+
+    def test_timers_fire_in_virtual_time(self):
+        sut = VirtualServices()
+        fired_at = []
+        sut.timer('Timer', 3600, lambda: fired_at.append(sut.now()))
+        sut.run_until(VirtualServices.DEFAULT_START_DT + datetime.timedelta(days=1))
+        self.assertEqual(fired_at, [VirtualServices.DEFAULT_START_DT + datetime.timedelta(hours=1)])
+        self.assertEqual(sut.scheduler.queue_depth, 0)
+
+    def test_seeded_rngs_are_reproducible(self):
+        first_services = VirtualServices(seed=7)
+        second_services = VirtualServices(seed=7)
+        self.assertEqual(
+            [first_services.rng().random() for _ in range(3)],
+            [second_services.rng().random() for _ in range(3)])
+
+
+class VirtualTimeControllerTest(unittest.TestCase):
+    PLAYERS_COUNT = 4
+    REACTION_INTERVAL = 20
+
+    def _run_controller(self, seed, duration):
+        services = VirtualServices(seed=seed)
+        controller = Controller(
+            load_game_config(),
+            Mock(),
+            StatesHandler(SqliteStatesStorage(':memory:')),
+            services)
+        player_ids = list(range(1, self.PLAYERS_COUNT + 1))
+        for player_id in player_ids:
+            controller.add_player(player_id, f'PLAYER {player_id}')
+        rng = random.Random(seed)
+
+        def react():
+            for player_id in player_ids:
+                state_machine = controller._player_state_machines.get(player_id)
+                if state_machine.is_waiting_for_user_action():
+                    commands = list((state_machine._current_state_transition_table() or {}).keys())
+                    controller.handle_user_action(player_id, f'PLAYER {player_id}', rng.choice(commands), ())
+            services.timer('Reaction', self.REACTION_INTERVAL, react)
+
+        services.timer('Reaction', self.REACTION_INTERVAL, react)
+        controller.start_timers()
+        services.run_for(duration.total_seconds())
+        return services, [controller._player_state_machines.get(player_id) for player_id in player_ids]
+
+    def test_hours_of_activity_run_in_virtual_time(self):
+        services, state_machines = self._run_controller(seed=3, duration=datetime.timedelta(hours=6))
+        self.assertEqual(services.now(), VirtualServices.DEFAULT_START_DT + datetime.timedelta(hours=6))
+        for state_machine in state_machines:
+            self.assertGreater(state_machine.actions_counter, 100)
+
+    def test_virtual_time_runs_are_reproducible(self):
+        _, first_state_machines = self._run_controller(seed=5, duration=datetime.timedelta(hours=1))
+        _, second_state_machines = self._run_controller(seed=5, duration=datetime.timedelta(hours=1))
+        self.assertEqual(
+            [state_machine.to_json_object() for state_machine in first_state_machines],
+            [state_machine.to_json_object() for state_machine in second_state_machines])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,10 +2,13 @@ from curry_quest.config import Config
 from curry_quest.levels_config import Levels
 from curry_quest.state_machine_context import StateMachineContext
 from curry_quest.weight import FloorProgressionProratedWeight, LevelProratedWeight, StaticWeight, \
-    NoWeightPenaltyHandler, StaticWeightPenaltyHandler, MaxWeightPenaltyHandler, WeightPenaltyHandler, WeightHandler
+    NoWeightPenaltyHandler, StaticWeightPenaltyHandler, MaxWeightPenaltyHandler, WeightPenaltyHandler, WeightHandler, \
+    WeightedSampler, WeightPenalties, WeightTable
 from curry_quest.unit import Unit
 from curry_quest.unit_traits import UnitTraits
+import random
 import unittest
+from unittest.mock import patch
 
 
 class WeightTestBase(unittest.TestCase):
@@ -167,5 +170,180 @@ class MaxWeightPenaltyHandlerTest(WeightPenaltyHandlerTestBase):
         self.assertEqual(self._call_sut(), 0)
 
 
+class WeightedSamplerTest(unittest.TestCase):
+    def _assert_same_draws_as_random_choices(self, elements, weights, seed):
+        sampler = WeightedSampler(elements, weights)
+        sampler_rng = random.Random(seed)
+        choices_rng = random.Random(seed)
+        for _ in range(200):
+            self.assertEqual(sampler.select(sampler_rng), choices_rng.choices(elements, weights)[0])
+
+    def test_draws_are_same_as_random_choices(self):
+        rng = random.Random(0)
+        for seed in range(50):
+            elements_count = rng.randint(1, 12)
+            weights = [rng.randint(0, 40) for _ in range(elements_count)]
+            weights[rng.randrange(elements_count)] += 1
+            self._assert_same_draws_as_random_choices(list(range(elements_count)), weights, seed)
+
+    def test_zero_weight_is_same_as_removed_element(self):
+        elements = ['a', 'b', 'c', 'd']
+        sampler = WeightedSampler(elements, [3, 0, 5, 0])
+        removed_elements = ['a', 'c']
+        sampler_rng = random.Random(1)
+        choices_rng = random.Random(1)
+        for _ in range(200):
+            self.assertEqual(sampler.select(sampler_rng), choices_rng.choices(removed_elements, [3, 5])[0])
+
+    def test_sampler_without_positive_weights_is_empty(self):
+        self.assertTrue(WeightedSampler([], []).is_empty())
+        self.assertTrue(WeightedSampler(['a', 'b'], [0, 0]).is_empty())
+        with self.assertRaises(ValueError):
+            WeightedSampler(['a', 'b'], [0, 0]).select(random.Random(0))
+
+
+class WeightPenaltiesTest(unittest.TestCase):
+    def setUp(self):
+        self._sut = WeightPenalties(size=6)
+
+    def test_timers_are_decreased_until_0(self):
+        self._sut.set_timer(1, 2)
+        self._sut.set_timer(4, 1)
+        self._sut.decrease_timers()
+        self.assertEqual([self._sut.timer(index) for index in range(6)], [0, 1, 0, 0, 0, 0])
+        self._sut.decrease_timers()
+        self._sut.decrease_timers()
+        self.assertEqual([self._sut.timer(index) for index in range(6)], [0, 0, 0, 0, 0, 0])
+
+    def test_mask_has_bits_of_timers_greater_than_0(self):
+        self._sut.set_timer(1, 2)
+        self._sut.set_timer(3, 1)
+        self._sut.set_timer(5, 4)
+        self._sut.set_timer(5, 0)
+        self.assertEqual(self._sut.mask(offset=0, size=6), 0b001010)
+        self.assertEqual(self._sut.mask(offset=2, size=2), 0b10)
+        self._sut.decrease_timers()
+        self.assertEqual(self._sut.mask(offset=0, size=6), 0b000010)
+
+    def test_clone_has_own_timers(self):
+        self._sut.set_timer(2, 3)
+        clone = self._sut.clone()
+        clone.set_timer(2, 1)
+        clone.decrease_timers()
+        self.assertEqual(self._sut.timer(2), 3)
+        self.assertEqual(self._sut.mask(offset=0, size=6), 0b000100)
+
+
+class WeightTableTest(WeightTestBase):
+    def setUp(self):
+        super().setUp()
+        self._game_config.eq_settings.floor_collapse_turn = 10
+        self._context.familiar = Unit(UnitTraits(), Levels())
+        self._weight_descriptors = {
+            'static': (StaticWeight(10), None),
+            'penalized': (StaticWeight(20), StaticWeightPenaltyHandler(penalty=15, penalty_duration=2)),
+            'floor': (FloorProgressionProratedWeight(min_weight=2, max_weight=200), None),
+            'level': (LevelProratedWeight(min_weight=10, max_weight=50, level_for_max_weight=15), None)
+        }
+        self._penalties = WeightPenalties(size=6)
+        self._sut = WeightTable(self._weight_descriptors, offset=2)
+
+    def _expected_weights(self, excluded_keys=()):
+        weights = []
+        for key, weight_descriptor in self._weight_descriptors.items():
+            weight_handler = WeightHandler.from_descriptor(weight_descriptor)
+            weight_handler.penalty_timer = self._sut.penalty_timer(self._penalties, key)
+            weights.append(0 if key in excluded_keys else weight_handler.value(self._context))
+        return weights
+
+    def _assert_sampler_matches_weights(self, excluded_keys=()):
+        sampler = self._sut.sampler(self._context, self._penalties, excluded_keys)
+        expected_sampler = WeightedSampler(self._sut.keys, self._expected_weights(excluded_keys))
+        self.assertEqual(sampler._cumulative_weights, expected_sampler._cumulative_weights)
+
+    def test_penalty_timers_are_stored_at_table_offset(self):
+        self._sut.set_penalty(self._penalties, 'penalized')
+        self.assertEqual(self._penalties.timer(3), 2)
+        self.assertEqual(self._sut.penalty_timer(self._penalties, 'penalized'), 2)
+        self.assertEqual(self._sut.penalty_timers(self._penalties), {'penalized': 2})
+        self.assertEqual(self._sut.end, 6)
+
+    def test_weights_skip_non_positive_values(self):
+        self._sut.set_penalty(self._penalties, 'penalized')
+        self._weight_descriptors['static'] = (StaticWeight(0), None)
+        sut = WeightTable(self._weight_descriptors, offset=2)
+        self.assertEqual(sut.weights(self._context, self._penalties), {'penalized': 5, 'floor': 2, 'level': 10})
+
+    def test_sampler_is_reused_while_inputs_do_not_change(self):
+        sampler = self._sut.sampler(self._context, self._penalties)
+        with patch.object(StaticWeight, 'value') as value_mock:
+            self.assertIs(self._sut.sampler(self._context, self._penalties), sampler)
+            value_mock.assert_not_called()
+
+    def test_sampler_is_shared_between_penalties_with_same_state(self):
+        other_penalties = WeightPenalties(size=6)
+        self.assertIs(
+            self._sut.sampler(self._context, self._penalties),
+            self._sut.sampler(self._context, other_penalties))
+
+    def test_sampler_follows_penalty_changes(self):
+        self._assert_sampler_matches_weights()
+        self._sut.set_penalty(self._penalties, 'penalized')
+        self._assert_sampler_matches_weights()
+        self._penalties.decrease_timers()
+        self._assert_sampler_matches_weights()
+        self._penalties.decrease_timers()
+        self._assert_sampler_matches_weights()
+        self.assertEqual(self._sut.penalty_timer(self._penalties, 'penalized'), 0)
+
+    def test_sampler_follows_floor_turns_counter(self):
+        for _ in range(12):
+            self._assert_sampler_matches_weights()
+            self._context.increase_turns_counter()
+
+    def test_sampler_follows_familiar_level(self):
+        for level in range(1, 17):
+            self._context.familiar.level = level
+            self._assert_sampler_matches_weights()
+
+    def test_excluded_keys_have_zero_weight(self):
+        self._assert_sampler_matches_weights(excluded_keys=['static', 'unknown'])
+        self._assert_sampler_matches_weights(excluded_keys=['penalized', 'level'])
+        self._assert_sampler_matches_weights()
+
+    def test_sampler_selects_elements(self):
+        sut = WeightTable(
+            {'level': self._weight_descriptors['level'], 'static': self._weight_descriptors['static']},
+            elements=['LEVEL', 'STATIC'])
+        self._context.familiar.level = 15
+        sampler = sut.sampler(self._context, self._penalties)
+        self.assertEqual(sampler._elements, ['LEVEL', 'STATIC'])
+        self.assertEqual(sampler._cumulative_weights, [50, 60])
+
+    def test_cached_samplers_are_limited(self):
+        self._sut.MAX_CACHED_SAMPLERS = 4
+        for level in range(1, 10):
+            self._context.familiar.level = level
+            self._sut.sampler(self._context, self._penalties)
+        self.assertLessEqual(len(self._sut._samplers), 4)
+
+
+class ConfigWeightTablesTest(unittest.TestCase):
+    def test_contexts_share_weight_tables_and_have_own_penalties(self):
+        game_config = Config()
+        game_config.events_weights['battle'] = (StaticWeight(3), MaxWeightPenaltyHandler(penalty_duration=2))
+        game_config.found_items_weights['Oleem'] = (StaticWeight(1), None)
+        game_config.found_items_weights['Pita'] = (StaticWeight(1), None)
+        first_context = StateMachineContext(game_config)
+        second_context = StateMachineContext(game_config)
+        weight_tables = game_config.weight_tables
+        self.assertEqual(weight_tables.events.keys, ['battle_event'])
+        self.assertEqual(weight_tables.found_items.keys, ['Pita', 'Oleem'])
+        self.assertEqual(weight_tables.size, 3)
+        first_context.set_event_weight_penalty('battle_event')
+        self.assertEqual(first_context.events_weights, {})
+        self.assertEqual(second_context.events_weights, {'battle_event': 3})
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+from unittest.mock import Mock
+from curry_quest.write_behind_states_handler import WriteBehindStatesHandler
+
+
+class WriteBehindStatesHandlerTest(unittest.TestCase):
+    def setUp(self):
+        self._states_handler = Mock()
+        self._services = Mock()
+        self._timer_mock = Mock()
+        self._timer_mock.done = Mock(return_value=False)
+        self._services.timer = Mock(return_value=self._timer_mock)
+        self._sut = WriteBehindStatesHandler(self._states_handler, self._services, flush_delay=10, batch_size=3)
+
+    def _state_machine_mock(self, player_id):
+        state_machine_mock = Mock()
+        state_machine_mock.player_id = player_id
+        return state_machine_mock
+
+    def _flush_timer_expiry_handler(self):
+        self._services.timer.assert_called_once()
+        _, _, timer_expiry_handler = self._services.timer.call_args.args
+        return timer_expiry_handler
+
+    def test_save_does_not_write_state_immediately(self):
+        self._sut.save(self._state_machine_mock(4))
+        self._states_handler.save.assert_not_called()
+        self._states_handler.save_many.assert_not_called()
+        self.assertTrue(self._sut.is_dirty(4))
+
+    def test_first_save_starts_flush_timer_with_configured_delay(self):
+        self._sut.save(self._state_machine_mock(4))
+        self._sut.save(self._state_machine_mock(7))
+        self._services.timer.assert_called_once()
+        _, interval, _ = self._services.timer.call_args.args
+        self.assertEqual(interval, 10)
+
+    def test_when_flush_timer_expires_then_dirty_states_are_saved(self):
+        state_machine_mock = self._state_machine_mock(4)
+        self._sut.save(state_machine_mock)
+        self._flush_timer_expiry_handler()()
+        self._states_handler.save_many.assert_called_once_with([state_machine_mock])
+        self._states_handler.flush.assert_not_called()
+        self.assertFalse(self._sut.is_dirty(4))
+
+    def test_multiple_saves_of_same_player_are_coalesced(self):
+        state_machine_mock = self._state_machine_mock(4)
+        for _ in range(5):
+            self._sut.save(state_machine_mock)
+        self._flush_timer_expiry_handler()()
+        self._states_handler.save_many.assert_called_once_with([state_machine_mock])
+
+    def test_when_batch_size_is_reached_then_dirty_states_are_saved_immediately(self):
+        state_machine_mocks = [self._state_machine_mock(player_id) for player_id in (4, 7, 8)]
+        for state_machine_mock in state_machine_mocks:
+            self._sut.save(state_machine_mock)
+        self._states_handler.save_many.assert_called_once_with(state_machine_mocks)
+        self._states_handler.flush.assert_not_called()
+        self._timer_mock.cancel.assert_called_once()
+        self.assertEqual(self._sut.dirty_count, 0)
+
+    def test_flush_saves_dirty_states_and_cancels_timer(self):
+        state_machine_mock = self._state_machine_mock(4)
+        self._sut.save(state_machine_mock)
+        self._sut.flush()
+        self._states_handler.save_many.assert_called_once_with([state_machine_mock])
+        self._states_handler.flush.assert_called_once()
+        self._timer_mock.cancel.assert_called_once()
+
+    def test_flush_without_dirty_states_does_not_save(self):
+        self._sut.flush()
+        self._states_handler.save_many.assert_not_called()
+
+    def test_flush_without_dirty_states_waits_for_pending_writes(self):
+        self._sut.flush()
+        self._states_handler.flush.assert_called_once()
+
+    def test_delete_drops_pending_save(self):
+        self._sut.save(self._state_machine_mock(4))
+        self._sut.delete(4)
+        self._states_handler.delete.assert_called_once_with(4)
+        self._sut.flush()
+        self._states_handler.save_many.assert_not_called()
+
+    def test_flush_player_saves_only_given_dirty_state(self):
+        state_machine_mock_4 = self._state_machine_mock(4)
+        self._sut.save(state_machine_mock_4)
+        self._sut.save(self._state_machine_mock(7))
+        self._sut.flush_player(4)
+        self._states_handler.save.assert_called_once_with(state_machine_mock_4)
+        self._states_handler.flush_player.assert_called_once_with(4)
+        self.assertFalse(self._sut.is_dirty(4))
+        self.assertTrue(self._sut.is_dirty(7))
+
+    def test_flush_player_of_non_dirty_state_does_nothing(self):
+        self._sut.flush_player(4)
+        self._states_handler.save.assert_not_called()
+
+    def test_load_player_returns_dirty_state_machine(self):
+        state_machine_mock = self._state_machine_mock(4)
+        self._sut.save(state_machine_mock)
+        self.assertIs(self._sut.load_player(4, Mock()), state_machine_mock)
+        self._states_handler.load_player.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
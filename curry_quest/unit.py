@@ -20,6 +20,8 @@ class Unit(Jsonable):
     MIN_ATTACK = 1
     MIN_DEFENSE = 1
     MIN_LUCK = 0
+    NO_CLEARED_STATUSES = ()
+    TIMED_STATUSES = tuple(Statuses(1 << status_index) for status_index in range(len(Statuses)))
 
     def __init__(self, traits: UnitTraits, levels: Levels):
         self._traits = traits
@@ -27,16 +29,18 @@ class Unit(Jsonable):
         self.name = traits.name
         self._genus = traits.native_genus
         self.level = self.MIN_LEVEL
-        self._talents = traits.talents
+        self._set_talents(traits.talents)
+        self._timed_statuses_mask = 0
+        self._timed_statuses_durations = [0] * len(self.TIMED_STATUSES)
+        self._timed_statuses_order: list[int] = []
+        self.clear_statuses()
         self.max_hp = traits.base_hp
-        self.hp = self.max_hp
         self.max_mp = traits.base_mp
-        self.mp = self.max_mp
         self.attack = traits.base_attack
         self.defense = traits.base_defense
         self.luck = traits.base_luck
-        self._timed_statuses: dict[Statuses, int] = {}
-        self.clear_statuses()
+        self.hp = self.max_hp
+        self.mp = self.max_mp
         self.clear_spell()
         self.ability = None
         self.exp = 0
@@ -56,7 +60,7 @@ class Unit(Jsonable):
             'defense': self._defense,
             'luck': self._luck,
             'statuses': self._statuses.value,
-            'timed_statuses': dict((status.value, duration) for status, duration in self._timed_statuses.items()),
+            'timed_statuses': self._timed_statuses_to_json_object(),
             'exp': self._exp
         }
         if self.has_spell():
@@ -68,6 +72,12 @@ class Unit(Jsonable):
             unit_json_object['ability'] = self._ability.name
         return unit_json_object
 
+    def _timed_statuses_to_json_object(self):
+        return dict(
+            (self.TIMED_STATUSES[status_index].value, self._timed_statuses_durations[status_index])
+            for status_index
+            in self._timed_statuses_order)
+
     def from_json_object(self, json_object):
         from curry_quest.abilities import Abilities
         from curry_quest.spells import Spells
@@ -75,7 +85,7 @@ class Unit(Jsonable):
         json_reader_helper = JsonReaderHelper(json_object)
         self.genus = json_reader_helper.read_enum('genus', Genus)
         self.level = json_reader_helper.read_int_in_range('level', min_value=1, max_value=self._levels.max_level)
-        self._talents = json_reader_helper.read_enum('talents', Talents)
+        self._set_talents(json_reader_helper.read_enum('talents', Talents))
         self.max_hp = json_reader_helper.read_int_with_min('max_hp', min_value=self.MIN_ALIVE_HP)
         self.hp = json_reader_helper.read_int_with_min('hp', min_value=self.MIN_DEAD_HP)
         self.max_mp = json_reader_helper.read_int_with_min('max_mp', min_value=self.MIN_MP)
@@ -115,6 +125,13 @@ class Unit(Jsonable):
             ability_name = json_reader_helper.read_string('ability')
             self.ability = Abilities.find_ability(ability_name)
 
+    def clone(self) -> '__class__':
+        unit = self.__class__.__new__(self.__class__)
+        unit.__dict__.update(self.__dict__)
+        unit._timed_statuses_durations = list(self._timed_statuses_durations)
+        unit._timed_statuses_order = list(self._timed_statuses_order)
+        return unit
+
     def _raise_invalid_json(self, json_object, error_msg):
         raise InvalidJson(f'{error_msg} JSON object: {self._json_object}".')
 
@@ -144,6 +161,7 @@ class Unit(Jsonable):
         from curry_quest.spells import Spells
 
         self._genus = value
+        self._invalidate_derived_stats()
         if self.has_spell():
             self._spell_traits = Spells.find_spell_traits(self._spell_traits.base_name, self.genus)
 
@@ -154,6 +172,7 @@ class Unit(Jsonable):
     @level.setter
     def level(self, value):
         self._level = value
+        self._invalidate_derived_stats()
 
     def is_min_level(self) -> bool:
         return self.level <= 1
@@ -165,14 +184,40 @@ class Unit(Jsonable):
     def talents(self) -> Talents:
         return self._talents
 
+    def _set_talents(self, talents: Talents):
+        self._talents = talents
+        self._invalidate_derived_stats()
+
+    class DerivedStats:
+        STAT_BOOST_FACTOR = 0.5
+
+        def __init__(self, unit):
+            talents = unit.talents
+            stat_factor = 1.0
+            if unit.has_boosted_stats():
+                stat_factor += self.STAT_BOOST_FACTOR
+            self.max_hp = unit._max_hp * (2 if talents.has(Talents.HpIncreased) else 1)
+            self.max_mp = unit._max_mp * (2 if talents.has(Talents.MpIncreased) else 1)
+            self.attack = int(unit._attack * stat_factor * (1.2 if talents.has(Talents.StrengthIncreased) else 1))
+            self.defense = int(unit._defense * stat_factor * (1.2 if talents.has(Talents.Hard) else 1))
+            self.luck = int(unit._luck * stat_factor)
+
+    def _derived_stats(self) -> DerivedStats:
+        if self._cached_derived_stats is None:
+            self._cached_derived_stats = self.DerivedStats(self)
+        return self._cached_derived_stats
+
+    def _invalidate_derived_stats(self):
+        self._cached_derived_stats = None
+
     @property
     def max_hp(self):
-        multiplier = 2 if self.talents.has(Talents.HpIncreased) else 1
-        return self._max_hp * multiplier
+        return self._derived_stats().max_hp
 
     @max_hp.setter
     def max_hp(self, value):
         self._max_hp = max(value, self.MIN_ALIVE_HP)
+        self._invalidate_derived_stats()
 
     @property
     def hp(self):
@@ -197,12 +242,12 @@ class Unit(Jsonable):
 
     @property
     def max_mp(self):
-        multiplier = 2 if self.talents.has(Talents.MpIncreased) else 1
-        return self._max_mp * multiplier
+        return self._derived_stats().max_mp
 
     @max_mp.setter
     def max_mp(self, value):
         self._max_mp = max(value, self.MIN_MP)
+        self._invalidate_derived_stats()
 
     @property
     def mp(self):
@@ -219,46 +264,40 @@ class Unit(Jsonable):
         self.mp = self.max_mp
 
     def use_mp(self, mp_cost):
-        self.mp -= self._action_mp_cost(mp_cost)
+        self.mp -= self.action_mp_cost(mp_cost)
 
     def has_enough_mp_for_action(self, mp_cost) -> bool:
-        return self.mp >= self._action_mp_cost(mp_cost)
+        return self.mp >= self.action_mp_cost(mp_cost)
 
-    def _action_mp_cost(self, mp_cost):
+    def action_mp_cost(self, mp_cost) -> int:
         return max(1, mp_cost // 2) if self.talents.has(Talents.MpConsumptionDecreased) else mp_cost
 
     @property
     def attack(self):
-        multiplier = 1.2 if self.talents.has(Talents.StrengthIncreased) else 1
-        return int(self._attack * self._stat_factor() * multiplier)
+        return self._derived_stats().attack
 
     @attack.setter
     def attack(self, value):
         self._attack = max(value, self.MIN_ATTACK)
+        self._invalidate_derived_stats()
 
     @property
     def defense(self):
-        multiplier = 1.2 if self.talents.has(Talents.Hard) else 1
-        return int(self._defense * self._stat_factor() * multiplier)
+        return self._derived_stats().defense
 
     @defense.setter
     def defense(self, value):
         self._defense = max(value, self.MIN_DEFENSE)
+        self._invalidate_derived_stats()
 
     @property
     def luck(self):
-        return int(self._luck * self._stat_factor())
+        return self._derived_stats().luck
 
     @luck.setter
     def luck(self, value):
         self._luck = max(value, self.MIN_LUCK)
-
-    def _stat_factor(self) -> float:
-        STAT_BOOST_FACTOR = 0.5
-        stat_factor = 1.0
-        if self.has_boosted_stats():
-            stat_factor += STAT_BOOST_FACTOR
-        return stat_factor
+        self._invalidate_derived_stats()
 
     @property
     def physical_attack_mp_cost(self):
@@ -275,44 +314,73 @@ class Unit(Jsonable):
 
     def status_duration(self, statuses: Statuses) -> dict[Statuses, int]:
         return dict(
-            (status, self._timed_statuses[status])
-            for status
-            in list(Statuses)
-            if (statuses & status) and (status in self._timed_statuses))
+            (status, self._timed_statuses_durations[status_index])
+            for status_index, status
+            in self._timed_statuses_in_mask(statuses.value & self._timed_statuses_mask))
+
+    def _timed_statuses_in_mask(self, mask: int):
+        while mask:
+            status_bit = mask & -mask
+            status_index = status_bit.bit_length() - 1
+            yield status_index, self.TIMED_STATUSES[status_index]
+            mask ^= status_bit
 
     def has_boosted_stats(self) -> bool:
         return self.has_status(Statuses.StatsBoost)
 
     def set_status(self, status: Statuses):
         self._statuses |= status
+        self._invalidate_derived_stats()
 
     def set_timed_status(self, statuses: Statuses, duration: int):
         self.set_status(statuses)
-        for status in list(Statuses):
-            if statuses & status:
-                self._timed_statuses[status] = duration
+        mask = statuses.value
+        durations = self._timed_statuses_durations
+        while mask:
+            status_bit = mask & -mask
+            status_index = status_bit.bit_length() - 1
+            if not self._timed_statuses_mask & status_bit:
+                self._timed_statuses_order.append(status_index)
+            durations[status_index] = duration
+            mask ^= status_bit
+        self._timed_statuses_mask |= statuses.value
 
     def decrease_timed_status_counters(self):
-        cleared_statuses_list = []
-        cleared_statuses_mask = Statuses(0)
-        for status, duration in self._timed_statuses.items():
-            if duration > 1:
-                self._timed_statuses[status] -= 1
+        durations = self._timed_statuses_durations
+        cleared_statuses_mask = 0
+        for status_index in self._timed_statuses_order:
+            if durations[status_index] > 1:
+                durations[status_index] -= 1
             else:
-                cleared_statuses_list.append(status)
-                cleared_statuses_mask |= status
-        self.clear_status(cleared_statuses_mask)
-        return cleared_statuses_list
+                cleared_statuses_mask |= 1 << status_index
+        if not cleared_statuses_mask:
+            return self.NO_CLEARED_STATUSES
+        cleared_statuses = [
+            self.TIMED_STATUSES[status_index]
+            for status_index
+            in self._timed_statuses_order
+            if cleared_statuses_mask >> status_index & 1
+        ]
+        self.clear_status(Statuses(cleared_statuses_mask))
+        return cleared_statuses
 
     def clear_statuses(self):
         self._statuses = Statuses(0)
-        self._timed_statuses.clear()
+        self._timed_statuses_mask = 0
+        self._timed_statuses_order = []
+        self._invalidate_derived_stats()
 
     def clear_status(self, statuses: Statuses):
         self._statuses &= ~statuses
-        for status in list(Statuses):
-            if (statuses & status) and status in self._timed_statuses:
-                del self._timed_statuses[status]
+        if self._timed_statuses_mask & statuses.value:
+            self._timed_statuses_mask &= ~statuses.value
+            self._timed_statuses_order = [
+                status_index
+                for status_index
+                in self._timed_statuses_order
+                if not statuses.value >> status_index & 1
+            ]
+        self._invalidate_derived_stats()
 
     @property
     def spell_traits(self):
@@ -390,7 +458,7 @@ class Unit(Jsonable):
         return self._levels.experience_for_next_level(self.level)
 
     def fuse(self, other: '__class__'):
-        self._talents = self.traits.talents | other.traits.talents
+        self._set_talents(self.traits.talents | other.traits.talents)
         if self.genus.is_weak_against(other.genus):
             self.genus = other.genus
         self.hp = min(self.hp, self.max_hp)
@@ -424,6 +492,7 @@ class Unit(Jsonable):
         if not self.does_evolve():
             raise InvalidOperation(f'{self.name} does not evolve.')
         self._traits = evolved_unit_traits
+        self._invalidate_derived_stats()
         self.name = evolved_unit_traits.name
 
     class StatsChange:
@@ -535,6 +604,6 @@ class Unit(Jsonable):
 
     def _status_to_string(self, status: Statuses):
         status_string = status.name
-        if status in self._timed_statuses:
-            status_string += f'({self._timed_statuses[status]})'
+        if self._timed_statuses_mask & status.value:
+            status_string += f'({self._timed_statuses_durations[status.value.bit_length() - 1]})'
         return status_string
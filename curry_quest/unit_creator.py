@@ -12,6 +12,7 @@ class UnitCreator:
 
     def create(self, level, levels: Levels) -> Unit:
         stats_calculator = StatsCalculator(self._unit_traits)
+        stats_calculator.tabulate(levels.max_level)
         unit = Unit(self._unit_traits, levels)
         unit.level = level
         unit.max_hp = stats_calculator.hp(level)
@@ -0,0 +1,31 @@
+from curry_quest.levels_config import Levels
+from curry_quest.talents import Talents
+from curry_quest.unit import Unit
+from curry_quest.unit_creator import UnitCreator
+from curry_quest.unit_traits import UnitTraits
+
+
+class UnitPrototypes:
+    def __init__(self, levels: Levels):
+        self._levels = levels
+        self._prototypes: dict[tuple[str, int, Talents], tuple[UnitTraits, Unit]] = {}
+
+    def __len__(self) -> int:
+        return len(self._prototypes)
+
+    def clear(self):
+        self._prototypes.clear()
+
+    def create(self, unit_traits: UnitTraits, level: int, forbidden_talents: Talents=Talents.Empty) -> Unit:
+        key = (unit_traits.name, level, forbidden_talents)
+        source_traits, prototype = self._prototypes.get(key, (None, None))
+        if source_traits is not unit_traits:
+            prototype = self._create_prototype(unit_traits, level, forbidden_talents)
+            self._prototypes[key] = (unit_traits, prototype)
+        return prototype.clone()
+
+    def _create_prototype(self, unit_traits: UnitTraits, level: int, forbidden_talents: Talents) -> Unit:
+        if unit_traits.talents & forbidden_talents:
+            unit_traits = unit_traits.copy()
+            unit_traits.talents &= ~forbidden_talents
+        return UnitCreator(unit_traits).create(level, levels=self._levels)
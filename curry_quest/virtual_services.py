@@ -0,0 +1,110 @@
+import datetime
+import heapq
+import itertools
+import random
+from typing import Callable
+from curry_quest.scheduler import Scheduler
+from curry_quest.services import Services
+
+
+class VirtualEventLoop:
+    class TimerHandle:
+        def __init__(self, when: float, callback: Callable[[], None]):
+            self.when = when
+            self.callback = callback
+            self._is_cancelled = False
+
+        def cancel(self):
+            self._is_cancelled = True
+
+        def cancelled(self) -> bool:
+            return self._is_cancelled
+
+    def __init__(self, start_time: float=0.0):
+        self._time = start_time
+        self._handles: list[tuple[float, int, VirtualEventLoop.TimerHandle]] = []
+        self._sequence_numbers = itertools.count()
+        self._processed_count = 0
+
+    def time(self) -> float:
+        return self._time
+
+    def is_closed(self) -> bool:
+        return False
+
+    def call_at(self, when: float, callback: Callable[[], None]) -> TimerHandle:
+        handle = self.TimerHandle(when, callback)
+        heapq.heappush(self._handles, (when, next(self._sequence_numbers), handle))
+        return handle
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> TimerHandle:
+        return self.call_at(self._time + delay, callback)
+
+    @property
+    def processed_count(self) -> int:
+        return self._processed_count
+
+    def next_deadline(self) -> float:
+        self._discard_cancelled_handles()
+        if len(self._handles) == 0:
+            return None
+        return self._handles[0][0]
+
+    def _discard_cancelled_handles(self):
+        while len(self._handles) > 0 and self._handles[0][2].cancelled():
+            heapq.heappop(self._handles)
+
+    def run_next(self) -> bool:
+        if self.next_deadline() is None:
+            return False
+        when, _, handle = heapq.heappop(self._handles)
+        self._time = max(self._time, when)
+        self._processed_count += 1
+        handle.callback()
+        return True
+
+    def run_until(self, deadline: float):
+        while True:
+            next_deadline = self.next_deadline()
+            if next_deadline is None or next_deadline > deadline:
+                break
+            self.run_next()
+        self._time = max(self._time, deadline)
+
+    def run_for(self, seconds: float):
+        self.run_until(self._time + seconds)
+
+    def run_until_idle(self, max_events: int=None) -> int:
+        processed_count = 0
+        while (max_events is None or processed_count < max_events) and self.run_next():
+            processed_count += 1
+        return processed_count
+
+
+class VirtualServices(Services):
+    DEFAULT_START_DT = datetime.datetime(2000, 1, 1)
+
+    def __init__(self, seed: int=None, start_dt: datetime.datetime=DEFAULT_START_DT):
+        self._loop = VirtualEventLoop()
+        super().__init__(Scheduler(self._loop))
+        self._seeds_rng = random.Random(seed)
+        self._start_dt = start_dt
+
+    @property
+    def loop(self) -> VirtualEventLoop:
+        return self._loop
+
+    def rng(self):
+        return random.Random(self._seeds_rng.getrandbits(64))
+
+    def now(self):
+        return self._start_dt + datetime.timedelta(seconds=self._loop.time())
+
+    def run_for(self, seconds: float):
+        self._loop.run_for(seconds)
+
+    def run_until(self, dt: datetime.datetime):
+        self._loop.run_until((dt - self._start_dt).total_seconds())
+
+    def run_until_idle(self, max_events: int=None) -> int:
+        return self._loop.run_until_idle(max_events)
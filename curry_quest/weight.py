@@ -1,4 +1,10 @@
 from abc import abstractmethod, ABC
+from array import array
+from bisect import bisect
+from itertools import accumulate
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class WeightPenaltyHandler(ABC):
@@ -14,6 +20,12 @@ class Weight(ABC):
     @abstractmethod
     def value(self, context): pass
 
+    def depends_on_floor_turns_counter(self) -> bool:
+        return False
+
+    def depends_on_familiar_level(self) -> bool:
+        return False
+
 
 class WeightHandler:
     def __init__(self, weight: Weight):
@@ -63,6 +75,153 @@ class WeightHandler:
         return f"Weight({self._weight}), Penalty: {self._penalty_handler}"
 
 
+class WeightedSampler:
+    def __init__(self, elements: list, weights: list):
+        self._elements = elements
+        self._cumulative_weights = list(accumulate(weights))
+        self._total_weight = self._cumulative_weights[-1] + 0.0 if len(self._cumulative_weights) > 0 else 0.0
+        self._last_index = len(elements) - 1
+
+    @property
+    def total_weight(self) -> float:
+        return self._total_weight
+
+    def is_empty(self) -> bool:
+        return self._total_weight <= 0.0
+
+    def select(self, rng):
+        if self.is_empty():
+            raise ValueError('Total of weights must be greater than zero')
+        return self._elements[bisect(self._cumulative_weights, rng.random() * self._total_weight, 0, self._last_index)]
+
+
+class WeightPenalties:
+    def __init__(self, size: int):
+        self._timers = array('I', [0]) * size
+        self._mask = 0
+
+    def clone(self) -> '__class__':
+        weight_penalties = self.__class__(0)
+        weight_penalties._timers = array('I', self._timers)
+        weight_penalties._mask = self._mask
+        return weight_penalties
+
+    def timer(self, index: int) -> int:
+        return self._timers[index]
+
+    def set_timer(self, index: int, value: int):
+        self._timers[index] = value
+        if value > 0:
+            self._mask |= 1 << index
+        else:
+            self._mask &= ~(1 << index)
+
+    def mask(self, offset: int, size: int) -> int:
+        return (self._mask >> offset) & ((1 << size) - 1)
+
+    def decrease_timers(self):
+        timers = self._timers
+        mask = self._mask
+        while mask:
+            penalty_bit = mask & -mask
+            index = penalty_bit.bit_length() - 1
+            timers[index] -= 1
+            if timers[index] == 0:
+                self._mask ^= penalty_bit
+            mask ^= penalty_bit
+
+
+class WeightTable:
+    MAX_CACHED_SAMPLERS = 4096
+
+    def __init__(self, weight_descriptors: dict, offset: int=0, elements: list=None):
+        self._keys = list(weight_descriptors.keys())
+        self._elements = self._keys if elements is None else elements
+        self._offset = offset
+        self._indices = dict((key, index) for index, key in enumerate(self._keys))
+        self._weights: list[Weight] = []
+        self._penalty_handlers: list[WeightPenaltyHandler] = []
+        for weight, penalty_handler in weight_descriptors.values():
+            self._weights.append(weight)
+            self._penalty_handlers.append(NoWeightPenaltyHandler() if penalty_handler is None else penalty_handler)
+        self._depends_on_floor_turns_counter = any(weight.depends_on_floor_turns_counter() for weight in self._weights)
+        self._depends_on_familiar_level = any(weight.depends_on_familiar_level() for weight in self._weights)
+        self._samplers: dict[tuple, WeightedSampler] = {}
+
+    @property
+    def keys(self) -> list:
+        return self._keys
+
+    @property
+    def offset(self) -> int:
+        return self._offset
+
+    @property
+    def end(self) -> int:
+        return self._offset + len(self._keys)
+
+    def penalty_timer(self, weight_penalties: WeightPenalties, key) -> int:
+        return weight_penalties.timer(self._offset + self._indices[key])
+
+    def set_penalty_timer(self, weight_penalties: WeightPenalties, key, value: int):
+        weight_penalties.set_timer(self._offset + self._indices[key], value)
+
+    def set_penalty(self, weight_penalties: WeightPenalties, key):
+        self.set_penalty_timer(weight_penalties, key, self._penalty_handlers[self._indices[key]].penalty_duration)
+
+    def penalty_timers(self, weight_penalties: WeightPenalties) -> dict:
+        return dict(
+            (key, self.penalty_timer(weight_penalties, key))
+            for key
+            in self._keys
+            if self.penalty_timer(weight_penalties, key) > 0)
+
+    def weights(self, context, weight_penalties: WeightPenalties) -> dict:
+        penalties_mask = self._penalties_mask(weight_penalties)
+        weights = {}
+        for index, key in enumerate(self._keys):
+            weight_value = self._weight_value(context, index, penalties_mask)
+            if weight_value > 0:
+                weights[key] = weight_value
+        return weights
+
+    def sampler(self, context, weight_penalties: WeightPenalties, excluded_keys=()) -> WeightedSampler:
+        excluded_keys_mask = 0
+        for key in excluded_keys:
+            if key in self._indices:
+                excluded_keys_mask |= 1 << self._indices[key]
+        sampler_key = (
+            self._penalties_mask(weight_penalties),
+            excluded_keys_mask,
+            context.floor_turns_counter if self._depends_on_floor_turns_counter else None,
+            context.familiar.level if self._depends_on_familiar_level else None)
+        sampler = self._samplers.get(sampler_key)
+        if sampler is None:
+            if len(self._samplers) >= self.MAX_CACHED_SAMPLERS:
+                self._samplers.clear()
+            sampler = self._create_sampler(context, sampler_key[0], excluded_keys_mask)
+            self._samplers[sampler_key] = sampler
+        return sampler
+
+    def _penalties_mask(self, weight_penalties: WeightPenalties) -> int:
+        return weight_penalties.mask(self._offset, len(self._keys))
+
+    def _create_sampler(self, context, penalties_mask: int, excluded_keys_mask: int) -> WeightedSampler:
+        weights = [
+            0 if excluded_keys_mask & (1 << index) else self._weight_value(context, index, penalties_mask)
+            for index
+            in range(len(self._keys))
+        ]
+        logger.info(f"Weights table updated '{dict(zip(self._keys, weights))}'.")
+        return WeightedSampler(self._elements, weights)
+
+    def _weight_value(self, context, index: int, penalties_mask: int) -> int:
+        value = self._weights[index].value(context)
+        if penalties_mask & (1 << index):
+            value = self._penalty_handlers[index].apply_penalty(value)
+        return max(value, 0)
+
+
 class NoWeightPenaltyHandler(WeightPenaltyHandler):
     def apply_penalty(self, value) -> int:
         return value
@@ -150,6 +309,9 @@ class ProratedWeight(Weight):
 
 
 class FloorProgressionProratedWeight(ProratedWeight):
+    def depends_on_floor_turns_counter(self) -> bool:
+        return True
+
     def _calculate_fraction(self, context):
         turns_counter = context.floor_turns_counter
         collapse_turn = context.game_config.eq_settings.floor_collapse_turn
@@ -167,6 +329,9 @@ class LevelProratedWeight(ProratedWeight):
         super().__init__(min_weight, max_weight)
         self._level_for_max_weight = level_for_max_weight
 
+    def depends_on_familiar_level(self) -> bool:
+        return True
+
     def _calculate_fraction(self, context):
         level = context.familiar.level
         if level <= 1:
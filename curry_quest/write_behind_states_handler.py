@@ -0,0 +1,95 @@
+from curry_quest.scheduler import ScheduledTimer
+from curry_quest.services import Services
+from curry_quest.state_machine import StateMachine
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindStatesHandler:
+    DEFAULT_FLUSH_DELAY = 5
+    DEFAULT_BATCH_SIZE = 50
+
+    def __init__(
+            self,
+            states_handler,
+            services: Services=None,
+            flush_delay=DEFAULT_FLUSH_DELAY,
+            batch_size=DEFAULT_BATCH_SIZE):
+        self._states_handler = states_handler
+        self._services = services or Services()
+        self._flush_delay = flush_delay
+        self._batch_size = batch_size
+        self._dirty_state_machines: dict[int, StateMachine] = {}
+        self._flush_timer: ScheduledTimer = None
+
+    def load(self, game_config):
+        return self._states_handler.load(game_config)
+
+    def load_index(self, game_config):
+        return self._states_handler.load_index(game_config)
+
+    def load_player(self, player_id: int, game_config) -> StateMachine:
+        dirty_state_machine = self._dirty_state_machines.get(player_id)
+        if dirty_state_machine is not None:
+            return dirty_state_machine
+        return self._states_handler.load_player(player_id, game_config)
+
+    def is_dirty(self, player_id: int) -> bool:
+        return player_id in self._dirty_state_machines
+
+    @property
+    def dirty_count(self) -> int:
+        return len(self._dirty_state_machines)
+
+    def save(self, state_machine: StateMachine):
+        self._dirty_state_machines[state_machine.player_id] = state_machine
+        if self.dirty_count >= self._batch_size:
+            self._write_dirty_states()
+        elif self._flush_timer is None:
+            self._flush_timer = self._services.timer('State flush', self._flush_delay, self._handle_flush_timer_expiry)
+
+    def save_many(self, state_machines: list[StateMachine]):
+        for state_machine in state_machines:
+            self.save(state_machine)
+
+    def delete(self, player_id: int):
+        self._dirty_state_machines.pop(player_id, None)
+        self._states_handler.delete(player_id)
+
+    def flush(self):
+        futures = self._write_dirty_states()
+        self._states_handler.flush()
+        return futures
+
+    def _write_dirty_states(self):
+        self._cancel_flush_timer()
+        if self.dirty_count == 0:
+            return []
+        dirty_state_machines = list(self._dirty_state_machines.values())
+        self._dirty_state_machines.clear()
+        logger.debug(f"Flushing {len(dirty_state_machines)} dirty state(s).")
+        return self._states_handler.save_many(dirty_state_machines)
+
+    def flush_player(self, player_id: int):
+        dirty_state_machine = self._dirty_state_machines.pop(player_id, None)
+        if dirty_state_machine is None:
+            return []
+        if self.dirty_count == 0:
+            self._cancel_flush_timer()
+        futures = self._states_handler.save(dirty_state_machine)
+        self._states_handler.flush_player(player_id)
+        return futures
+
+    def close(self):
+        self.flush()
+        self._states_handler.close()
+
+    def _handle_flush_timer_expiry(self):
+        self._flush_timer = None
+        self._write_dirty_states()
+
+    def _cancel_flush_timer(self):
+        if self._flush_timer is not None and not self._flush_timer.done():
+            self._flush_timer.cancel()
+        self._flush_timer = None
@@ -2,8 +2,9 @@ import argparse
 from ad_rando.seed_generator import RandoCommandHandler
 import asyncio
 from bot_config import BotConfig
-from curry_quest import Controller as CurryQuestController, CurryQuest, Config as CurryQuestConfig, StateFilesHandler, \
-    HallsOfFameHandler
+from curry_quest import Controller as CurryQuestController, CurryQuest, Config as CurryQuestConfig, StatesHandler, \
+    HallsOfFameHandler, WriteBehindStatesHandler, PersistenceWriter, ThreadPoolPersistenceWriter
+from curry_quest.states_storage import StatesStorage, JsonFilesStatesStorage, SqliteStatesStorage, migrate_states
 import discord
 import discord_helpers
 import logging.handlers
@@ -17,12 +18,17 @@ class CurryQuestDiscordClient(discord.Client):
             bot_config: BotConfig,
             curry_quest_config: CurryQuestConfig,
             hall_of_fame_handler,
-            state_files_handler):
+            state_files_handler,
+            max_resident_players: int=None):
         intents = discord.Intents.default()
         intents.message_content = True
         super().__init__(intents=intents)
         self._bot_config = bot_config
-        curry_quest_controller = CurryQuestController(curry_quest_config, hall_of_fame_handler, state_files_handler)
+        curry_quest_controller = CurryQuestController(
+            curry_quest_config,
+            hall_of_fame_handler,
+            state_files_handler,
+            max_resident_players=max_resident_players)
         self._curry_quest_client = CurryQuest(curry_quest_controller, bot_config)
 
     async def on_ready(self):
@@ -50,6 +56,10 @@ class CurryQuestDiscordClient(discord.Client):
 
         self._curry_quest_client.start(send_curry_quest_message, send_curry_quest_admin_message)
 
+    async def close(self):
+        self._curry_quest_client.stop()
+        await super().close()
+
     async def on_disconnect(self):
         await self.change_presence(afk=True)
         logger.info("Disconnected.")
@@ -93,8 +103,17 @@ class CurryQuestOfflineClient:
     class InvalidCommand(Exception):
         pass
 
-    def __init__(self, curry_quest_config: CurryQuestConfig, halls_of_fame_handler, state_files_handler):
-        self._controller = CurryQuestController(curry_quest_config, halls_of_fame_handler, state_files_handler)
+    def __init__(
+            self,
+            curry_quest_config: CurryQuestConfig,
+            halls_of_fame_handler,
+            state_files_handler,
+            max_resident_players: int=None):
+        self._controller = CurryQuestController(
+            curry_quest_config,
+            halls_of_fame_handler,
+            state_files_handler,
+            max_resident_players=max_resident_players)
         self._controller.set_response_event_handler(lambda msg: print(f"Response - {msg}"))
 
     def run(self):
@@ -105,6 +124,7 @@ class CurryQuestOfflineClient:
         while True:
             is_by_admin, (command, args) = await asyncio.to_thread(self._get_command)
             if command == self.EXIT_COMMAND:
+                self._controller.shutdown()
                 return
             if command == self.JOIN_COMMAND:
                 self._controller.add_player(self.PLAYER_ID, 'Test player')
@@ -158,6 +178,14 @@ def parse_args():
     parser.add_argument('halls_of_fame_file', type=str)
     parser.add_argument('-l', '--log_file', default='curry_quest.log')
     parser.add_argument('-d', '--state_files_directory', default='.')
+    parser.add_argument('--state_database', type=str)
+    parser.add_argument('--migrate_state_files', action='store_true')
+    parser.add_argument('--fsync_state_files', action='store_true')
+    parser.add_argument('--state_flush_delay', type=float, default=WriteBehindStatesHandler.DEFAULT_FLUSH_DELAY)
+    parser.add_argument('--state_flush_batch_size', type=int, default=WriteBehindStatesHandler.DEFAULT_BATCH_SIZE)
+    parser.add_argument('--snapshot_interval', type=int, default=StatesHandler.DEFAULT_SNAPSHOT_INTERVAL)
+    parser.add_argument('--max_resident_players', type=int, default=0)
+    parser.add_argument('--io_threads', type=int, default=ThreadPoolPersistenceWriter.DEFAULT_LANES_COUNT)
     parser.add_argument('--offline', action='store_true')
     return parser.parse_args()
 
@@ -183,18 +211,80 @@ def megabytes_to_bytes(mb):
     return mb * 1000 ** 2
 
 
+def create_states_storage(args, curry_quest_config: CurryQuestConfig):
+    state_files_storage = JsonFilesStatesStorage(args.state_files_directory, fsync=args.fsync_state_files)
+    if args.state_database is None:
+        return state_files_storage
+    state_database_storage = SqliteStatesStorage(args.state_database)
+    if args.migrate_state_files:
+        migrate_state_files(args, state_files_storage, state_database_storage, curry_quest_config)
+    return state_database_storage
+
+
+def migrate_state_files(
+        args,
+        state_files_storage: StatesStorage,
+        state_database_storage: StatesStorage,
+        curry_quest_config: CurryQuestConfig):
+    if len(state_database_storage.player_ids()) > 0:
+        logger.warning(
+            f"Not migrating state files, '{args.state_database}' already holds states. "
+            f"Remove --migrate_state_files option.")
+        return
+    logger.info(f"Migrating state files from '{args.state_files_directory}' to '{args.state_database}'.")
+    try:
+        states_summaries = StatesHandler(state_files_storage).load_index(curry_quest_config)
+        migrate_states(state_files_storage, state_database_storage, states_summaries)
+    except StatesStorage.StorageError as exc:
+        logger.error(f"Could not migrate state files. Reason - {exc}.")
+
+
+def create_persistence_writer(args):
+    if args.io_threads <= 0:
+        return PersistenceWriter()
+    return ThreadPoolPersistenceWriter(lanes_count=args.io_threads)
+
+
+def create_states_handler(args, persistence_writer, curry_quest_config: CurryQuestConfig):
+    states_handler = StatesHandler(
+        create_states_storage(args, curry_quest_config),
+        persistence_writer,
+        args.snapshot_interval)
+    if args.state_flush_delay <= 0:
+        return states_handler
+    return WriteBehindStatesHandler(
+        states_handler,
+        flush_delay=args.state_flush_delay,
+        batch_size=args.state_flush_batch_size)
+
+
 def main():
     args = parse_args()
     configure_logger(args)
     bot_config = BotConfig.Parser(args.bot_config).parse()
     curry_quest_config = CurryQuestConfig.Parser(args.curry_quest_config).parse()
-    halls_of_fame_handler = HallsOfFameHandler.from_file(args.halls_of_fame_file)
-    state_files_handler = StateFilesHandler(args.state_files_directory)
-    if args.offline:
-        CurryQuestOfflineClient(curry_quest_config, halls_of_fame_handler, state_files_handler).run()
-    else:
-        client = CurryQuestDiscordClient(bot_config, curry_quest_config, halls_of_fame_handler, state_files_handler)
-        client.run(args.token)
+    persistence_writer = create_persistence_writer(args)
+    halls_of_fame_handler = HallsOfFameHandler.from_file(args.halls_of_fame_file, persistence_writer)
+    state_files_handler = create_states_handler(args, persistence_writer, curry_quest_config)
+    max_resident_players = args.max_resident_players if args.max_resident_players > 0 else None
+    try:
+        if args.offline:
+            CurryQuestOfflineClient(
+                curry_quest_config,
+                halls_of_fame_handler,
+                state_files_handler,
+                max_resident_players).run()
+        else:
+            client = CurryQuestDiscordClient(
+                bot_config,
+                curry_quest_config,
+                halls_of_fame_handler,
+                state_files_handler,
+                max_resident_players)
+            client.run(args.token)
+    finally:
+        state_files_handler.close()
+        persistence_writer.close()
 
 
 if __name__ == '__main__':